@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark Mode S CRC & DF validation: FrameFilter against pyModeS.
+
+Frames are validated in batches of --batch, as framed from one socket read.
+
+Usage: python3 benchmarks/bench_crc.py [-n FRAMES] [--batch FRAMES]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import modes_messages  # NOQA pylint: disable=wrong-import-position
+
+try:
+    import pyModeS as pms
+except ImportError:
+    pms = None
+
+
+def bench_pymodes(batches: list) -> float:
+    """Validate each frame with pyModeS, as ADSBNetWorker used to."""
+    start = time.perf_counter()
+    for frames in batches:
+        for frame in frames:
+            msg = frame.msg.hex().upper()
+            if len(msg) == 28 and pms.df(msg) in (17, 18) and pms.crc(msg) == 0:
+                pass
+    return time.perf_counter() - start
+
+
+def bench_filter(batches: list) -> float:
+    """Validate each batch of frames with a FrameFilter."""
+    frame_filter = adsbcot.FrameFilter()
+    start = time.perf_counter()
+    for frames in batches:
+        frame_filter.filter(frames)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--frames", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=180)
+    args = parser.parse_args()
+
+    frames = [adsbcot.ModeSFrame(msg) for msg in modes_messages(args.frames)]
+    batches = [
+        frames[start : start + args.batch]
+        for start in range(0, len(frames), args.batch)
+    ]
+
+    results = {"FrameFilter (Python)": None, "FrameFilter (NumPy)": None}
+    with patch("adsbcot.modes_functions.NUMPY_MIN_BATCH", 10**9):
+        results["FrameFilter (Python)"] = bench_filter(batches)
+    if adsbcot.modes_functions.np is not None:
+        results["FrameFilter (NumPy)"] = bench_filter(batches)
+    if pms is not None:
+        results["pyModeS"] = bench_pymodes(batches)
+
+    for name, seconds in results.items():
+        if seconds is None:
+            print(f"{name}: not installed")
+            continue
+        print(
+            f"validator={name:<21} frames={len(frames)} batch={args.batch} "
+            f"seconds={seconds:.3f} frames/s={len(frames) / seconds:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
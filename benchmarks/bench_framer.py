@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark adsbcot's Beast & AVR framers against pyModeS' TCP client buffers.
+
+Captures are fed in reads of --read-size bytes, as ADSBNetReceiver reads the
+socket. Recorded captures may be given with --beast & --avr.
+
+Usage: python3 benchmarks/bench_framer.py [-n FRAMES] [--beast FILE] [--avr FILE]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import (  # NOQA pylint: disable=wrong-import-position
+    avr_capture,
+    beast_capture,
+)
+
+try:
+    import pyModeS.streamer.source
+except ImportError:
+    pyModeS = None
+
+
+def _reads(capture: bytes, read_size: int) -> List[bytes]:
+    return [
+        capture[start : start + read_size]
+        for start in range(0, len(capture), read_size)
+    ]
+
+
+def adsbcot_framer(data_type: str) -> Callable:
+    """Frame reads with adsbcot, giving (hex, time) as ADSBNetWorker does."""
+    framer = adsbcot.get_framer(data_type)
+
+    def frame(received: bytes) -> list:
+        now = time.time()
+        return [(f.msg.hex().upper(), now) for f in framer.feed(received)]
+
+    return frame
+
+
+def pymodes_framer(data_type: str) -> Callable:
+    """Frame reads with pyModeS' NetSource buffers."""
+    net_client = pyModeS.streamer.source.NetSource("x", 1, data_type)
+    read = (
+        net_client.read_beast_buffer
+        if data_type == "beast"
+        else net_client.read_raw_buffer
+    )
+
+    def frame(received: bytes) -> list:
+        net_client.buffer.extend(received)
+        return read()
+
+    return frame
+
+
+def bench(framer: Callable, reads: List[bytes]) -> tuple:
+    """Get the frames read, and the time to read them."""
+    frames = 0
+    start = time.perf_counter()
+    for received in reads:
+        frames += len(framer(received))
+    return frames, time.perf_counter() - start
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--frames", type=int, default=100000)
+    parser.add_argument("--read-size", type=int, default=4096)
+    parser.add_argument("--beast")
+    parser.add_argument("--avr")
+    args = parser.parse_args()
+
+    captures = {}
+    for data_type, path, generate in (
+        ("beast", args.beast, beast_capture),
+        ("raw", args.avr, avr_capture),
+    ):
+        if path:
+            with open(path, "rb") as capture_fd:
+                captures[data_type] = capture_fd.read()
+        else:
+            captures[data_type] = generate(args.frames)
+
+    framers = {"adsbcot": adsbcot_framer}
+    if pyModeS is not None:
+        framers["pyModeS"] = pymodes_framer
+    else:
+        print("pyModeS not installed, only benchmarking adsbcot.")
+
+    for data_type, capture in captures.items():
+        reads = _reads(capture, args.read_size)
+        for name, make_framer in framers.items():
+            frames, seconds = bench(make_framer(data_type), reads)
+            print(
+                f"data_type={data_type:<5} framer={name:<7} bytes={len(capture)} "
+                f"frames={frames} seconds={seconds:.3f} "
+                f"frames/s={frames / seconds:.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark the JSON_CODECs decoding dump1090, ADSBExchange & Stratux payloads.
+
+dump1090 & ADSBExchange payloads are one document per poll, Stratux payloads are
+one websocket message per aircraft. Recorded payloads may be given with --file:
+JSON documents, or newline-delimited Stratux messages.
+
+Usage: python3 benchmarks/bench_json.py [-n AIRCRAFT] [--file PAYLOAD ...]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import (  # NOQA pylint: disable=wrong-import-position
+    adsbx_aircraft,
+    dump1090_aircraft,
+    stratux_traffic,
+)
+
+
+def _payloads(count: int, files: List[str]) -> Dict[str, List[bytes]]:
+    """Get the payloads to decode, as lists of messages."""
+    payloads = {
+        "dump1090": [
+            json.dumps({"now": 1, "aircraft": dump1090_aircraft(count)}).encode()
+        ],
+        "adsbx": [json.dumps(adsbx_aircraft(count)).encode()],
+        "stratux": [json.dumps(msg).encode() for msg in stratux_traffic(count)],
+    }
+    for path in files:
+        with open(path, "rb") as payload_fd:
+            data = payload_fd.read()
+        try:
+            json.loads(data)
+            payloads[os.path.basename(path)] = [data]
+        except ValueError:
+            payloads[os.path.basename(path)] = [
+                line for line in data.splitlines() if line.strip()
+            ]
+    return payloads
+
+
+def bench(loads: Callable, messages: List[bytes], repeat: int) -> float:
+    """Get the best time, in seconds, to decode all messages."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            loads(message)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--aircraft", type=int, default=5000)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--file", action="append", default=[])
+    args = parser.parse_args()
+
+    codecs = ["json"]
+    if adsbcot.functions.orjson is not None:
+        codecs.append("orjson")
+    else:
+        print("orjson not installed, only benchmarking json.")
+
+    for name, messages in _payloads(args.aircraft, args.file).items():
+        size = sum(len(message) for message in messages)
+        baseline = None
+        for codec in codecs:
+            seconds = bench(adsbcot.get_json_loads(codec), messages, args.repeat)
+            baseline = baseline or seconds
+            print(
+                f"payload={name:<10} codec={codec:<7} bytes={size} "
+                f"ms={seconds * 1000:.2f} MB/s={size / seconds / 1e6:.0f} "
+                f"speedup={baseline / seconds:.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
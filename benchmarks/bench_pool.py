@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark ADSBWorker.handle_data() with & without the process pool.
+
+Reports the time to convert one large poll, and the longest the event loop was
+blocked meanwhile (which is what stalls SensorWorker & the TX queue).
+
+Usage: python3 benchmarks/bench_pool.py [-n AIRCRAFT] [-w POOL_WORKERS]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from configparser import ConfigParser
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import dump1090_aircraft  # NOQA pylint: disable=wrong-import-position
+
+
+async def _ticker(stalls: list, period: float = 0.001) -> None:
+    """Measure how late the event loop runs a periodic task."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(period)
+        stalls.append(time.perf_counter() - start - period)
+
+
+async def bench(count: int, pool_workers: int) -> dict:
+    """Run a single benchmark."""
+    config = ConfigParser()
+    config.read_dict(
+        {
+            "adsbcot": {
+                "COT_SERIALIZER": "template",
+                "POOL_WORKERS": str(pool_workers),
+                "POOL_THRESHOLD": "1",
+            }
+        }
+    )
+    worker = adsbcot.ADSBWorker(asyncio.Queue(), config["adsbcot"])
+
+    if worker.pool is not None:
+        # Warm up the worker processes, so start-up isn't measured:
+        await worker.handle_data(dump1090_aircraft(pool_workers * 2, seed=1))
+        while not worker.queue.empty():
+            worker.queue.get_nowait()
+
+    data = dump1090_aircraft(count)
+    stalls: list = []
+    ticker = asyncio.create_task(_ticker(stalls))
+    await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    await worker.handle_data(data)
+    elapsed = time.perf_counter() - start
+
+    ticker.cancel()
+    if worker.pool is not None:
+        worker.pool.shutdown()
+
+    return {
+        "pool_workers": pool_workers,
+        "aircraft": count,
+        "events": worker.queue.qsize(),
+        "seconds": elapsed,
+        "aircraft_per_sec": count / elapsed,
+        "max_loop_stall_ms": max(stalls or [0]) * 1000,
+    }
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--aircraft", type=int, default=10000)
+    parser.add_argument("-w", "--pool-workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    for pool_workers in (0, args.pool_workers):
+        result = asyncio.run(bench(args.aircraft, pool_workers))
+        print(
+            "pool_workers={pool_workers:<3} aircraft={aircraft} events={events} "
+            "seconds={seconds:.3f} aircraft/s={aircraft_per_sec:.0f} "
+            "max_loop_stall_ms={max_loop_stall_ms:.1f}".format(**result)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark Mode S decoding in-process, and in DECODE_PROCESSES shards.
+
+Frames are decoded in batches of --batch, as ADSBNetWorker sends them to its
+decoder processes, each batch split between the processes by ICAO address.
+
+Usage: python3 benchmarks/bench_shards.py [-n FRAMES] [--aircraft N] [--batch N]
+                                          [--processes 1,2,4]
+"""
+
+import argparse
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import adsb_frames  # NOQA pylint: disable=wrong-import-position
+
+REFERENCE = (52.0, 4.0)
+
+
+def bench_in_process(batches: list) -> float:
+    """Decode each batch with a ModeSDecoder, as ADSBNetWorker does by default."""
+    modes = adsbcot.ModeSDecoder(reference=REFERENCE)
+    start = time.perf_counter()
+    for frames in batches:
+        modes.buffer_frames(frames, time.time())
+        modes.decode()
+    return time.perf_counter() - start
+
+
+def bench_shards(batches: list, processes: int) -> float:
+    """Decode each batch split between decoder processes by ICAO address."""
+    shards = [
+        concurrent.futures.ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=adsbcot.functions.init_decode_shard,
+            initargs=(adsbcot.DEFAULT_AIRCRAFT_TTL, 300000.0, REFERENCE),
+        )
+        for _ in range(processes)
+    ]
+    # Start the processes before timing:
+    for shard in shards:
+        shard.submit(adsbcot.functions.shard_decode, [], 0.0).result()
+
+    start = time.perf_counter()
+    futures = []
+    for frames in batches:
+        split = [[] for _ in range(processes)]
+        for frame in frames:
+            split[int.from_bytes(frame.msg[1:4], "big") % processes].append(frame)
+        futures += [
+            shard.submit(adsbcot.functions.shard_decode, part, time.time())
+            for shard, part in zip(shards, split)
+            if part
+        ]
+    for future in futures:
+        future.result()
+    seconds = time.perf_counter() - start
+
+    for shard in shards:
+        shard.shutdown()
+    return seconds
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--frames", type=int, default=100000)
+    parser.add_argument("--aircraft", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--processes", default="1,2,4")
+    args = parser.parse_args()
+
+    frames = [
+        adsbcot.ModeSFrame(msg) for msg in adsb_frames(args.frames, args.aircraft)
+    ]
+    batches = [
+        frames[start : start + args.batch]
+        for start in range(0, len(frames), args.batch)
+    ]
+
+    results = {0: bench_in_process(batches)}
+    for processes in (int(value) for value in args.processes.split(",")):
+        results[processes] = bench_shards(batches, processes)
+
+    print(f"cpus={os.cpu_count()}")
+    for processes, seconds in results.items():
+        print(
+            f"processes={processes} frames={len(frames)} aircraft={args.aircraft} "
+            f"batch={args.batch} seconds={seconds:.3f} "
+            f"frames/s={len(frames) / seconds:.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark ADSBWorker.get_file_feed() with & without STREAM_JSON.
+
+Reports the time to the first CoT Event, the time to read the whole feed, and
+the peak memory allocated meanwhile (as measured by tracemalloc).
+
+Usage: python3 benchmarks/bench_stream.py [-n AIRCRAFT]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from configparser import ConfigParser
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import dump1090_aircraft  # NOQA pylint: disable=wrong-import-position
+
+
+class _FirstEventQueue(asyncio.Queue):
+    """Queue that records when its first item was put."""
+
+    first: float = 0.0
+
+    def put_nowait(self, item) -> None:
+        if not self.first:
+            self.first = time.perf_counter()
+        super().put_nowait(item)
+
+
+async def bench(path: str, count: int, stream_json: bool) -> dict:
+    """Run a single benchmark."""
+    config = ConfigParser()
+    config.read_dict(
+        {
+            "adsbcot": {
+                "COT_SERIALIZER": "template",
+                "STREAM_JSON": str(stream_json),
+            }
+        }
+    )
+    queue = _FirstEventQueue()
+    worker = adsbcot.ADSBWorker(queue, config["adsbcot"])
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await worker.get_file_feed(urlparse(f"file://{path}"))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "stream_json": stream_json,
+        "aircraft": count,
+        "events": queue.qsize(),
+        "first_event_ms": (queue.first - start) * 1000,
+        "seconds": elapsed,
+        "peak_mb": peak / 1e6,
+    }
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--aircraft", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json") as feed:
+        json.dump({"now": 1, "aircraft": dump1090_aircraft(args.aircraft)}, feed)
+        feed.flush()
+        print(f"feed={os.path.getsize(feed.name) / 1e6:.1f}MB")
+
+        for stream_json in (False, True):
+            result = asyncio.run(bench(feed.name, args.aircraft, stream_json))
+            print(
+                "stream_json={stream_json!s:<5} aircraft={aircraft} events={events} "
+                "first_event_ms={first_event_ms:.1f} seconds={seconds:.3f} "
+                "peak_mb={peak_mb:.1f}".format(**result)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""Benchmark the aircraft to CoT conversion pipeline at several sky densities.
+
+Measures aircraft/s & µs/aircraft of adsb_to_cot_xml(), adsb_to_cot() (with each
+COT_SERIALIZER), ADSBWorker.process_craft() and ADSBNetWorker's TCP decode path,
+for dump1090, ADSBX, Stratux & Beast payloads (see payloads.py). Each result is
+the best of --repeat runs. For the TCP decode path, aircraft are the aircraft
+updates converted, of FRAMES_PER_AIRCRAFT Beast frames per aircraft.
+
+Results are written as JSON to --output, and compared to an earlier run's with
+--compare, exiting non-zero if any is more than --tolerance slower.
+
+Usage: python3 benchmarks/bench_suite.py [--densities 100,1000,10000]
+                                         [--repeat 3] [--output FILE]
+                                         [--compare FILE] [--tolerance 0.1]
+"""
+
+import argparse
+import asyncio
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import sys
+import time
+
+from configparser import ConfigParser
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import adsbcot  # NOQA pylint: disable=wrong-import-position
+from payloads import (  # NOQA pylint: disable=wrong-import-position
+    adsb_frames,
+    adsbx_aircraft,
+    beast_capture,
+    dump1090_aircraft,
+    stratux_traffic,
+)
+
+# Beast frames per aircraft decoded by the TCP path, enough for each to get a
+# position, velocity & identification:
+FRAMES_PER_AIRCRAFT = 8
+READ_SIZE = 4096
+
+
+def _config(serializer: str = "etree") -> ConfigParser:
+    config = ConfigParser()
+    config.read_dict(
+        {
+            "adsbcot": {
+                "COT_SERIALIZER": serializer,
+                "INCLUDE_ALL_CRAFT": "true",
+                "SENSOR_LAT": "52.0",
+                "SENSOR_LON": "4.0",
+            }
+        }
+    )
+    return config
+
+
+def sources(density: int) -> Dict[str, List[dict]]:
+    """Get the aircraft of each JSON payload at a sky density."""
+    return {
+        "dump1090": dump1090_aircraft(density),
+        "adsbx": adsbx_aircraft(density)["ac"],
+        "stratux": stratux_traffic(density),
+    }
+
+
+def best(run: Callable[[], float], repeat: int) -> float:
+    """Get the least time, in seconds, of repeated runs."""
+    return min(run() for _ in range(repeat))
+
+
+def bench_function(func: Callable, crafts: List[dict], settings) -> float:
+    """Convert each aircraft with func, as workers without a batch do."""
+    start = time.perf_counter()
+    for craft in crafts:
+        func(craft, settings)
+    return time.perf_counter() - start
+
+
+def bench_process_craft(crafts: List[dict], serializer: str) -> float:
+    """Convert each aircraft with ADSBWorker.process_craft()."""
+    worker = adsbcot.ADSBWorker(asyncio.Queue(), _config(serializer)["adsbcot"])
+
+    async def run() -> float:
+        start = time.perf_counter()
+        for craft in crafts:
+            await worker.process_craft(craft)
+        return time.perf_counter() - start
+
+    return asyncio.run(run())
+
+
+def bench_tcp_decode(reads: List[bytes], serializer: str) -> tuple:
+    """Frame, validate, decode & convert Beast reads, as ADSBNetWorker.run() does.
+
+    Returns the time taken & the number of aircraft converted.
+    """
+    config = _config(serializer)["adsbcot"]
+    worker = adsbcot.ADSBNetWorker(asyncio.Queue(), asyncio.Queue(), config, "beast")
+
+    async def run() -> float:
+        worker.positions.reference = await worker.get_reference()
+        start = time.perf_counter()
+        for received in reads:
+            frames = worker.read_frames(received)
+            if frames:
+                worker.modes.buffer_frames(frames, time.time())
+                await worker.emit_aircraft(worker.modes.decode())
+        return time.perf_counter() - start
+
+    seconds = asyncio.run(run())
+    return seconds, worker.counters["net_aircraft_emitted"]
+
+
+def result(benchmark: str, source: str, density: int, count: int, seconds: float):
+    """Make a result record."""
+    return {
+        "benchmark": benchmark,
+        "source": source,
+        "density": density,
+        "aircraft": count,
+        "seconds": round(seconds, 6),
+        "aircraft_per_s": round(count / seconds, 1),
+        "us_per_aircraft": round(seconds / count * 1e6, 3),
+    }
+
+
+def run_suite(densities: List[int], repeat: int) -> List[dict]:
+    """Run every benchmark at every density."""
+    results: List[dict] = []
+    for density in densities:
+        for source, crafts in sources(density).items():
+            settings = adsbcot.compile_config(_config()["adsbcot"])
+            template = adsbcot.compile_config(_config("template")["adsbcot"])
+            cases = {
+                "adsb_to_cot_xml": lambda: bench_function(
+                    adsbcot.functions.adsb_to_cot_xml, crafts, settings
+                ),
+                "adsb_to_cot[etree]": lambda: bench_function(
+                    adsbcot.adsb_to_cot, crafts, settings
+                ),
+                "adsb_to_cot[template]": lambda: bench_function(
+                    adsbcot.adsb_to_cot, crafts, template
+                ),
+                "process_craft[etree]": lambda: bench_process_craft(crafts, "etree"),
+                "process_craft[template]": lambda: bench_process_craft(
+                    crafts, "template"
+                ),
+            }
+            for benchmark, run in cases.items():
+                results.append(
+                    result(benchmark, source, density, len(crafts), best(run, repeat))
+                )
+                _print(results[-1])
+
+        capture = beast_capture(
+            0, messages=adsb_frames(density * FRAMES_PER_AIRCRAFT, density)
+        )
+        reads = [
+            capture[start : start + READ_SIZE]
+            for start in range(0, len(capture), READ_SIZE)
+        ]
+        for serializer in ("etree", "template"):
+            runs = [bench_tcp_decode(reads, serializer) for _ in range(repeat)]
+            seconds, count = min(runs)
+            results.append(
+                result(f"tcp_decode[{serializer}]", "beast", density, count, seconds)
+            )
+            _print(results[-1])
+    return results
+
+
+def _print(record: dict) -> None:
+    print(
+        f"{record['benchmark']:<24} source={record['source']:<8} "
+        f"density={record['density']:<6} aircraft/s={record['aircraft_per_s']:<10.0f}"
+        f" µs/aircraft={record['us_per_aircraft']:.2f}",
+        file=sys.stderr,
+    )
+
+
+def _key(record: dict) -> tuple:
+    return record["benchmark"], record["source"], record["density"]
+
+
+def compare(results: List[dict], baseline: dict, tolerance: float) -> int:
+    """Print each result's change from a baseline run, returns the regressions."""
+    previous = {_key(record): record for record in baseline["results"]}
+    regressions = 0
+    for record in results:
+        old = previous.get(_key(record))
+        if old is None:
+            continue
+        change = record["us_per_aircraft"] / old["us_per_aircraft"] - 1
+        regressed = change > tolerance
+        regressions += regressed
+        print(
+            f"{record['benchmark']:<24} source={record['source']:<8} "
+            f"density={record['density']:<6} {change:+.1%}"
+            f"{' REGRESSION' if regressed else ''}",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main() -> None:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--densities", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results to this file, not stdout")
+    parser.add_argument("--compare", help="Results of an earlier run to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    densities = [int(density) for density in args.densities.split(",")]
+    try:
+        version = importlib.metadata.version("adsbcot")
+    except importlib.metadata.PackageNotFoundError:
+        version = "unknown"
+
+    report = {
+        "adsbcot": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": adsbcot.modes_functions.np is not None,
+        "orjson": adsbcot.functions.orjson is not None,
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "repeat": args.repeat,
+        "results": run_suite(densities, args.repeat),
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline:
+            regressions = compare(
+                report["results"], json.load(baseline), args.tolerance
+            )
+        if regressions:
+            sys.exit(
+                f"{regressions} benchmarks regressed by more than {args.tolerance:.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
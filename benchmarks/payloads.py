@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""ADSBCOT Benchmark Payloads."""
+
+import math
+import random
+
+from typing import List
+
+import adsbcot
+
+CALLSIGN_CHARS = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ#####_###############0123456789######"
+
+
+def dump1090_aircraft(count: int, seed: int = 0) -> List[dict]:
+    """Generate a dump1090-style aircraft list of the given sky density."""
+    rand = random.Random(seed)
+    aircraft = []
+    for i in range(count):
+        aircraft.append(
+            {
+                "hex": f"{0xA00000 + i:06x}",
+                "flight": f"SWA{i % 10000:<5}",
+                "alt_baro": rand.randrange(0, 45000, 25),
+                "alt_geom": rand.randrange(0, 45000, 25),
+                "gs": round(rand.uniform(80, 550), 1),
+                "track": round(rand.uniform(0, 360), 1),
+                "baro_rate": rand.randrange(-3000, 3000, 64),
+                "squawk": f"{rand.randrange(0, 0o7777):04o}",
+                "category": rand.choice(["A1", "A3", "A5", "A7"]),
+                "lat": round(rand.uniform(36.0, 39.0), 6),
+                "lon": round(rand.uniform(-124.0, -120.0), 6),
+                "nic": 8,
+                "rc": 186,
+                "seen_pos": round(rand.uniform(0, 10), 1),
+                "version": 2,
+                "nac_p": 10,
+                "nac_v": 2,
+                "sil": 3,
+                "sil_type": "perhour",
+                "mlat": [],
+                "tisb": [],
+                "messages": rand.randrange(1, 5000),
+                "seen": round(rand.uniform(0, 10), 1),
+                "rssi": round(rand.uniform(-30, -3), 1),
+            }
+        )
+    return aircraft
+
+
+def adsbx_aircraft(count: int, seed: int = 0) -> dict:
+    """Generate an ADSBExchange v2 API response of the given sky density."""
+    rand = random.Random(seed)
+    aircraft = []
+    for i in range(count):
+        aircraft.append(
+            {
+                "hex": f"{0xA00000 + i:06x}",
+                "type": "adsb_icao",
+                "flight": f"SWA{i % 10000:<5}",
+                "r": f"N{rand.randrange(100, 99999)}",
+                "t": rand.choice(["B737", "B738", "A320", "C172", "E75L"]),
+                "alt_baro": rand.randrange(0, 45000, 25),
+                "alt_geom": rand.randrange(0, 45000, 25),
+                "gs": round(rand.uniform(80, 550), 1),
+                "track": round(rand.uniform(0, 360), 2),
+                "baro_rate": rand.randrange(-3000, 3000, 64),
+                "squawk": f"{rand.randrange(0, 0o7777):04o}",
+                "emergency": "none",
+                "category": rand.choice(["A1", "A3", "A5", "A7"]),
+                "nav_qnh": 1013.6,
+                "nav_altitude_mcp": rand.randrange(0, 45000, 100),
+                "lat": round(rand.uniform(36.0, 39.0), 6),
+                "lon": round(rand.uniform(-124.0, -120.0), 6),
+                "nic": 8,
+                "rc": 186,
+                "seen_pos": round(rand.uniform(0, 10), 3),
+                "version": 2,
+                "nic_baro": 1,
+                "nac_p": 10,
+                "nac_v": 2,
+                "sil": 3,
+                "sil_type": "perhour",
+                "gva": 2,
+                "sda": 2,
+                "alert": 0,
+                "spi": 0,
+                "mlat": [],
+                "tisb": [],
+                "messages": rand.randrange(1, 50000),
+                "seen": round(rand.uniform(0, 10), 1),
+                "rssi": round(rand.uniform(-30, -3), 1),
+            }
+        )
+    now = 1700000000000
+    return {
+        "ac": aircraft,
+        "msg": "No error",
+        "now": now,
+        "total": count,
+        "ctime": now,
+        "ptime": 42,
+    }
+
+
+def stratux_traffic(count: int, seed: int = 0) -> List[dict]:
+    """Generate Stratux /traffic websocket messages, one per aircraft."""
+    rand = random.Random(seed)
+    traffic = []
+    for i in range(count):
+        traffic.append(
+            {
+                "Icao_addr": 0xA00000 + i,
+                "Reg": f"N{rand.randrange(100, 99999)}",
+                "Tail": f"SWA{i % 10000}",
+                "Emitter_category": rand.choice([1, 3, 5, 7]),
+                "OnGround": False,
+                "Addr_type": 0,
+                "TargetType": 1,
+                "SignalLevel": rand.uniform(-40, -3),
+                "Squawk": rand.randrange(0, 0o7777),
+                "Position_valid": True,
+                "Lat": round(rand.uniform(36.0, 39.0), 5),
+                "Lng": round(rand.uniform(-124.0, -120.0), 5),
+                "Alt": rand.randrange(0, 45000, 25),
+                "GnssDiffFromBaroAlt": rand.randrange(-500, 500, 25),
+                "AltIsGNSS": False,
+                "NIC": 8,
+                "NACp": 10,
+                "Track": rand.randrange(0, 360),
+                "Speed": rand.randrange(80, 550),
+                "Speed_valid": True,
+                "Vvel": rand.randrange(-3000, 3000, 64),
+                "Timestamp": "2020-11-06T19:58:06.234Z",
+                "PriorityStatus": 0,
+                "Age": round(rand.uniform(0, 10), 2),
+                "AgeLastAlt": round(rand.uniform(0, 10), 2),
+                "Last_seen": "0001-01-01T00:39:54.77Z",
+                "Last_alt": "0001-01-01T00:39:54.77Z",
+                "Last_GnssDiff": "0001-01-01T00:39:53.84Z",
+                "Last_GnssDiffAlt": 21775,
+                "Last_speed": "0001-01-01T00:39:53.84Z",
+                "Last_source": 1,
+                "ExtrapolatedPosition": False,
+                "BearingDist_valid": False,
+                "Bearing": 0,
+                "Distance": 0,
+            }
+        )
+    return traffic
+
+
+def modes_messages(count: int, seed: int = 0) -> List[bytes]:
+    """Generate Mode S messages: 3 long (DF17) for every short (DF11)."""
+    rand = random.Random(seed)
+    messages = []
+    for i in range(count):
+        icao = (0xA00000 + i % 2000).to_bytes(3, "big")
+        if i % 4:
+            payload = bytes(rand.randrange(256) for _ in range(10))
+            messages.append(b"\x8d" + icao + payload)
+        else:
+            parity = bytes(rand.randrange(256) for _ in range(3))
+            messages.append(b"\x5d" + icao + parity)
+    return messages
+
+
+def beast_capture(count: int, seed: int = 0, messages=None) -> bytes:
+    """Generate a Beast binary capture of Mode S frames.
+
+    The frames are of `modes_messages()`, unless other messages are given.
+    """
+    rand = random.Random(seed)
+    capture = bytearray()
+    mlat = rand.randrange(2**40)
+    for msg in modes_messages(count, seed) if messages is None else messages:
+        mlat += rand.randrange(1000, 100000)
+        body = mlat.to_bytes(6, "big") + bytes([rand.randrange(256)]) + msg
+        kind = b"3" if len(msg) == 14 else b"2"
+        capture += b"\x1a" + kind + body.replace(b"\x1a", b"\x1a\x1a")
+    return bytes(capture)
+
+
+def avr_capture(count: int, seed: int = 0) -> bytes:
+    """Generate an AVR (raw) capture of Mode S frames."""
+    return b"".join(
+        b"*" + msg.hex().upper().encode() + b";\n"
+        for msg in modes_messages(count, seed)
+    )
+
+
+def _df17(icao: int, me: int) -> bytes:
+    """Encode a DF17 message with a valid CRC."""
+    msg = b"\x8d" + icao.to_bytes(3, "big") + me.to_bytes(7, "big")
+    return msg + adsbcot.modes_crc(msg + b"\x00\x00\x00").to_bytes(3, "big")
+
+
+def _cpr_encode(lat: float, lon: float, odd: int) -> tuple:
+    """CPR encode an airborne position."""
+    dlat = 360.0 / (60 - odd)
+    yz = math.floor(131072 * (lat % dlat) / dlat + 0.5)
+    rlat = dlat * (yz / 131072 + math.floor(lat / dlat))
+    dlon = 360.0 / max(adsbcot.cpr_nl(rlat) - odd, 1)
+    xz = math.floor(131072 * (lon % dlon) / dlon + 0.5)
+    return yz & 0x1FFFF, xz & 0x1FFFF
+
+
+def adsb_frames(
+    count: int, aircraft: int = 1000, seed: int = 0, center=(52.0, 4.0)
+) -> List[bytes]:
+    """Generate valid DF17 messages from aircraft within ~250km of center.
+
+    Aircraft take turns sending an even & odd airborne position, a velocity, and
+    every 4th turn an identification.
+    """
+    rand = random.Random(seed)
+    crafts = []
+    for i in range(aircraft):
+        call = "".join(rand.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3))
+        call += f"{rand.randrange(10000):04d}_"
+        crafts.append(
+            {
+                "icao": 0xA00000 + i,
+                "lat": center[0] + rand.uniform(-2, 2),
+                "lon": center[1] + rand.uniform(-3, 3),
+                "alt": rand.randrange(1000, 40000, 25),
+                "v_ew": rand.randrange(-400, 400),
+                "v_ns": rand.randrange(-400, 400),
+                "call": call,
+            }
+        )
+
+    messages: List[bytes] = []
+    turn = 0
+    while len(messages) < count:
+        craft = crafts[turn % aircraft]
+        icao = craft["icao"]
+        alt_n = (craft["alt"] + 1000) // 25
+        alt = ((alt_n & 0x7F0) << 1) | 0x10 | (alt_n & 0xF)
+        for odd in (0, 1):
+            lat_cpr, lon_cpr = _cpr_encode(craft["lat"], craft["lon"], odd)
+            messages.append(
+                _df17(
+                    icao,
+                    (11 << 51) | (alt << 36) | (odd << 34) | (lat_cpr << 17) | lon_cpr,
+                )
+            )
+        v_ew, v_ns = craft["v_ew"], craft["v_ns"]
+        messages.append(
+            _df17(
+                icao,
+                (19 << 51)
+                | (1 << 48)
+                | ((v_ew < 0) << 42)
+                | ((abs(v_ew) + 1) << 32)
+                | ((v_ns < 0) << 31)
+                | ((abs(v_ns) + 1) << 21)
+                | (1 << 10),
+            )
+        )
+        if turn // aircraft % 4 == 0:
+            chars = 0
+            for char in craft["call"][:8].ljust(8, "_"):
+                chars = (chars << 6) | CALLSIGN_CHARS.index(char)
+            messages.append(_df17(icao, (4 << 51) | chars))
+        turn += 1
+    return messages[:count]
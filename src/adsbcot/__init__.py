@@ -31,8 +31,97 @@ from .constants import (  # NOQA
     DEFAULT_SENSOR_ID,
     DEFAULT_SENSOR_COT_TYPE,
     DEFAULT_SENSOR_PAYLOAD_TYPE,
+    DEFAULT_SUPPRESS_UNCHANGED,
+    DEFAULT_CRAFT_CACHE_SIZE,
+    DEFAULT_CRAFT_CACHE_TTL,
+    DEFAULT_CHANGE_DISTANCE,
+    DEFAULT_CHANGE_ALT,
+    DEFAULT_CHANGE_TRACK,
+    DEFAULT_CHANGE_REFRESH,
+    DEFAULT_COT_SERIALIZER,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_POOL_WORKERS,
+    DEFAULT_POOL_THRESHOLD,
+    DEFAULT_POOL_CHUNK_SIZE,
+    DEFAULT_MERGE_WINDOW,
+    DEFAULT_POLL_BACKOFF,
+    DEFAULT_RETRY_MAX_DELAY,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_BREAKER_TIMEOUT,
+    DEFAULT_STREAM_JSON,
+    DEFAULT_STREAM_CHUNK_SIZE,
+    DEFAULT_JSON_CODEC,
+    DEFAULT_FILE_MMAP,
+    DEFAULT_FILE_WATCH,
+    DEFAULT_FILE_DEBOUNCE,
+    DEFAULT_WS_PING_INTERVAL,
+    DEFAULT_WS_PING_TIMEOUT,
+    DEFAULT_NET_QUEUE_SIZE,
+    DEFAULT_NET_QUEUE_POLICY,
+    DEFAULT_MODES_ICAO_TTL,
+    DEFAULT_NET_SWEEP_INTERVAL,
+    DEFAULT_AIRCRAFT_TTL,
+    DEFAULT_CPR_MAX_RANGE,
+    DEFAULT_DECODE_PROCESSES,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_METRICS_HOST,
+    DEFAULT_METRICS_PORT,
 )
 
-from .functions import adsb_to_cot, create_tasks, gen_sensor_cot  # NOQA
+from .functions import (  # NOQA
+    adsb_to_cot,
+    adsb_to_cot_batch,
+    adsb_to_cot_template,
+    compile_config,
+    create_tasks,
+    gen_sensor_cot,
+    get_craft_icao,
+    get_feed_urls,
+    get_json_loads,
+    get_recorder,
+    get_craft_state,
+    parse_retry_after,
+)
+
+from .classes import (  # NOQA
+    ADSBWorker,
+    ADSBMergeWorker,
+    ADSBNetReceiver,
+    ADSBNetWorker,
+    ADSBReplayWorker,
+    AircraftState,
+    AircraftStreamParser,
+    AircraftTable,
+    CircuitBreaker,
+    CompiledConfig,
+    CraftMerger,
+    CraftStateCache,
+    FeedRecorder,
+    FeedReplayer,
+    Histogram,
+    KnownCraftIndex,
+    MetricsWorker,
+    ModeSDecoder,
+    PollScheduler,
+    SensorWorker,
+)
 
-from .classes import ADSBWorker, ADSBNetReceiver, ADSBNetWorker, SensorWorker  # NOQA
+from .modes_classes import (  # NOQA
+    AVRFramer,
+    BeastFramer,
+    FrameFilter,
+    ModeSFrame,
+    PositionDecoder,
+    get_framer,
+)
+
+from .modes_functions import (  # NOQA
+    cpr_global,
+    cpr_local,
+    cpr_nl,
+    great_circle_distance,
+    modes_crc,
+    modes_crc_batch,
+    modes_df,
+    modes_typecode,
+)
@@ -19,13 +19,36 @@
 """ADSBCOT Class Definitions."""
 
 import asyncio
+import bisect
+import codecs
+import concurrent.futures
+import heapq
 import importlib.util
 import json
+import math
+import mmap
+import multiprocessing
 import os
+import random
+import re
+import struct
+import time
 import warnings
+import zlib
 
+from collections import Counter, OrderedDict
+from configparser import SectionProxy
 from pathlib import Path
-from typing import Optional, Union
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 from urllib.parse import ParseResult, ParseResultBytes, urlparse
 
 import aiohttp
@@ -35,6 +58,18 @@ import aircot
 import adsbcot
 import xml.etree.ElementTree as ET
 
+from aiohttp import web
+
+from adsbcot.modes_classes import (
+    AVRFramer,
+    BeastFramer,
+    FrameFilter,
+    ModeSFrame,
+    PositionDecoder,
+    get_framer,
+)
+from adsbcot.modes_functions import modes_crc
+
 try:
     import gpsd as _gpsd
 except ImportError:
@@ -58,21 +93,960 @@ except ImportError as exc:
     warnings.warn("ADSBCOT ignoring ImportError for: pyModeS")
 
 
+class CompiledConfig:
+    """Immutable snapshot of the config options used for every aircraft.
+
+    Parsing these once, rather than through `ConfigParser` for every aircraft,
+    keeps config access out of the per-aircraft hot path.
+    """
+
+    __slots__ = (
+        "feed_url",
+        "uid_key",
+        "cot_stale",
+        "cot_host_id",
+        "cot_access",
+        "alt_upper",
+        "alt_lower",
+        "include_tisb",
+        "tisb_only",
+        "include_all_craft",
+        "cot_serializer",
+    )
+
+    def __init__(self, config: Union[SectionProxy, dict, None] = None) -> None:
+        """Initialize this class from a `SectionProxy` or `dict` config."""
+        config = config or {}
+        _set = object.__setattr__
+        _set(self, "feed_url", str(config.get("FEED_URL") or ""))
+        _set(self, "uid_key", str(config.get("UID_KEY") or "ICAO"))
+        _set(
+            self,
+            "cot_stale",
+            int(config.get("COT_STALE") or 0) or int(pytak.DEFAULT_COT_STALE),
+        )
+        _set(self, "cot_host_id", config.get("COT_HOST_ID") or pytak.DEFAULT_HOST_ID)
+        _set(
+            self, "cot_access", config.get("COT_ACCESS") or pytak.DEFAULT_COT_ACCESS
+        )
+        _set(self, "alt_upper", int(config.get("ALT_UPPER") or 0))
+        _set(self, "alt_lower", int(config.get("ALT_LOWER") or 0))
+        _set(self, "include_tisb", _get_bool(config, "INCLUDE_TISB"))
+        _set(self, "tisb_only", _get_bool(config, "TISB_ONLY"))
+        _set(self, "include_all_craft", _get_bool(config, "INCLUDE_ALL_CRAFT"))
+        _set(
+            self,
+            "cot_serializer",
+            str(config.get("COT_SERIALIZER") or adsbcot.DEFAULT_COT_SERIALIZER)
+            .strip()
+            .lower(),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+    def __reduce__(self):
+        return (_restore_slots, (self.__class__, self._values()))
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def replace(self, **changes) -> "CompiledConfig":
+        """Return a copy of this snapshot with the given fields changed."""
+        values = dict(zip(self.__slots__, self._values()), **changes)
+        return _restore_slots(self.__class__, tuple(values[n] for n in self.__slots__))
+
+
+def _restore_slots(cls, values: tuple):
+    """Rebuild an immutable `__slots__` object, ex. when unpickling."""
+    obj = object.__new__(cls)
+    for name, value in zip(cls.__slots__, values):
+        object.__setattr__(obj, name, value)
+    return obj
+
+
+def _get_bool(config, key: str, default: bool = False) -> bool:
+    """Get a boolean config value from either a `SectionProxy` or a `dict`."""
+    value = config.get(key)
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "yes", "true", "on")
+
+
+class CraftStateCache:
+    """Bounded, expiring cache of the last state emitted as CoT for each aircraft.
+
+    Entries are kept in order of their last emitted event, so both the size bound
+    and the TTL are enforced by popping from the front of the cache.
+    """
+
+    def __init__(  # NOQA pylint: disable=too-many-arguments
+        self,
+        max_size: int = adsbcot.DEFAULT_CRAFT_CACHE_SIZE,
+        ttl: float = adsbcot.DEFAULT_CRAFT_CACHE_TTL,
+        refresh: float = 60.0,
+        min_distance: float = adsbcot.DEFAULT_CHANGE_DISTANCE,
+        min_alt: float = adsbcot.DEFAULT_CHANGE_ALT,
+        min_track: float = adsbcot.DEFAULT_CHANGE_TRACK,
+    ) -> None:
+        """Initialize this class."""
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+        self.refresh: float = refresh
+        self.min_distance: float = min_distance
+        self.min_alt: float = min_alt
+        self.min_track: float = min_track
+        self._states: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    @classmethod
+    def from_config(cls, config) -> "CraftStateCache":
+        """Create a cache using the thresholds given in config."""
+        cot_stale: float = (
+            float(config.get("COT_STALE") or 0) or float(pytak.DEFAULT_COT_STALE)
+        )
+        refresh: float = float(
+            config.get("CHANGE_REFRESH") or adsbcot.DEFAULT_CHANGE_REFRESH
+        )
+        return cls(
+            max_size=int(
+                config.get("CRAFT_CACHE_SIZE") or adsbcot.DEFAULT_CRAFT_CACHE_SIZE
+            ),
+            ttl=float(config.get("CRAFT_CACHE_TTL") or adsbcot.DEFAULT_CRAFT_CACHE_TTL),
+            refresh=cot_stale * refresh,
+            min_distance=float(
+                config.get("CHANGE_DISTANCE") or adsbcot.DEFAULT_CHANGE_DISTANCE
+            ),
+            min_alt=float(config.get("CHANGE_ALT") or adsbcot.DEFAULT_CHANGE_ALT),
+            min_track=float(config.get("CHANGE_TRACK") or adsbcot.DEFAULT_CHANGE_TRACK),
+        )
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Evict entries whose last emitted event is older than the TTL."""
+        now = time.monotonic() if now is None else now
+        expired: int = 0
+        while self._states:
+            state = next(iter(self._states.values()))
+            if now - state[4] <= self.ttl:
+                break
+            self._states.popitem(last=False)
+            expired += 1
+        return expired
+
+    def changed(  # NOQA pylint: disable=too-many-arguments,too-many-return-statements
+        self, icao: str, lat, lon, alt, track, now: Optional[float] = None
+    ) -> bool:
+        """Determine if this aircraft state differs enough from the last emitted."""
+        now = time.monotonic() if now is None else now
+        self.expire(now)
+
+        last = self._states.get(icao)
+        if last is None:
+            return True
+
+        l_lat, l_lon, l_alt, l_track, l_time = last
+        if now - l_time >= self.refresh:
+            return True
+
+        if None in (lat, lon, l_lat, l_lon):
+            if (lat, lon) != (l_lat, l_lon):
+                return True
+        else:
+            d_lat = float(lat) - float(l_lat)
+            d_lon = (float(lon) - float(l_lon)) * math.cos(math.radians(float(lat)))
+            # Equirectangular approximation, plenty at change-detection distances:
+            if math.hypot(d_lat, d_lon) * 111320.0 > self.min_distance:
+                return True
+
+        if _differs(alt, l_alt, self.min_alt):
+            return True
+
+        if None in (track, l_track):
+            return track != l_track
+        d_track = abs((float(track) - float(l_track) + 180.0) % 360.0 - 180.0)
+        return d_track > self.min_track
+
+    def update(  # NOQA pylint: disable=too-many-arguments
+        self, icao: str, lat, lon, alt, track, now: Optional[float] = None
+    ) -> None:
+        """Record the state of an aircraft for which CoT was emitted."""
+        now = time.monotonic() if now is None else now
+        self._states[icao] = (lat, lon, alt, track, now)
+        self._states.move_to_end(icao)
+        while len(self._states) > self.max_size:
+            self._states.popitem(last=False)
+
+
+def _differs(value, last, threshold: float) -> bool:
+    """Compare two numeric-or-not values (ex. alt_baro='ground') with a threshold."""
+    if value == last:
+        return False
+    try:
+        return abs(float(value) - float(last)) > threshold
+    except (TypeError, ValueError):
+        return True
+
+
+class AircraftState:
+    """Last known state of an aircraft, as decoded from Mode S messages."""
+
+    __slots__ = ("icao", "call", "lat", "lon", "alt", "gs", "trk", "seen")
+
+    def __init__(self, icao: str, seen: float) -> None:
+        """Initialize this class."""
+        self.icao: str = icao
+        self.call: Optional[str] = None
+        self.lat: Optional[float] = None
+        self.lon: Optional[float] = None
+        self.alt = None
+        self.gs: Optional[float] = None
+        self.trk: Optional[float] = None
+        self.seen: float = seen
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{self.__class__.__name__}({fields})"
+
+    def values(self) -> dict:
+        """Get the fields of this state that `AircraftTable.update()` takes."""
+        return {field: getattr(self, field) for field in AircraftTable.FIELDS}
+
+    def to_craft(self) -> dict:
+        """Get this state as an aircraft dict, as used by `adsb_to_cot()`."""
+        return {
+            "hex": self.icao,
+            "lat": self.lat,
+            "lon": self.lon,
+            "flight": (self.call or self.icao).replace("_", ""),
+            "alt_geom": self.alt,
+            "gs": self.gs,
+            "trk": self.trk,
+        }
+
+
+class AircraftTable:
+    """Table of the last known state of each aircraft, expiring after a TTL.
+
+    A min-heap holds one (seen, icao) entry per aircraft. Entries are refreshed
+    lazily: when the oldest is popped, it's pushed back with the aircraft's latest
+    `seen`, or the aircraft is evicted if that's older than the TTL. Both the table
+    and heap are therefore bounded by the number of aircraft heard within the TTL.
+    """
+
+    FIELDS: Tuple[str, ...] = ("call", "lat", "lon", "alt", "gs", "trk")
+
+    def __init__(self, ttl: float = adsbcot.DEFAULT_AIRCRAFT_TTL) -> None:
+        """Initialize this class."""
+        self.ttl: float = ttl
+        self.peak: int = 0
+        self.counters: Counter = Counter()
+        self._states: Dict[str, AircraftState] = {}
+        self._heap: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, icao: str) -> bool:
+        return icao in self._states
+
+    def __iter__(self):
+        return iter(list(self._states.values()))
+
+    def get(self, icao: str) -> Optional[AircraftState]:
+        """Get the state of an aircraft, or None if it isn't in the table."""
+        return self._states.get(icao)
+
+    def update(
+        self, icao: str, values: dict, now: Optional[float] = None
+    ) -> AircraftState:
+        """Record an aircraft as heard, updating the fields given in values.
+
+        Fields missing from values, or None, keep their last known value.
+        """
+        now = time.monotonic() if now is None else now
+        state: Optional[AircraftState] = self._states.get(icao)
+        if state is None:
+            state = AircraftState(icao, now)
+            self._states[icao] = state
+            heapq.heappush(self._heap, (now, icao))
+            self.counters["added"] += 1
+            if len(self._states) > self.peak:
+                self.peak = len(self._states)
+        state.seen = now
+        for field in self.FIELDS:
+            value = values.get(field)
+            if value is not None:
+                setattr(state, field, value)
+        return state
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Evict aircraft not heard within the TTL, returns the number evicted."""
+        now = time.monotonic() if now is None else now
+        heap: List[Tuple[float, str]] = self._heap
+        expired: int = 0
+        while heap and now - heap[0][0] > self.ttl:
+            _, icao = heap[0]
+            state: AircraftState = self._states[icao]
+            if now - state.seen > self.ttl:
+                heapq.heappop(heap)
+                del self._states[icao]
+                expired += 1
+            else:
+                heapq.heapreplace(heap, (state.seen, icao))
+        self.counters["expired"] += expired
+        return expired
+
+
+class KnownCraftIndex:
+    """Hash index of a KNOWN_CRAFT database, keyed by HEX, REG & FLIGHT.
+
+    Returns the same rows as `aircot.get_known_craft()`, but in O(1) rather than
+    scanning the whole database for every aircraft.
+    """
+
+    KEYS: Tuple[str, ...] = ("HEX", "REG", "FLIGHT")
+
+    def __init__(self, known_craft_db: Union[list, dict, None]) -> None:
+        """Initialize this class from the output of `aircot.read_known_craft()`."""
+        self._indexes: Dict[str, dict] = {}
+
+        # aircot >= 4 returns its own indexes alongside the rows, older aircot
+        # returns a list of rows:
+        if isinstance(known_craft_db, dict):
+            self.rows: list = known_craft_db.get("rows", [])
+            self._indexes["HEX"] = known_craft_db.get("hex_index", {})
+            self._indexes["REG"] = known_craft_db.get("reg_index", {})
+        else:
+            self.rows = list(known_craft_db or [])
+
+        for key in self.KEYS:
+            if key not in self._indexes:
+                self._indexes[key] = self._build(key)
+
+    def __bool__(self) -> bool:
+        return bool(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def from_file(cls, known_file: str) -> "KnownCraftIndex":
+        """Read a KNOWN_CRAFT CSV (or JSON) file & index it."""
+        return cls(aircot.read_known_craft(known_file))
+
+    def _build(self, key: str) -> dict:
+        index: dict = {}
+        for row in self.rows:
+            value = row.get(key)
+            if value:
+                # First match wins, as with aircot's linear scan:
+                index.setdefault(str(value).strip().upper(), row)
+        return index
+
+    def get(self, value: Optional[str], key: str = "HEX") -> dict:
+        """Get the known craft row whose `key` column matches `value`, or {}."""
+        if not value:
+            return {}
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = self._build(key)
+        return index.get(value.strip().upper(), {})
+
+
+class CraftMerger:
+    """Merge aircraft reports from many feeds, keeping the freshest of each.
+
+    Feed workers `offer()` reports, the merge worker `drain()`s them: each aircraft
+    is emitted at most once per drain, using its most recent report, and reports
+    no newer than one already emitted (ex. the same position from another
+    receiver) are dropped.
+    """
+
+    def __init__(self, horizon: float = adsbcot.DEFAULT_CRAFT_CACHE_TTL) -> None:
+        """Initialize this class."""
+        self.horizon: float = horizon
+        self._pending: Dict[str, tuple] = {}
+        self._emitted: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def offer(self, icao: str, craft: dict, source, report_time: float) -> bool:
+        """Offer an aircraft report, returns True if it's the freshest yet."""
+        emitted = self._emitted.get(icao)
+        if emitted is not None and report_time <= emitted:
+            return False
+        pending = self._pending.get(icao)
+        if pending is not None and report_time <= pending[0]:
+            return False
+        self._pending[icao] = (report_time, craft, source)
+        return True
+
+    def drain(self) -> List[tuple]:
+        """Take the freshest pending report of each aircraft, as (craft, source)."""
+        pending, self._pending = self._pending, {}
+        for icao, (report_time, _, _) in pending.items():
+            self._emitted[icao] = report_time
+
+        # Forget aircraft we haven't heard from in a while:
+        oldest: float = time.time() - self.horizon
+        if len(self._emitted) > len(pending):
+            self._emitted = {
+                icao: report_time
+                for icao, report_time in self._emitted.items()
+                if report_time > oldest
+            }
+
+        return [(craft, source) for (_, craft, source) in pending.values()]
+
+
+# Exceptions from a feed that are retried, rather than stopping its worker.
+FEED_ERRORS: Tuple[type, ...] = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    json.JSONDecodeError,
+)
+
+
+class PollScheduler:
+    """Schedule feed polls on fixed deadlines, adapting to the feed's update rate.
+
+    Each deadline is the previous deadline plus the interval, rather than the end
+    of the previous poll plus the interval, so fetch & processing time don't add
+    to the period. Polls that overrun a deadline skip the missed slots.
+
+    Within [`min_interval`, `max_interval`], the interval tracks half the observed
+    period between feed changes, and grows by `backoff` each time a poll returns
+    unchanged data.
+    """
+
+    def __init__(  # NOQA pylint: disable=too-many-arguments
+        self,
+        interval: float,
+        min_interval: Optional[float] = None,
+        max_interval: Optional[float] = None,
+        backoff: float = adsbcot.DEFAULT_POLL_BACKOFF,
+        clock=time.monotonic,
+    ) -> None:
+        """Initialize this class."""
+        if interval <= 0:
+            raise ValueError(f"Poll interval must be positive, got: {interval}")
+        self.min_interval: float = min(min_interval or interval, interval)
+        self.max_interval: float = max(max_interval or interval, interval)
+        self.interval: float = interval
+        self.backoff: float = backoff
+        self.clock = clock
+        self.cadence: Optional[float] = None
+        self.overruns: int = 0
+        self.deadline: float = clock()
+        self._last_change: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config) -> "PollScheduler":
+        """Create a scheduler using the POLL_INTERVAL* options given in config."""
+        interval: float = float(
+            config.get("POLL_INTERVAL") or adsbcot.DEFAULT_POLL_INTERVAL
+        )
+        min_interval = config.get("POLL_INTERVAL_MIN")
+        max_interval = config.get("POLL_INTERVAL_MAX")
+        return cls(
+            interval,
+            min_interval=float(min_interval) if min_interval else None,
+            max_interval=float(max_interval) if max_interval else None,
+            backoff=float(config.get("POLL_BACKOFF") or adsbcot.DEFAULT_POLL_BACKOFF),
+        )
+
+    @property
+    def adaptive(self) -> bool:
+        """True if the interval may vary."""
+        return self.min_interval < self.max_interval
+
+    def update(self, changed: Optional[bool]) -> float:
+        """Record a poll's outcome and schedule the next, returns the new deadline.
+
+        `changed` is True if the feed returned new data, False if it returned the
+        same data as last poll, or None if the poll failed.
+        """
+        now: float = self.clock()
+
+        if self.adaptive and changed is not None:
+            if changed:
+                if self._last_change is not None:
+                    period: float = now - self._last_change
+                    self.cadence = (
+                        period
+                        if self.cadence is None
+                        else 0.75 * self.cadence + 0.25 * period
+                    )
+                    self.interval = self.cadence / 2
+                self._last_change = now
+            else:
+                self.interval *= self.backoff
+            self.interval = min(
+                max(self.interval, self.min_interval), self.max_interval
+            )
+
+        self.deadline += self.interval
+        if self.deadline < now:
+            missed: int = math.ceil((now - self.deadline) / self.interval)
+            self.deadline += missed * self.interval
+            self.overruns += missed
+        return self.deadline
+
+    def postpone(self, delay: float) -> float:
+        """Put the next deadline at least `delay` seconds from now."""
+        self.deadline = max(self.deadline, self.clock() + delay)
+        return self.deadline
+
+    async def wait(self) -> None:
+        """Sleep until the next deadline."""
+        delay: float = self.deadline - self.clock()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class CircuitBreaker:
+    """Back off from a failing feed, and stop polling it after repeated failures.
+
+    Each consecutive failure doubles the retry delay, from `base_delay` up to
+    `max_delay`, with jitter. After `threshold` consecutive failures the circuit
+    opens and polling pauses for `timeout`; the next poll is a trial, which
+    closes the circuit if it succeeds or re-opens it if it fails. A Retry-After
+    given by the feed is honored whenever it's longer than the computed delay.
+    """
+
+    CLOSED: str = "closed"
+    OPEN: str = "open"
+    HALF_OPEN: str = "half-open"
+
+    def __init__(  # NOQA pylint: disable=too-many-arguments
+        self,
+        base_delay: float = 1.0,
+        max_delay: float = adsbcot.DEFAULT_RETRY_MAX_DELAY,
+        threshold: int = adsbcot.DEFAULT_BREAKER_THRESHOLD,
+        timeout: float = adsbcot.DEFAULT_BREAKER_TIMEOUT,
+        rng=random.random,
+    ) -> None:
+        """Initialize this class."""
+        self.base_delay: float = base_delay
+        self.max_delay: float = max(max_delay, base_delay)
+        self.threshold: int = threshold
+        self.timeout: float = timeout
+        self.rng = rng
+        self.state: str = self.CLOSED
+        self.failures: int = 0
+
+    @classmethod
+    def from_config(cls, config) -> "CircuitBreaker":
+        """Create a breaker using the RETRY_* & BREAKER_* options given in config."""
+        return cls(
+            base_delay=float(
+                config.get("POLL_INTERVAL") or adsbcot.DEFAULT_POLL_INTERVAL
+            ),
+            max_delay=float(
+                config.get("RETRY_MAX_DELAY") or adsbcot.DEFAULT_RETRY_MAX_DELAY
+            ),
+            threshold=int(
+                config.get("BREAKER_THRESHOLD") or adsbcot.DEFAULT_BREAKER_THRESHOLD
+            ),
+            timeout=float(
+                config.get("BREAKER_TIMEOUT") or adsbcot.DEFAULT_BREAKER_TIMEOUT
+            ),
+        )
+
+    def attempt(self) -> None:
+        """Note the start of a poll, which is a trial if the circuit is open."""
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+
+    def success(self) -> str:
+        """Record a successful poll, returns the state the circuit was in."""
+        state, self.state = self.state, self.CLOSED
+        self.failures = 0
+        return state
+
+    def failure(self, retry_after: Optional[float] = None) -> float:
+        """Record a failed poll, returns the delay, in seconds, before the next."""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            self.state = self.OPEN
+            delay: float = self.timeout
+        else:
+            delay = min(self.base_delay * 2 ** (self.failures - 1), self.max_delay)
+            # "Equal jitter": keep half the delay, randomize the other half.
+            delay = delay / 2 + self.rng() * delay / 2
+        return max(delay, retry_after or 0.0)
+
+
+async def _read_chunks(feed_fd) -> AsyncIterator[bytes]:
+    """Read a file in chunks, as an async iterator."""
+    while 1:
+        chunk: bytes = feed_fd.read(adsbcot.DEFAULT_STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _file_crc32(feed_fd) -> int:
+    """Get the CRC-32 of a file's content, read in chunks."""
+    digest: int = 0
+    while 1:
+        chunk: bytes = feed_fd.read(adsbcot.DEFAULT_STREAM_CHUNK_SIZE)
+        if not chunk:
+            return digest
+        digest = zlib.crc32(chunk, digest)
+
+
+async def _view_chunks(feed_data: memoryview) -> AsyncIterator[memoryview]:
+    """Slice a buffer (ex. an mmap'd file) into chunks, as an async iterator."""
+    for start in range(0, len(feed_data), adsbcot.DEFAULT_STREAM_CHUNK_SIZE):
+        yield feed_data[start : start + adsbcot.DEFAULT_STREAM_CHUNK_SIZE]
+
+
+async def _tee_chunks(
+    chunks: AsyncIterator[bytes], sink: bytearray
+) -> AsyncIterator[bytes]:
+    """Pass chunks through, while appending a copy of each to sink."""
+    async for chunk in chunks:
+        sink += chunk
+        yield chunk
+
+
+class Histogram:
+    """Count observed values into buckets, as a Prometheus histogram.
+
+    Each observation is a bisection & three additions, cheap enough to leave on.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        """Initialize this class, with the upper bounds of the buckets."""
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        # Observations in each bucket, not cumulative, and above the last:
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float, count: int = 1) -> None:
+        """Observe a value, count times (ex. the mean time of a batch's items)."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += count
+        self.count += count
+        self.sum += value * count
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Get the upper bound & cumulative count of each bucket, ending at +Inf."""
+        total: int = 0
+        bounds: List[Tuple[float, int]] = []
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            bounds.append((bound, total))
+        return bounds
+
+
+class FeedRecorder:
+    """Append everything feeds receive to a capture file, see `FeedReplayer`.
+
+    A capture is `MAGIC`, then records of a monotonic timestamp (nanoseconds),
+    channel, length & data. A channel is a feed's kind (tcp, http, file or ws) &
+    URL, defined the first time it's recorded by a record on channel 0, whose data
+    is the channel number, kind & URL. Recording again to a capture appends to it.
+    """
+
+    MAGIC: bytes = b"ADSBCOT\x01"
+    RECORD: struct.Struct = struct.Struct("<QHI")
+    CHANNEL: struct.Struct = struct.Struct("<H")
+    KINDS: Tuple[str, ...] = ("tcp", "http", "file", "ws")
+    FLUSH_INTERVAL: float = 1.0  # seconds
+
+    def __init__(self, path: str, clock=time.monotonic_ns) -> None:
+        """Initialize this class, opening the capture file for appending."""
+        self.path: str = path
+        self.clock = clock
+        self.counters: Counter = Counter()
+        self._channels: Dict[Tuple[str, str], int] = {}
+        self._flushed: float = time.monotonic()
+        self._file = open(path, "ab")  # NOQA pylint: disable=consider-using-with
+        if self._file.tell() == 0:
+            self._file.write(self.MAGIC)
+
+    def record(self, kind: str, url: str, data: Union[bytes, str, memoryview]):
+        """Append data received by a feed to the capture."""
+        if isinstance(data, str):
+            data = data.encode()
+        timestamp: int = self.clock()
+        key: Tuple[str, str] = (kind, str(url))
+        channel: Optional[int] = self._channels.get(key)
+        if channel is None:
+            channel = len(self._channels) + 1
+            self._channels[key] = channel
+            self._write(
+                timestamp, 0, self.CHANNEL.pack(channel) + f"{kind} {url}".encode()
+            )
+        self._write(timestamp, channel, data)
+        self.counters["capture_records"] += 1
+        self.counters["capture_bytes"] += len(data)
+
+        if time.monotonic() - self._flushed > self.FLUSH_INTERVAL:
+            self.flush()
+
+    def _write(self, timestamp: int, channel: int, data) -> None:
+        self._file.write(self.RECORD.pack(timestamp, channel, len(data)))
+        self._file.write(data)
+
+    def flush(self) -> None:
+        """Flush records to the capture file."""
+        self._flushed = time.monotonic()
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self) -> None:
+        """Flush & close the capture file."""
+        self.flush()
+        self._file.close()
+
+
+class FeedReplayer:
+    """Read the records of a capture written by `FeedRecorder`."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize this class."""
+        self.path: str = path
+
+    def __iter__(self):
+        """Iterate over the (timestamp, kind, URL, data) of each record."""
+        channels: Dict[int, Tuple[str, str]] = {}
+        for timestamp, channel, data in self._records():
+            if channel == 0:
+                number, kind, url = self._channel(data)
+                channels[number] = (kind, url)
+                continue
+            kind, url = channels[channel]
+            yield timestamp, kind, url, data
+
+    def feeds(self) -> List[Tuple[str, str]]:
+        """Get the (kind, URL) of each feed in the capture, in order of appearance."""
+        feeds: List[Tuple[str, str]] = []
+        for _, channel, data in self._records():
+            if channel == 0:
+                _, kind, url = self._channel(data)
+                if (kind, url) not in feeds:
+                    feeds.append((kind, url))
+        return feeds
+
+    @staticmethod
+    def _channel(data: bytes) -> Tuple[int, str, str]:
+        """Decode a channel definition: its number, kind & URL."""
+        kind, _, url = data[FeedRecorder.CHANNEL.size :].decode().partition(" ")
+        return FeedRecorder.CHANNEL.unpack_from(data)[0], kind, url
+
+    def _records(self):
+        header: struct.Struct = FeedRecorder.RECORD
+        with open(self.path, "rb") as capture:
+            if capture.read(len(FeedRecorder.MAGIC)) != FeedRecorder.MAGIC:
+                raise ValueError(f"Not an adsbcot capture: {self.path}")
+            while 1:
+                head: bytes = capture.read(header.size)
+                if len(head) < header.size:
+                    break
+                timestamp, channel, length = header.unpack(head)
+                data: bytes = capture.read(length)
+                if len(data) < length:  # Truncated by a crash while recording.
+                    break
+                yield timestamp, channel, data
+
+
+class AircraftStreamParser:
+    """Incrementally parse the `aircraft` (or `ac`) array of an aircraft JSON feed.
+
+    `feed()` the document in chunks as they're read, and get back each aircraft
+    whose object is complete, without holding the whole document (or every
+    aircraft) in memory. Other members of the document are skipped.
+    """
+
+    ARRAY_START = re.compile(r'"(?:aircraft|ac)"\s*:\s*\[')
+    SEPARATOR = re.compile(r"[\s,]*")
+
+    def __init__(self) -> None:
+        """Initialize this class."""
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer: str = ""
+        self._pos: int = 0
+        self.found: bool = False
+        self.done: bool = False
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[dict]:
+        """Parse a chunk of the document, returns the aircraft completed by it.
+
+        Raises `json.JSONDecodeError` if, once `final`, the array is unterminated.
+        """
+        if self.done:
+            return []
+
+        buffer: str = self._buffer[self._pos :] + self._decoder.decode(chunk, final)
+        pos: int = 0
+        crafts: List[dict] = []
+
+        if not self.found:
+            match = self.ARRAY_START.search(buffer)
+            if match is None:
+                # Keep enough to match a key that's split between chunks:
+                self._buffer, self._pos = buffer[-64:], 0
+                return crafts
+            self.found = True
+            pos = match.end()
+
+        while 1:
+            pos = self.SEPARATOR.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                self.done = True
+                break
+            try:
+                craft, pos = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # Incomplete, wait for the next chunk.
+            crafts.append(craft)
+
+        self._buffer, self._pos = buffer, pos
+        if final and self.found and not self.done:
+            raise json.JSONDecodeError("Unterminated aircraft array", buffer, pos)
+        return crafts
+
+
 class ADSBWorker(pytak.QueueWorker):
     """Process ADS-B data from various sources, convert to CoT, and enqueue for transmission."""
 
-    def __init__(self, queue, config) -> None:
+    # Upper bounds, in seconds, of the histogram buckets of poll durations & of the
+    # time to serialize each aircraft as CoT:
+    POLL_BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    SERIALIZE_BUCKETS: Tuple[float, ...] = (
+        0.00001,
+        0.000025,
+        0.00005,
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.0025,
+    )
+
+    def __init__(
+        self,
+        queue,
+        config,
+        feed_url: Optional[str] = None,
+        merger: Optional[CraftMerger] = None,
+    ) -> None:
         """Initialize this class."""
         super().__init__(queue, config)
-        self.known_craft_db: Optional[dict] = None
+        self.known_craft_db: Optional[KnownCraftIndex] = None
         self.session: Optional[aiohttp.ClientSession] = None
+        self.http_validators: Dict[str, dict] = {}
+        self.feed_digests: Dict[str, int] = {}
+        self.file_ids: Dict[str, tuple] = {}
+        self.counters: Counter = Counter()
+        self.histograms: Dict[str, Histogram] = {
+            "poll_duration_seconds": Histogram(self.POLL_BUCKETS),
+            "serialize_seconds": Histogram(self.SERIALIZE_BUCKETS),
+        }
+        self.breaker: CircuitBreaker = CircuitBreaker.from_config(self.config)
         self.uid_key: str = self.config.get("UID_KEY", "ICAO")
+        self.feed_url: Optional[str] = feed_url or self.config.get("FEED_URL")
+        self.merger: Optional[CraftMerger] = merger
+        self.settings: CompiledConfig = CompiledConfig(self.config).replace(
+            feed_url=self.feed_url or ""
+        )
+        self.batch_size: int = int(
+            self.config.get("BATCH_SIZE") or adsbcot.DEFAULT_BATCH_SIZE
+        )
+        self.stream_json: bool = _get_bool(
+            self.config, "STREAM_JSON", adsbcot.DEFAULT_STREAM_JSON
+        )
+        self.json_loads = adsbcot.get_json_loads(self.config.get("JSON_CODEC"))
+        self.file_mmap: bool = _get_bool(
+            self.config, "FILE_MMAP", adsbcot.DEFAULT_FILE_MMAP
+        )
+        self.file_watch: str = str(
+            self.config.get("FILE_WATCH") or adsbcot.DEFAULT_FILE_WATCH
+        ).lower()
+        self.file_debounce: float = float(
+            self.config.get("FILE_DEBOUNCE") or adsbcot.DEFAULT_FILE_DEBOUNCE
+        )
         self.altitudes: dict = {}
+        self.recorder: Optional[FeedRecorder] = adsbcot.get_recorder(
+            self.config.get("CAPTURE_FILE")
+        )
+
+        self.craft_cache: Optional[CraftStateCache] = None
+        if _get_bool(
+            self.config, "SUPPRESS_UNCHANGED", adsbcot.DEFAULT_SUPPRESS_UNCHANGED
+        ):
+            self.craft_cache = CraftStateCache.from_config(self.config)
 
         known_craft = self.config.get("KNOWN_CRAFT")
         if known_craft and os.path.exists(known_craft):
             self._logger.info("Using KNOWN_CRAFT: %s", known_craft)
-            self.known_craft_db = aircot.read_known_craft(known_craft)
+            self.known_craft_db = KnownCraftIndex.from_file(known_craft)
+        else:
+            known_craft = None
+        self.known_craft: Optional[str] = known_craft
+
+        self.pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.pool_threshold: int = int(
+            self.config.get("POOL_THRESHOLD") or adsbcot.DEFAULT_POOL_THRESHOLD
+        )
+        self.pool_chunk_size: int = int(
+            self.config.get("POOL_CHUNK_SIZE") or adsbcot.DEFAULT_POOL_CHUNK_SIZE
+        )
+        self.pool_workers: int = int(
+            self.config.get("POOL_WORKERS") or adsbcot.DEFAULT_POOL_WORKERS
+        )
+        if self.pool_workers > 0:
+            self._logger.info(
+                "Using %s pool workers for more than %s aircraft.",
+                self.pool_workers,
+                self.pool_threshold,
+            )
+            self.pool = self.start_pool()
+
+    def start_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Start the process pool, whose processes each load KNOWN_CRAFT.
+
+        Processes are started on first use.
+        """
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.pool_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=adsbcot.functions.init_pool_worker,
+            initargs=(self.settings, self.known_craft),
+        )
+
+    def restart_pool(
+        self, pool: concurrent.futures.ProcessPoolExecutor, exc: Exception
+    ) -> None:
+        """Replace a broken process pool, unless it's already been replaced."""
+        if self.pool is not pool:
+            return
+        self._logger.error("Process pool failed, restarting: %s", exc)
+        self.counters["pool_restarts"] += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self.start_pool()
 
     async def handle_data(self, data: Union[list, dict]) -> None:
         """Handle Data from ADS-B receiver: Render to CoT, put on TX queue."""
@@ -80,20 +1054,127 @@ class ADSBWorker(pytak.QueueWorker):
             self._logger.warning("Empty aircraft list")
             return
 
+        if self.merger is not None:
+            self.merge_data(data if isinstance(data, list) else [data])
+            return
+
         if isinstance(data, list):
+            if self.pool is not None and len(data) > self.pool_threshold:
+                await self.handle_data_pool(data)
+                return
+
             lod = len(data)
-            i = 1
-            for craft in data:
-                i += 1
-                icao = await self.process_craft(craft)
-                self._logger.debug("Handling %s/%s ICAO: %s", i, lod, icao)
+            # Convert in batches, yielding between them so large polls don't block
+            # the event loop:
+            for start in range(0, lod, self.batch_size):
+                crafts = [
+                    craft
+                    for craft in data[start : start + self.batch_size]
+                    if self.filter_craft(craft)
+                ]
+                started: float = time.perf_counter()
+                events = adsbcot.adsb_to_cot_batch(
+                    crafts, self.settings, self.known_craft_db
+                )
+                self.count_serialized(
+                    len(crafts), len(events), time.perf_counter() - started
+                )
+                await self.put_queue_batch(events)
+                self._logger.debug(
+                    "Handled %s/%s aircraft: %s CoT Events",
+                    min(start + self.batch_size, lod),
+                    lod,
+                    len(events),
+                )
+                await asyncio.sleep(0)
         elif isinstance(data, dict):
             # Handle a single aircraft data dictionary
             icao = await self.process_craft(data)
             self._logger.debug("Handling ICAO: %s", icao)
 
-    async def process_craft(self, craft: dict) -> Optional[str]:
-        """Process a single aircraft data dictionary.
+    def merge_data(self, data: list) -> None:
+        """Offer aircraft to the cross-feed merge stage, rather than converting."""
+        now: float = time.time()
+        offered: int = 0
+        for craft in data:
+            accepted = self.filter_craft(craft)
+            if accepted is None:
+                continue
+            report_time: float = now - float(
+                craft.get("seen_pos", craft.get("seen", craft.get("Age"))) or 0
+            )
+            if self.merger.offer(accepted[0], craft, self, report_time):
+                offered += 1
+        self._logger.debug("Offered %s/%s aircraft to merge", offered, len(data))
+
+    async def handle_data_pool(self, data: list) -> None:
+        """Convert a large aircraft list to CoT in the process pool.
+
+        Aircraft are filtered here, as filtering depends on this worker's state,
+        then serialized in chunks across the pool. Events are enqueued in the same
+        order as the aircraft list. If the pool breaks, it's restarted, and the
+        chunks it didn't serialize are serialized here.
+        """
+        loop = asyncio.get_running_loop()
+        chunks: list = []
+        for start in range(0, len(data), self.pool_chunk_size):
+            crafts = [
+                craft
+                for craft in data[start : start + self.pool_chunk_size]
+                if self.filter_craft(craft)
+            ]
+            if crafts:
+                pool = self.pool
+                future: Optional[asyncio.Future] = None
+                try:
+                    future = loop.run_in_executor(
+                        pool, adsbcot.functions.pool_adsb_to_cot_batch, crafts
+                    )
+                except concurrent.futures.BrokenExecutor as exc:
+                    self.restart_pool(pool, exc)
+                chunks.append((crafts, pool, future))
+            await asyncio.sleep(0)
+
+        for crafts, pool, future in chunks:
+            events: Optional[List[bytes]] = None
+            if future is not None:
+                try:
+                    events, elapsed = await future
+                except concurrent.futures.BrokenExecutor as exc:
+                    self.restart_pool(pool, exc)
+            if events is None:
+                started: float = time.perf_counter()
+                events = adsbcot.adsb_to_cot_batch(
+                    crafts, self.settings, self.known_craft_db
+                )
+                elapsed = time.perf_counter() - started
+            self.count_serialized(len(crafts), len(events), elapsed)
+            await self.put_queue_batch(events)
+
+        self._logger.debug("Handled %s aircraft in process pool", len(data))
+
+    async def put_queue_batch(self, events: List[bytes]) -> None:
+        """Put many CoT Events onto the TX queue, only awaiting when it's full."""
+        for event in events:
+            if self.queue.full():
+                await self.put_queue(event)
+            else:
+                self.queue.put_nowait(event)
+        self.counters["cot_events"] += len(events)
+        self.counters["cot_bytes"] += sum(map(len, events))
+
+    def count_serialized(self, crafts: int, events: int, elapsed: float) -> None:
+        """Count aircraft serialized as CoT, observing the mean time each took.
+
+        Aircraft that couldn't be serialized had no position.
+        """
+        if crafts:
+            self.histograms["serialize_seconds"].observe(elapsed / crafts, crafts)
+        self.counters["filtered_no_position"] += crafts - events
+
+    def filter_craft(self, craft: dict) -> Optional[Tuple[str, dict]]:
+        """Determine if an aircraft should be converted to CoT.
+
         Parameters
         ----------
         craft : `dict`
@@ -101,43 +1182,44 @@ class ADSBWorker(pytak.QueueWorker):
 
         Returns
         -------
-        Optional[str]
-            The ICAO code of the aircraft, or None if not found.
+        Optional[Tuple[str, dict]]
+            The ICAO code & known craft data of the aircraft, or None if filtered.
         """
+        counters: Counter = self.counters
+        counters["aircraft"] += 1
         if not isinstance(craft, dict):
+            counters["filtered_invalid"] += 1
             self._logger.warning("Aircraft list item was not a Python `dict`.")
             return None
 
-        icao: Union[str, None] = None
-        icao_int: str = craft.get("Icao_addr", "")  # Stratux: 24-bit ICAO address
-        if icao_int:
-            icao = aircot.icao_int_to_hex(icao_int)
-        else:
-            icao = craft.get("hex", craft.get("icao", ""))
-
-        if icao:
-            icao = icao.strip().upper()
-        else:
+        icao: str = adsbcot.get_craft_icao(craft)
+        if not icao:
+            counters["filtered_invalid"] += 1
             self._logger.warning("No ICAO code found in craft data.")
             return None
 
         if "~" in icao:
-            if not self.config.getboolean("INCLUDE_TISB"):
+            if not self.settings.include_tisb:
+                counters["filtered_tisb"] += 1
                 self._logger.debug("Skipping TIS-B data: %s", icao)
                 return None
         else:
-            if self.config.getboolean("TISB_ONLY"):
+            if self.settings.tisb_only:
+                counters["filtered_not_tisb"] += 1
                 self._logger.debug("Skipping non-TIS-B data: %s", icao)
                 return None
 
-        known_craft: dict = aircot.get_known_craft(self.known_craft_db, icao, "HEX")
+        known_craft: dict = (
+            self.known_craft_db.get(icao, "HEX") if self.known_craft_db else {}
+        )
 
         # Skip if we're using known_craft CSV and this Craft isn't found:
         if (
             self.known_craft_db
             and not known_craft
-            and not self.config.getboolean("INCLUDE_ALL_CRAFT")
+            and not self.settings.include_all_craft
         ):
+            counters["filtered_unknown"] += 1
             self._logger.debug("Skipping unknown craft: %s", icao)
             return None
 
@@ -148,13 +1230,53 @@ class ADSBWorker(pytak.QueueWorker):
             self._logger.debug("No altitude data for craft: %s", icao)
             return None
 
-        event: Optional[bytes] = adsbcot.adsb_to_cot(craft, self.config, known_craft)
+        alt_geom = craft.get("alt_geom")
+        if alt_geom and (
+            (self.settings.alt_upper and alt_geom > self.settings.alt_upper)
+            or (self.settings.alt_lower and alt_geom < self.settings.alt_lower)
+        ):
+            counters["filtered_altitude"] += 1
+            self._logger.debug("Skipping craft outside ALT_UPPER/LOWER: %s", icao)
+            return None
+
+        if self.craft_cache is not None:
+            state = adsbcot.get_craft_state(craft)
+            if not self.craft_cache.changed(icao, *state):
+                counters["filtered_unchanged"] += 1
+                self._logger.debug("Skipping unchanged craft: %s", icao)
+                return None
+            self.craft_cache.update(icao, *state)
+
+        return icao, known_craft
+
+    async def process_craft(self, craft: dict) -> Optional[str]:
+        """Process a single aircraft data dictionary.
+        Parameters
+        ----------
+        craft : `dict`
+            Dictionary containing aircraft data.
+
+        Returns
+        -------
+        Optional[str]
+            The ICAO code of the aircraft, or None if not found.
+        """
+        accepted = self.filter_craft(craft)
+        if accepted is None:
+            return None
+        icao, known_craft = accepted
+
+        started: float = time.perf_counter()
+        event: Optional[bytes] = adsbcot.adsb_to_cot(
+            craft, self.settings, known_craft
+        )
+        self.count_serialized(1, 1 if event else 0, time.perf_counter() - started)
 
         if not event:
             self._logger.debug("Empty COT Event for craft=%s", craft)
             return None
 
-        await self.put_queue(event)
+        await self.put_queue_batch([event])
         return icao
 
     def calc_altitude(self, craft: dict) -> dict:
@@ -182,11 +1304,15 @@ class ADSBWorker(pytak.QueueWorker):
 
         return {}
 
-    async def get_feed(self, url: bytes) -> None:
-        """Poll the ADS-B feed and pass data to the data handler."""
+    async def get_feed(self, url: bytes) -> Optional[bool]:
+        """Poll the ADS-B feed and pass data to the data handler.
+
+        Returns True if the feed changed since the last poll, False if it didn't,
+        or None if it couldn't be polled.
+        """
         if self.session is None or self.session.closed:
             self._logger.error("Session is closed, cannot proceed.")
-            return
+            return None
 
         url_b = str(url)
 
@@ -202,58 +1328,197 @@ class ADSBWorker(pytak.QueueWorker):
                 ),
             }
 
+        # Conditional GET: only download the feed if it's changed since last poll.
+        headers["Accept-Encoding"] = "gzip, deflate"
+        validators: dict = self.http_validators.get(url_b, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        self.counters["http_requests"] += 1
         async with self.session.get(url_b, headers=headers) as resp:
+            if resp.status == 304:
+                self.counters["http_not_modified"] += 1
+                self.counters["http_bytes_saved"] += validators.get("size", 0)
+                self._logger.debug("Feed not modified: %s", url)
+                return False
+
             if resp.status != 200:
                 response_content = await resp.text()
                 self._logger.error("Received HTTP Status %s for %s", resp.status, url)
-                self._logger.error(response_content)
-                return
+                self._logger.debug(response_content[:500])
+                # Errors are raised for poll() to back off:
+                resp.raise_for_status()
+                return None
 
-            json_resp = await resp.json(content_type=None)
+            if self.stream_json:
+                chunks = resp.content.iter_chunked(adsbcot.DEFAULT_STREAM_CHUNK_SIZE)
+                recorded: bytearray = bytearray()
+                if self.recorder is not None:
+                    chunks = _tee_chunks(chunks, recorded)
+                count, size = await self.stream_data(chunks)
+                self.record("http", url_b, recorded)
+                self.count_http_body(url_b, resp, size)
+                self._logger.info(
+                    "Retrieved %s ADS-B aircraft messages.", str(count or "No")
+                )
+                # Aircraft were converted as they were read, before the body could
+                # be compared to the last, so only a 304 is reported as unchanged:
+                return True
+
+            body: bytes = await resp.read()
+            self.record("http", url_b, body)
+            self.count_http_body(url_b, resp, len(body))
+            if not self.feed_changed(url_b, hash(body)):
+                self._logger.debug("Feed unchanged: %s", url)
+                return False
+
+            json_resp = self.json_loads(body) if body else None
             if json_resp is None:
                 self._logger.debug("Empty JSON response from %s", url)
-                return
+                return True
 
             data = json_resp.get("aircraft", json_resp.get("ac"))
             if data is None:
                 self._logger.debug("No aircraft data returned from %s", url)
-                return
+                return True
 
             self._logger.info(
                 "Retrieved %s ADS-B aircraft messages.", str(len(data) or "No")
             )
             await self.handle_data(data)
+            return True
 
-    async def get_file_feed(self, feed_url: ParseResultBytes) -> None:
-        """Read data from an aircraft JSON file."""
-        jdata: dict = {}
-        feed_data: str = ""
+    async def stream_data(self, chunks: AsyncIterator[bytes]) -> Tuple[int, int]:
+        """Parse an aircraft JSON document as it's read, handling aircraft in batches.
 
-        with open(feed_url.path, "r", encoding="UTF-8") as feed_fd:
-            feed_data = feed_fd.read()
+        Returns the number of aircraft & the size of the document.
+        """
+        parser: AircraftStreamParser = AircraftStreamParser()
+        count: int = 0
+        size: int = 0
+        batch: List[dict] = []
+
+        async for chunk in chunks:
+            size += len(chunk)
+            batch.extend(parser.feed(chunk))
+            if len(batch) >= self.batch_size:
+                count += len(batch)
+                await self.handle_data(batch)
+                batch = []
+
+        batch.extend(parser.feed(b"", final=True))
+        if batch:
+            count += len(batch)
+            await self.handle_data(batch)
+        return count, size
+
+    def feed_changed(self, url: str, digest: int) -> bool:
+        """Determine if a feed's digest differs from that of the last one read."""
+        changed: bool = self.feed_digests.get(url) != digest
+        self.feed_digests[url] = digest
+        if not changed:
+            self.counters["feed_unchanged"] += 1
+        return changed
+
+    def count_http_body(self, url: str, resp: aiohttp.ClientResponse, size: int):
+        """Remember a response's validators, and count the bytes compression saved."""
+        self.http_validators[url] = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "size": size,
+        }
+
+        # Content-Length is the size on the wire, before decompression:
+        wire_size: int = size
+        if resp.headers.get("Content-Encoding") and resp.content_length is not None:
+            wire_size = resp.content_length
+        self.counters["http_bytes_received"] += wire_size
+        self.counters["http_bytes_saved"] += max(size - wire_size, 0)
+
+    async def get_file_feed(self, feed_url: ParseResultBytes) -> Optional[bool]:
+        """Read data from an aircraft JSON file.
+
+        Returns True if the file changed since it was last read, otherwise False.
+        A file whose inode, size & mtime are unchanged isn't read again, and a file
+        whose content is unchanged isn't parsed again.
+        """
+        path: str = str(feed_url.path)
+        stat = os.stat(path)
+        file_id: tuple = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if self.file_ids.get(path) == file_id:
+            self.counters["feed_unchanged"] += 1
+            self._logger.debug("Feed unchanged: %s", path)
+            return False
+        self.file_ids[path] = file_id
+
+        with open(path, "rb") as feed_fd:
+            if self.file_mmap and stat.st_size:
+                with mmap.mmap(
+                    feed_fd.fileno(), 0, access=mmap.ACCESS_READ
+                ) as feed_map, memoryview(feed_map) as feed_data:
+                    self.record("file", self.feed_url, feed_data)
+                    return await self.handle_file_data(path, feed_data)
+
+            if self.stream_json:
+                # The file is hashed before it's parsed, then read again if changed:
+                if not self.feed_changed(path, _file_crc32(feed_fd)):
+                    self._logger.debug("Feed unchanged: %s", path)
+                    return False
+                feed_fd.seek(0)
+                chunks = _read_chunks(feed_fd)
+                recorded: bytearray = bytearray()
+                if self.recorder is not None:
+                    chunks = _tee_chunks(chunks, recorded)
+                count, _ = await self.stream_data(chunks)
+                self.record("file", self.feed_url, recorded)
+                self._logger.info(
+                    "Retrieved %s ADS-B aircraft messages.", str(count or "No")
+                )
+                return True
 
+            feed_data: bytes = feed_fd.read()
+            self.record("file", self.feed_url, feed_data)
+            return await self.handle_file_data(path, feed_data)
+
+    async def handle_file_data(self, path: str, feed_data) -> bool:
+        """Parse & handle the content of an aircraft JSON file, if it's changed."""
         if not feed_data:
-            self._logger.info("No data returned from FEED_URL=%s", feed_url.path)
-            return
+            self._logger.info("No data returned from FEED_URL=%s", path)
+            return False
 
-        jdata = json.loads(feed_data)
+        if not self.feed_changed(path, zlib.crc32(feed_data)):
+            self._logger.debug("Feed unchanged: %s", path)
+            return False
 
-        data = jdata.get("aircraft", jdata.get("ac"))
-        if not data:
+        if self.stream_json:
+            count, _ = await self.stream_data(_view_chunks(feed_data))
             self._logger.info(
-                "No aircraft data returned from FEED_URL=%s", feed_url.path
+                "Retrieved %s ADS-B aircraft messages.", str(count or "No")
             )
-            return
+            return True
+
+        # The json module can't decode a memoryview (of an mmap), orjson can:
+        if isinstance(feed_data, memoryview) and self.json_loads is json.loads:
+            feed_data = feed_data.tobytes()
+        jdata: dict = self.json_loads(feed_data)
+
+        data = jdata.get("aircraft", jdata.get("ac"))
+        if not data:
+            self._logger.info("No aircraft data returned from FEED_URL=%s", path)
+            return True
 
         self._logger.info(
             "Retrieved %s ADS-B aircraft messages.", str(len(data) or "No")
         )
         await self.handle_data(data)
+        return True
 
     async def run(self, _=-1) -> None:
         """Run this Thread, Reads from Pollers."""
 
-        url: Optional[bytes] = self.config.get("FEED_URL")
+        url: Optional[bytes] = self.feed_url
         if not url or url == "":
             raise ValueError("Please specify a FEED_URL.")
 
@@ -268,14 +1533,15 @@ class ADSBWorker(pytak.QueueWorker):
         self._logger.info(
             "Running %s at %ss for %s", self.__class__, poll_interval, url
         )
+        scheduler: PollScheduler = PollScheduler.from_config(self.config)
 
         known_craft: bytes = self.config.get("KNOWN_CRAFT", "")
-        if known_craft:
+        if known_craft and self.known_craft_db is None:
             self._logger.info("Using KNOWN_CRAFT: %s", known_craft)
-            self.known_craft_db = aircot.read_known_craft(known_craft)
+            self.known_craft_db = KnownCraftIndex.from_file(known_craft)
 
-        alt_upper: int = int(self.config.get("ALT_UPPER", "0"))
-        alt_lower: int = int(self.config.get("ALT_LOWER", "0"))
+        alt_upper: int = self.settings.alt_upper
+        alt_lower: int = self.settings.alt_lower
         if alt_upper or alt_lower:
             self._logger.info(
                 "Using Altitude Filters: Upper = %s, Lower = %s", alt_upper, alt_lower
@@ -289,63 +1555,239 @@ class ADSBWorker(pytak.QueueWorker):
             async with aiohttp.ClientSession() as self.session:
                 while 1:
                     self._logger.info(
-                        "%s polling every %ss: %s", self.__class__, poll_interval, url
+                        "%s polling every %.3gs: %s",
+                        self.__class__,
+                        scheduler.interval,
+                        url,
                     )
-                    await self.get_feed(url)
-                    await asyncio.sleep(int(poll_interval))
+                    await self.poll(scheduler, self.get_feed(url))
         elif "ws" in url_scheme:
-            try:
-                async with websockets.connect(url) as websocket:
-                    self._logger.info("Connected to: %s", url)
-                    async for message in websocket:
-                        self._logger.debug("message=%s", message)
-                        if message:
-                            j_event = json.loads(message)
-                            await self.handle_data(j_event)
-            except websockets.exceptions.ConnectionClosedError:
-                self._logger.warning("Websocket closed, reconnecting...")
-                await asyncio.sleep(2)
+            await self.watch_websocket(url)
         elif "file" in url_scheme:
             if importlib.util.find_spec("asyncinotify") is None:
                 self._logger.info("asyncinotify not installed, using file polling.")
                 while 1:
                     self._logger.info(
-                        "%s polling every %ss: %s", self.__class__, poll_interval, url
+                        "%s polling every %.3gs: %s",
+                        self.__class__,
+                        scheduler.interval,
+                        url,
                     )
-                    await self.get_file_feed(feed_url)
-                    await asyncio.sleep(int(poll_interval))
+                    await self.poll(scheduler, self.get_file_feed(feed_url))
             else:
-                with Inotify() as inotify:
-                    path = str(feed_url.path)
-                    inotify.add_watch(
-                        Path(path).parents[0],
-                        Mask.MODIFY | Mask.CREATE | Mask.MOVE | Mask.MOVED_TO,
-                    )
+                await self.watch_file(feed_url)
 
-                    async for event in inotify:
-                        if event.mask & Mask.IGNORED:
-                            raise RuntimeError("inotify watch was removed.")
-                        if str(event.path) == path:
-                            await self.get_file_feed(feed_url)
+    async def watch_websocket(self, url: str) -> None:
+        """Read a websocket feed, reconnecting whenever the connection is lost.
 
+        Reconnects back off as failed polls do, see `CircuitBreaker`. Pings detect
+        dead connections, and permessage-deflate compression is negotiated.
+        """
+        ping_interval: float = float(
+            self.config.get("WS_PING_INTERVAL") or adsbcot.DEFAULT_WS_PING_INTERVAL
+        )
+        ping_timeout: float = float(
+            self.config.get("WS_PING_TIMEOUT") or adsbcot.DEFAULT_WS_PING_TIMEOUT
+        )
 
-class ADSBNetWorker(ADSBWorker):
-    """Read ADS-B Data from network, renders to COT, and puts on queue."""
+        while 1:
+            self.breaker.attempt()
+            try:
+                async with websockets.connect(
+                    url,
+                    compression="deflate",
+                    ping_interval=ping_interval,
+                    ping_timeout=ping_timeout,
+                    open_timeout=ping_timeout,
+                ) as websocket:
+                    if self.counters["ws_connects"]:
+                        self.counters["ws_reconnects"] += 1
+                    self.counters["ws_connects"] += 1
+                    self.breaker.success()
+                    self._logger.info("Connected to: %s", url)
+                    async for message in websocket:
+                        self.record("ws", url, message)
+                        await self.handle_message(message)
+                exc: Exception = ConnectionResetError(
+                    f"Closed by server: {websocket.close_code} {websocket.close_reason}"
+                )
+            except (
+                OSError,
+                asyncio.TimeoutError,
+                websockets.exceptions.WebSocketException,
+            ) as _exc:
+                exc = _exc
+
+            delay: float = self.feed_failed(exc)
+            self._logger.info("Reconnecting to %s in %.1fs", url, delay)
+            await asyncio.sleep(delay)
+
+    def record(self, kind: str, url: str, data) -> None:
+        """Record data received from a feed to CAPTURE_FILE, if it's set."""
+        if self.recorder is not None:
+            self.recorder.record(kind, url, data)
+
+    async def handle_message(self, message: Union[str, bytes]) -> None:
+        """Decode & handle a websocket message."""
+        self.counters["ws_messages"] += 1
+        self._logger.debug("message=%s", message)
+        if not message:
+            return
+        try:
+            j_event = self.json_loads(message)
+        except json.JSONDecodeError as exc:
+            self.counters["ws_invalid_messages"] += 1
+            self._logger.warning("Invalid JSON message: %s", exc)
+            return
+        await self.handle_data(j_event)
+
+    async def watch_file(self, feed_url: ParseResultBytes) -> None:
+        """Watch a file feed with inotify, reading it once per burst of changes.
+
+        With FILE_WATCH=rename, only a new file being renamed over the feed (as
+        dump1090 & readsb write it) or the close of a write to it are reacted to,
+        so partially written files aren't read. Events within FILE_DEBOUNCE of the
+        first are coalesced into a single read, and `get_file_feed()` skips files
+        it has already read.
+        """
+        path: str = str(feed_url.path)
+        if self.file_watch == "modify":
+            mask = Mask.MODIFY | Mask.CREATE | Mask.MOVE | Mask.MOVED_TO
+        else:
+            mask = Mask.MOVED_TO | Mask.CLOSE_WRITE
+
+        with Inotify() as inotify:
+            inotify.add_watch(Path(path).parents[0], mask)
+            while 1:
+                if not self.is_feed_event(await inotify.get(), path):
+                    continue
+
+                deadline: float = time.monotonic() + self.file_debounce
+                while 1:
+                    remaining: float = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        event = await asyncio.wait_for(inotify.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if self.is_feed_event(event, path):
+                        self.counters["file_events_coalesced"] += 1
+
+                try:
+                    await self.get_file_feed(feed_url)
+                except (OSError, json.JSONDecodeError) as exc:
+                    self.counters["feed_errors"] += 1
+                    self._logger.warning("Unable to read %s: %s", path, exc)
+
+    def is_feed_event(self, event, path: str) -> bool:
+        """Determine if an inotify event is for the file feed at path."""
+        if event.mask & Mask.IGNORED:
+            raise RuntimeError("inotify watch was removed.")
+        if str(event.path) != path:
+            return False
+        self.counters["file_events"] += 1
+        return True
+
+    async def poll(self, scheduler: PollScheduler, feed) -> None:
+        """Await one poll of a feed, then sleep until the scheduler's next deadline.
+
+        Failed polls back off, and may open the circuit, see `CircuitBreaker`.
+        """
+        changed: Optional[bool] = None
+        delay: Optional[float] = None
+        self.breaker.attempt()
+        started: float = time.perf_counter()
+        try:
+            changed = await feed
+        except FEED_ERRORS as exc:
+            delay = self.feed_failed(exc)
+        else:
+            if changed is not None and self.breaker.success() != CircuitBreaker.CLOSED:
+                self._logger.info("Circuit closed, resuming polling: %s", self.feed_url)
+
+        self.histograms["poll_duration_seconds"].observe(time.perf_counter() - started)
+        self.counters["polls"] += 1
+        overruns: int = scheduler.overruns
+        scheduler.update(changed)
+        self.counters["poll_overruns"] += scheduler.overruns - overruns
+        if delay is not None:
+            scheduler.postpone(delay)
+        await scheduler.wait()
+
+    def get_counters(self) -> Counter:
+        """Get this worker's counters, including those of what it's made of."""
+        return self.counters
+
+    def feed_failed(self, exc: Exception) -> float:
+        """Record a failed poll, returns the delay, in seconds, before the next."""
+        headers = getattr(exc, "headers", None) or {}
+        retry_after: Optional[float] = adsbcot.parse_retry_after(
+            headers.get("Retry-After")
+        )
+        delay: float = self.breaker.failure(retry_after)
+        self.counters["feed_errors"] += 1
+
+        if self.breaker.state == CircuitBreaker.OPEN:
+            self.counters["breaker_opened"] += 1
+            self._logger.warning(
+                "Circuit open after %s failures, pausing %.1fs: %s (%s)",
+                self.breaker.failures,
+                delay,
+                self.feed_url,
+                exc,
+            )
+        else:
+            self._logger.warning(
+                "Feed failed, retrying in %.1fs: %s (%s)", delay, self.feed_url, exc
+            )
+        return delay
+
+
+class ModeSDecoder:
+    """Decode buffered Mode S messages into the state of each aircraft.
+
+    Positions of framed (Beast & AVR) messages are decoded by `PositionDecoder`,
+    everything else by pyModeS' decoder. `ADSBNetWorker` uses one in its own
+    process, or one in each of its decoder processes.
+    """
+
+    # Aircraft fields taken from pyModeS' decoder, positions are decoded natively:
+    DECODER_FIELDS: Tuple[str, ...] = ("call", "alt", "gs", "trk")
 
     def __init__(
-        self, queue, net_queue, config, data_type
-    ):  # NOQA pylint: disable=too-many-arguments
+        self,
+        ttl: float = adsbcot.DEFAULT_AIRCRAFT_TTL,
+        max_range: float = adsbcot.DEFAULT_CPR_MAX_RANGE,
+        reference: Optional[Tuple[float, float]] = None,
+        native_positions: bool = True,
+    ) -> None:
         """Initialize this class."""
-        super().__init__(queue, config)
-        self.net_queue = net_queue
-        self.config = config
-        self.data_type = data_type
+        self.aircraft: AircraftTable = AircraftTable(ttl)
+        self.positions: PositionDecoder = PositionDecoder(reference, max_range, ttl)
+        self.native_positions: bool = native_positions
+        self.decoder = pyModeS.streamer.decode.Decode()
+        # The decoder keeps its own per-aircraft state, pruned as it decodes:
+        self.decoder.cache_timeout = ttl
+        # Hex ICAO addresses of aircraft with messages in the buffers:
+        self.touched: Set[str] = set()
 
         self.local_buffer_adsb_msg = []
         self.local_buffer_adsb_ts = []
         self.local_buffer_commb_msg = []
         self.local_buffer_commb_ts = []
 
+    @classmethod
+    def from_config(cls, config, native_positions: bool = True) -> "ModeSDecoder":
+        """Create a decoder using the options given in config."""
+        return cls(
+            ttl=float(config.get("AIRCRAFT_TTL") or adsbcot.DEFAULT_AIRCRAFT_TTL),
+            max_range=float(
+                config.get("CPR_MAX_RANGE") or adsbcot.DEFAULT_CPR_MAX_RANGE
+            ),
+            native_positions=native_positions,
+        )
+
     def _reset_local_buffer(self):
         """Reset Socket Buffers."""
         self.local_buffer_adsb_msg = []
@@ -353,98 +1795,396 @@ class ADSBNetWorker(ADSBWorker):
         self.local_buffer_commb_msg = []
         self.local_buffer_commb_ts = []
 
-    async def run(
-        self, _=-1
-    ) -> None:  # NOQA pylint: disable=too-many-locals, too-many-branches
-        """Run the main process loop."""
-        self._logger.info(
-            "Running %s for data_type: %s", self.__class__, self.data_type
-        )
+    def buffer_frames(self, frames: List[ModeSFrame], t_received: float) -> None:
+        """Buffer validated frames for the decoder, as ADS-B or Comm-B messages."""
+        adsb_dfs = FrameFilter.ADSB_DFS
+        touched: Set[str] = self.touched
+        now: float = time.monotonic()
+        for frame in frames:
+            msg: str = frame.msg.hex().upper()
+            if frame.msg[0] >> 3 in adsb_dfs:
+                self.local_buffer_adsb_msg.append(msg)
+                self.local_buffer_adsb_ts.append(t_received)
+                icao: str = msg[2:8]
+                touched.add(icao)
+                if not self.native_positions:
+                    continue
+                position = self.positions.decode(icao, frame.msg, now)
+                if position is not None:
+                    self.aircraft.update(
+                        icao, {"lat": position[0], "lon": position[1]}, now
+                    )
+            else:
+                # Comm-B frames passed FrameFilter, so their syndrome is the ICAO:
+                self.local_buffer_commb_msg.append(msg)
+                self.local_buffer_commb_ts.append(t_received)
+                touched.add(f"{modes_crc(frame.msg):06X}")
+
+    def buffer_messages(self, messages: list) -> None:
+        """Buffer hex messages & their timestamps, keeping valid DF17 messages."""
+        for msg, t_msg in messages:
+            if len(msg) != 28:  # wrong data length
+                continue
+
+            dl_fmt = pms.df(msg)
+
+            if dl_fmt != 17:  # not ADSB
+                continue
+
+            if pms.crc(msg) != 0:  # CRC fail
+                continue
+
+            # icao = pms.adsb.icao(msg)
+            # typecode = pms.adsb.typecode(msg)
+
+            if dl_fmt in (17, 18):
+                self.local_buffer_adsb_msg.append(msg)
+                self.local_buffer_adsb_ts.append(t_msg)
+                self.touched.add(msg[2:8].upper())
+            elif dl_fmt in (20, 21):
+                self.local_buffer_commb_msg.append(msg)
+                self.local_buffer_commb_ts.append(t_msg)
+            else:
+                continue
+
+    def decode(self) -> List[AircraftState]:
+        """Decode the buffered messages, returns the state of the aircraft in them.
 
+        Comm-B messages are kept buffered until there's an ADS-B message to decode
+        with them.
+        """
+        if not self.local_buffer_adsb_msg:
+            return []
+
+        self.decoder.process_raw(
+            self.local_buffer_adsb_ts,
+            self.local_buffer_adsb_msg,
+            self.local_buffer_commb_ts,
+            self.local_buffer_commb_msg,
+        )
         self._reset_local_buffer()
+        touched, self.touched = self.touched, set()
 
-        decoder = pyModeS.streamer.decode.Decode()
-        net_client = pyModeS.streamer.source.NetSource("x", 1, self.data_type)
+        fields = self.DECODER_FIELDS if self.native_positions else AircraftTable.FIELDS
+        acs: dict = self.decoder.get_aircraft()
+        now: float = time.monotonic()
+        for icao in touched:
+            val = acs.get(icao)
+            if val:
+                values: dict = {field: val.get(field) for field in fields}
+                self.aircraft.update(icao, values, now)
+        self.aircraft.expire(now)
+        return [state for state in map(self.aircraft.get, touched) if state]
+
+
+class ADSBNetWorker(ADSBWorker):
+    """Read ADS-B Data from network, renders to COT, and puts on queue."""
 
+    # Most frames read from the queue at once, to send to the decoder processes:
+    SHARD_BATCH_SIZE: int = 1000
+
+    def __init__(
+        self, queue, net_queue, config, data_type, feed_url=None, merger=None
+    ):  # NOQA pylint: disable=too-many-arguments
+        """Initialize this class."""
+        super().__init__(queue, config, feed_url, merger)
+        self.net_queue = net_queue
+        self.config = config
+        self.data_type = data_type
+        self.framer: Union[BeastFramer, AVRFramer, None] = None
+        if "beast" in data_type or "raw" in data_type:
+            self.framer = get_framer(data_type)
+        self.frame_filter: FrameFilter = FrameFilter(
+            float(
+                self.config.get("MODES_ICAO_TTL") or adsbcot.DEFAULT_MODES_ICAO_TTL
+            )
+        )
+
+        self.sweep_interval: float = float(
+            self.config.get("NET_SWEEP_INTERVAL") or adsbcot.DEFAULT_NET_SWEEP_INTERVAL
+        )
+        self.modes: ModeSDecoder = ModeSDecoder.from_config(
+            self.config, native_positions=self.framer is not None
+        )
+        # With decoder processes, this holds the aircraft they send back:
+        self.aircraft: AircraftTable = self.modes.aircraft
+        self.positions: PositionDecoder = self.modes.positions
+
+        self.decode_processes: int = int(
+            self.config.get("DECODE_PROCESSES") or adsbcot.DEFAULT_DECODE_PROCESSES
+        )
+        if self.decode_processes > 0 and self.framer is None:
+            self._logger.warning(
+                "DECODE_PROCESSES is only used by beast & raw feeds, not: %s",
+                self.data_type,
+            )
+            self.decode_processes = 0
+        self.shards: List[concurrent.futures.ProcessPoolExecutor] = []
+        self.shard_results: asyncio.Queue = asyncio.Queue(
+            maxsize=max(self.decode_processes, 1) * 4
+        )
+
+    async def emit_aircraft(self, states: Iterable[AircraftState]) -> int:
+        """Render the given aircraft with a position to COT.
+
+        Returns the number of aircraft rendered.
+        """
+        crafts: list = [
+            state.to_craft()
+            for state in states
+            if state.lat is not None and state.lon is not None
+        ]
+        if crafts:
+            await self.handle_data(crafts)
+        self.counters["net_aircraft_emitted"] += len(crafts)
+        self.counters["aircraft_peak"] = self.aircraft.peak
+        return len(crafts)
+
+    def get_counters(self) -> Counter:
+        """Get this worker's counters, including those of its framer & decoders, and
+        the number of aircraft tracked.
+
+        With decoder processes, the position decoders' counters are in those.
+        """
+        counters: Counter = (
+            self.counters + self.frame_filter.counters + self.positions.counters
+        )
+        if self.framer is not None:
+            counters.update(self.framer.counters)
+        counters["aircraft_tracked"] = len(self.aircraft)
+        return counters
+
+    async def get_reference(self) -> Optional[Tuple[float, float]]:
+        """Get the receiver's position, from gpsd or SENSOR_LAT & SENSOR_LON."""
+        if _gpsd is not None:
+            try:
+                result = await asyncio.to_thread(SensorWorker._poll_gpsd)
+                if result is not None:
+                    return float(result[0]), float(result[1])
+            except Exception as exc:  # NOQA pylint: disable=broad-except
+                self._logger.debug("gpsd unavailable: %s", exc)
+        lat, lon = self.config.get("SENSOR_LAT"), self.config.get("SENSOR_LON")
+        if lat in (None, "") or lon in (None, ""):
+            return None
+        return float(lat), float(lon)
+
+    async def sweep(self) -> int:
+        """Expire stale aircraft, then render all the others to COT."""
+        self.aircraft.expire()
+        self.counters["net_sweeps"] += 1
+        self.counters["aircraft_expired"] = self.aircraft.counters["expired"]
+        self._logger.debug(
+            "Sweeping %s aircraft (peak %s)", len(self.aircraft), self.aircraft.peak
+        )
+        return await self.emit_aircraft(self.aircraft)
+
+    async def sweeper(self) -> None:
+        """Sweep the aircraft every NET_SWEEP_INTERVAL seconds, see `sweep()`."""
         while 1:
-            messages = []
-            received = await self.net_queue.get()
-            if not received:
-                continue
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
+
+    def start_shard(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Start a decoder process, with its own `ModeSDecoder`."""
+        modes: ModeSDecoder = self.modes
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=adsbcot.functions.init_decode_shard,
+            initargs=(
+                modes.aircraft.ttl,
+                modes.positions.max_range,
+                modes.positions.reference,
+            ),
+        )
 
-            net_client.buffer.extend(received)
-            if "beast" in self.data_type:
-                messages = net_client.read_beast_buffer()
-            elif "raw" in self.data_type:
-                messages = net_client.read_raw_buffer()
-            elif "skysense" in self.data_type:
-                messages = net_client.read_skysense_buffer()
+    def restart_shard(
+        self,
+        shard: int,
+        executor: concurrent.futures.ProcessPoolExecutor,
+        exc: Exception,
+    ) -> None:
+        """Replace a broken decoder process, unless it's already been replaced."""
+        if self.shards[shard] is not executor:
+            return
+        self._logger.error("Decoder process %s failed, restarting: %s", shard, exc)
+        self.counters["shard_restarts"] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.shards[shard] = self.start_shard()
+
+    async def dispatch_frames(self, frames: List[ModeSFrame], t_received) -> None:
+        """Send frames to the decoder processes, sharded by their ICAO address.
 
-            self._logger.debug("Received %s messages", len(messages))
+        Each aircraft's frames always go to the same process, which decodes them in
+        the order they're sent. A broken process is restarted, and sent the frames.
+        """
+        shards: int = len(self.shards)
+        batches: List[List[ModeSFrame]] = [[] for _ in range(shards)]
+        adsb_dfs = FrameFilter.ADSB_DFS
+        for frame in frames:
+            msg: bytes = frame.msg
+            if msg[0] >> 3 in adsb_dfs:
+                icao: int = int.from_bytes(msg[1:4], "big")
+            else:
+                icao = modes_crc(msg)
+            batches[icao % shards].append(frame)
 
-            if not messages:
+        loop = asyncio.get_running_loop()
+        for shard, batch in enumerate(batches):
+            if not batch:
                 continue
+            executor = self.shards[shard]
+            try:
+                future = loop.run_in_executor(
+                    executor, adsbcot.functions.shard_decode, batch, t_received
+                )
+            except concurrent.futures.BrokenExecutor as exc:
+                self.restart_shard(shard, executor, exc)
+                executor = self.shards[shard]
+                future = loop.run_in_executor(
+                    executor, adsbcot.functions.shard_decode, batch, t_received
+                )
+            # Results are awaited in the order sent, bounding those in flight:
+            await self.shard_results.put((shard, executor, future))
+            self.counters["shard_batches"] += 1
 
-            for msg, t_msg in messages:
-                if len(msg) != 28:  # wrong data length
-                    continue
+    async def emit_shard_results(self) -> None:
+        """Render the aircraft decoded by the decoder processes, in order.
+
+        Frames in flight to a decoder process that failed are lost.
+        """
+        while 1:
+            shard, executor, future = await self.shard_results.get()
+            try:
+                # Shielded, so only this task's own cancellation cancels it:
+                records = await asyncio.shield(future)
+            except concurrent.futures.BrokenExecutor as exc:
+                self.restart_shard(shard, executor, exc)
+                continue
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Cancelled by its decoder process being restarted:
+                continue
 
-                dl_fmt = pms.df(msg)
+            now: float = time.monotonic()
+            await self.emit_aircraft(
+                [self.aircraft.update(icao, values, now) for icao, values in records]
+            )
 
-                if dl_fmt != 17:  # not ADSB
-                    continue
+    def read_frames(self, received: bytes) -> List[ModeSFrame]:
+        """Frame & validate a read, and with decoder processes any others queued."""
+        frames: List[ModeSFrame] = self.frame_filter.filter(self.framer.feed(received))
+        if self.shards:
+            while len(frames) < self.SHARD_BATCH_SIZE and not self.net_queue.empty():
+                frames += self.frame_filter.filter(
+                    self.framer.feed(self.net_queue.get_nowait())
+                )
+        return frames
 
-                if pms.crc(msg) != 0:  # CRC fail
-                    continue
+    async def run(
+        self, _=-1
+    ) -> None:  # NOQA pylint: disable=too-many-locals, too-many-branches
+        """Run the main process loop.
 
-                # icao = pms.adsb.icao(msg)
-                # typecode = pms.adsb.typecode(msg)
+        After each decode, only the aircraft with messages in that batch are
+        rendered to COT. Every NET_SWEEP_INTERVAL seconds, all aircraft heard within
+        AIRCRAFT_TTL are rendered, refreshing those that haven't been heard lately.
+        """
+        self._logger.info(
+            "Running %s for data_type: %s", self.__class__, self.data_type
+        )
 
-                if dl_fmt in (17, 18):
-                    self.local_buffer_adsb_msg.append(msg)
-                    self.local_buffer_adsb_ts.append(t_msg)
-                elif dl_fmt in (20, 21):
-                    self.local_buffer_commb_msg.append(msg)
-                    self.local_buffer_commb_ts.append(t_msg)
-                else:
+        self.positions.reference = await self.get_reference()
+        if self.positions.reference is not None:
+            self._logger.info(
+                "Decoding positions relative to: %s, %s", *self.positions.reference
+            )
+
+        background: List[asyncio.Future] = [asyncio.ensure_future(self.sweeper())]
+        if self.decode_processes > 0:
+            self._logger.info("Using %s decoder processes.", self.decode_processes)
+            self.shards = [self.start_shard() for _ in range(self.decode_processes)]
+            background.append(asyncio.ensure_future(self.emit_shard_results()))
+
+        net_client = pyModeS.streamer.source.NetSource("x", 1, self.data_type)
+
+        try:
+            while 1:
+                received = await self.net_queue.get()
+                if not received:
                     continue
 
-            if len(self.local_buffer_adsb_msg) > 1:
-                decoder.process_raw(
-                    self.local_buffer_adsb_ts,
-                    self.local_buffer_adsb_msg,
-                    self.local_buffer_commb_ts,
-                    self.local_buffer_commb_msg,
-                )
-                self._reset_local_buffer()
-
-            acs = decoder.get_aircraft()
-            for key, val in acs.items():
-                _data: dict = {
-                    "hex": key,
-                    "lat": val.get("lat"),
-                    "lon": val.get("lon"),
-                    "flight": val.get("call", key).replace("_", ""),
-                    "alt_geom": val.get("alt"),
-                    "gs": val.get("gs"),
-                    "reg": val.get("r"),
-                    "trk": val.get("track", val.get("trk")),
-                }
-                if all(_data):
-                    await self.handle_data([_data])
+                if self.framer is not None:
+                    frames = self.read_frames(received)
+                    self._logger.debug("Received %s valid frames", len(frames))
+                    if not frames:
+                        continue
+                    if self.shards:
+                        await self.dispatch_frames(frames, time.time())
+                        continue
+                    self.modes.buffer_frames(frames, time.time())
+                elif "skysense" in self.data_type:
+                    net_client.buffer.extend(received)
+                    messages = net_client.read_skysense_buffer()
+                    self._logger.debug("Received %s messages", len(messages))
+                    self.modes.buffer_messages(messages)
+
+                await self.emit_aircraft(self.modes.decode())
+        finally:
+            for task in background:
+                task.cancel()
+            for shard in self.shards:
+                shard.shutdown(wait=False, cancel_futures=True)
+            self.shards = []
 
 
 class ADSBNetReceiver(pytak.QueueWorker):  # pylint: disable=too-few-public-methods
     """Read ADS-B Data from network and puts on queue."""
 
-    def __init__(self, queue, config, data_type) -> None:
+    POLICIES: Tuple[str, ...] = ("drop_oldest", "drop_newest", "backpressure")
+
+    def __init__(self, queue, config, data_type, feed_url=None) -> None:
         """Initialize this class."""
         super().__init__(queue, config)
         self.data_type: str = data_type
+        self.feed_url: str = feed_url or self.config.get("FEED_URL")
+        self.counters: Counter = Counter()
+        self.policy: str = str(
+            self.config.get("NET_QUEUE_POLICY") or adsbcot.DEFAULT_NET_QUEUE_POLICY
+        ).lower()
+        if self.policy not in self.POLICIES:
+            raise ValueError(f"Invalid NET_QUEUE_POLICY='{self.policy}'")
+        self.recorder: Optional[FeedRecorder] = adsbcot.get_recorder(
+            self.config.get("CAPTURE_FILE")
+        )
+
+    async def put_net_queue(self, received: bytes) -> None:
+        """Put received data on the queue, applying NET_QUEUE_POLICY if it's full.
+
+        With the backpressure policy this waits for room, so the socket isn't read
+        meanwhile and TCP flow control slows the sender.
+        """
+        self.counters["net_reads"] += 1
+        if self.recorder is not None:
+            self.recorder.record("tcp", self.feed_url, received)
+        if self.queue.full():
+            self.counters["net_queue_full"] += 1
+            if self.policy == "drop_newest":
+                self.counters["net_queue_dropped"] += 1
+                return
+            if self.policy == "drop_oldest":
+                self.queue.get_nowait()
+                self.counters["net_queue_dropped"] += 1
+
+        await self.queue.put(received)
+        depth: int = self.queue.qsize()
+        if depth > self.counters["net_queue_high_water"]:
+            self.counters["net_queue_high_water"] = depth
 
     async def run(self, _=-1) -> None:
         """Run the main process loop."""
-        url: ParseResult = urlparse(self.config.get("FEED_URL"))
+        url: ParseResult = urlparse(self.feed_url)
 
         self._logger.info("Running %s for %s", self.__class__, url.geturl())
 
@@ -466,11 +2206,240 @@ class ADSBNetReceiver(pytak.QueueWorker):  # pylint: disable=too-few-public-meth
         if self.data_type == "raw":
             while 1:
                 received = await reader.readline()
-                self.queue.put_nowait(received)
+                await self.put_net_queue(received)
         elif self.data_type == "beast":
             while 1:
                 received = await reader.read(4096)
-                self.queue.put_nowait(received)
+                await self.put_net_queue(received)
+
+
+class ADSBMergeWorker(pytak.QueueWorker):
+    """Emit the freshest report of each aircraft from many feeds as CoT."""
+
+    def __init__(self, queue, config, merger: CraftMerger) -> None:
+        """Initialize this class."""
+        super().__init__(queue, config)
+        self.merger: CraftMerger = merger
+        self.counters: Counter = Counter()
+        self.merge_window: float = float(
+            self.config.get("MERGE_WINDOW") or adsbcot.DEFAULT_MERGE_WINDOW
+        )
+
+    async def handle_data(self, data: List[tuple]) -> None:
+        """Render merged (craft, source worker) reports to CoT, put on TX queue."""
+        by_source: Dict[ADSBWorker, list] = {}
+        for craft, source in data:
+            by_source.setdefault(source, []).append(craft)
+
+        # Each source has its own settings (ex. FEED_URL) & KNOWN_CRAFT:
+        for source, crafts in by_source.items():
+            started: float = time.perf_counter()
+            events = adsbcot.adsb_to_cot_batch(
+                crafts, source.settings, source.known_craft_db
+            )
+            source.count_serialized(
+                len(crafts), len(events), time.perf_counter() - started
+            )
+            for event in events:
+                await self.put_queue(event)
+            self.counters["cot_events"] += len(events)
+            self.counters["cot_bytes"] += sum(map(len, events))
+
+    async def run(self, _=-1) -> None:
+        """Run the main process loop."""
+        self._logger.info(
+            "Running %s, merging every %ss", self.__class__, self.merge_window
+        )
+        while 1:
+            await asyncio.sleep(self.merge_window)
+            reports = self.merger.drain()
+            if reports:
+                self._logger.debug("Merged %s aircraft", len(reports))
+                await self.handle_data(reports)
+
+
+class ADSBReplayWorker(pytak.QueueWorker):
+    """Play a capture back through the workers of the feeds recorded in it.
+
+    TCP data is put on its `ADSBNetWorker`'s queue, HTTP & file data handled as
+    if read from the file, and websocket messages as if received, by its
+    `ADSBWorker`. Records are played at REPLAY_SPEED times the speed they were
+    recorded at, or as fast as the workers take them if it's 0.
+    """
+
+    def __init__(self, queue, config, replayer: FeedReplayer, targets: dict) -> None:
+        """Initialize this class.
+
+        targets maps the (kind, URL) of each feed to its worker, or for TCP feeds
+        to the queue of their `ADSBNetWorker`.
+        """
+        super().__init__(queue, config)
+        self.replayer: FeedReplayer = replayer
+        self.targets: dict = targets
+        self.speed: float = float(
+            self.config.get("REPLAY_SPEED") or adsbcot.DEFAULT_REPLAY_SPEED
+        )
+        self.counters: Counter = Counter()
+
+    async def replay(self, kind: str, url: str, data: bytes) -> None:
+        """Hand a record to its feed's worker."""
+        target = self.targets[(kind, url)]
+        if kind == "tcp":
+            await target.put(data)
+        elif kind == "ws":
+            await target.handle_message(data)
+        else:
+            await target.handle_file_data(url, data)
+        self.counters["replay_records"] += 1
+        self.counters["replay_bytes"] += len(data)
+
+    async def run(self, _=-1) -> None:
+        """Run the main process loop, returning once the capture has played."""
+        self._logger.info(
+            "Replaying %s at %sx", self.replayer.path, self.speed or "max "
+        )
+        started: float = time.monotonic()
+        elapsed: float = 0.0
+        last: Optional[int] = None
+        for timestamp, kind, url, data in self.replayer:
+            # Captures appended to restart their clock, so gaps are never negative:
+            if last is not None and timestamp > last:
+                elapsed += (timestamp - last) / 1e9
+            last = timestamp
+            delay: float = 0.0
+            if self.speed > 0:
+                delay = started + elapsed / self.speed - time.monotonic()
+            await asyncio.sleep(max(delay, 0))
+            await self.replay(kind, url, data)
+
+        # Let the workers finish with what's been replayed:
+        while not self.queue.empty() or any(
+            not target.empty()
+            for target in self.targets.values()
+            if isinstance(target, asyncio.Queue)
+        ):
+            await asyncio.sleep(0.1)
+        self._logger.info(
+            "Replayed %s records in %.3fs",
+            self.counters["replay_records"],
+            time.monotonic() - started,
+        )
+
+
+def _prometheus_labels(labels: dict) -> str:
+    """Format labels for a Prometheus sample, escaping their values."""
+    if not labels:
+        return ""
+    pairs: List[str] = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        value = value.replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class MetricsWorker(pytak.QueueWorker):
+    """Serve the counters, queue depths & histograms of workers, for Prometheus.
+
+    Metrics are rendered in Prometheus' text format at /metrics on
+    METRICS_HOST:METRICS_PORT, from the counters the workers keep anyway, so
+    there's no cost between scrapes. The TX queue depth is that of this worker's
+    queue.
+    """
+
+    PREFIX: str = "adsbcot_"
+    # Counters holding a level, rather than a running total:
+    GAUGES: Tuple[str, ...] = (
+        "aircraft_peak",
+        "aircraft_tracked",
+        "net_queue_high_water",
+    )
+    # Counters of aircraft filtered for a reason, ex. filtered_tisb:
+    FILTERED: str = "filtered_"
+
+    def __init__(self, queue, config, workers: Iterable) -> None:
+        """Initialize this class, with the workers whose metrics are served."""
+        super().__init__(queue, config)
+        self.workers: list = list(workers)
+        self.host: str = str(
+            self.config.get("METRICS_HOST") or adsbcot.DEFAULT_METRICS_HOST
+        )
+        self.port: int = int(
+            self.config.get("METRICS_PORT") or adsbcot.DEFAULT_METRICS_PORT
+        )
+
+    def render(self) -> str:
+        """Render the metrics of all the workers in Prometheus' text format."""
+        metrics: Dict[str, Tuple[str, List[str]]] = {}
+
+        def add(name: str, kind: str, labels: dict, value, suffix: str = "") -> None:
+            name = self.PREFIX + name
+            samples = metrics.setdefault(name, (kind, []))[1]
+            samples.append(f"{name}{suffix}{_prometheus_labels(labels)} {value}")
+
+        for worker in self.workers:
+            labels: dict = {
+                "worker": worker.__class__.__name__,
+                "feed": getattr(worker, "feed_url", None) or "",
+            }
+            get_counters = getattr(worker, "get_counters", None)
+            counters: Counter = get_counters() if get_counters else worker.counters
+            for name, value in sorted(counters.items()):
+                if name.startswith(self.FILTERED):
+                    reason: str = name[len(self.FILTERED) :]
+                    add(
+                        "aircraft_filtered_total",
+                        "counter",
+                        {**labels, "reason": reason},
+                        value,
+                    )
+                elif name in self.GAUGES:
+                    add(name, "gauge", labels, value)
+                else:
+                    add(f"{name}_total", "counter", labels, value)
+
+            net_queue = getattr(worker, "net_queue", None)
+            if net_queue is not None:
+                add("net_queue_depth", "gauge", labels, net_queue.qsize())
+                add("net_queue_size", "gauge", labels, net_queue.maxsize)
+
+            for name, histogram in getattr(worker, "histograms", {}).items():
+                for bound, count in histogram.cumulative():
+                    le: str = "+Inf" if bound == math.inf else repr(float(bound))
+                    add(name, "histogram", {**labels, "le": le}, count, "_bucket")
+                add(name, "histogram", labels, histogram.sum, "_sum")
+                add(name, "histogram", labels, histogram.count, "_count")
+
+        add("tx_queue_depth", "gauge", {}, self.queue.qsize())
+        add("tx_queue_size", "gauge", {}, self.queue.maxsize)
+
+        lines: List[str] = []
+        for name, (kind, samples) in metrics.items():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    async def handle_request(self, _request: web.Request) -> web.Response:
+        """Respond to a scrape with the current metrics."""
+        return web.Response(
+            body=self.render().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def run(self, _=-1) -> None:
+        """Run the main process loop, serving metrics until cancelled."""
+        app: web.Application = web.Application()
+        app.router.add_get("/metrics", self.handle_request)
+        runner: web.AppRunner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+            self._logger.info(
+                "Serving metrics at http://%s:%s/metrics", self.host, self.port
+            )
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
 
 
 class xFileWatcher(pytak.QueueWorker):
@@ -481,12 +2450,15 @@ class xFileWatcher(pytak.QueueWorker):
         super().__init__(queue, config)
         self.known_craft_db = None
         self.session = None
+        self.feed_digest: Optional[int] = None
+        self.json_loads = adsbcot.get_json_loads(self.config.get("JSON_CODEC"))
         self.uid_key: str = self.config.get("UID_KEY", "ICAO")
+        self.settings: CompiledConfig = CompiledConfig(self.config)
 
         known_craft = self.config.get("KNOWN_CRAFT")
         if known_craft:
             self._logger.info("Using KNOWN_CRAFT: %s", known_craft)
-            self.known_craft_db = aircot.read_known_craft(known_craft)
+            self.known_craft_db = KnownCraftIndex.from_file(known_craft)
 
     async def handle_data(self, data: list) -> None:
         """Handle Data from ADS-B receiver: Render to CoT, put on TX queue.
@@ -519,24 +2491,26 @@ class xFileWatcher(pytak.QueueWorker):
                 continue
 
             if "~" in icao:
-                if not self.config.getboolean("INCLUDE_TISB"):
+                if not self.settings.include_tisb:
                     continue
             else:
-                if self.config.getboolean("TISB_ONLY"):
+                if self.settings.tisb_only:
                     continue
 
-            known_craft: dict = aircot.get_known_craft(self.known_craft_db, icao, "HEX")
+            known_craft: dict = (
+                self.known_craft_db.get(icao, "HEX") if self.known_craft_db else {}
+            )
 
             # Skip if we're using known_craft CSV and this Craft isn't found:
             if (
                 self.known_craft_db
                 and not known_craft
-                and not self.config.getboolean("INCLUDE_ALL_CRAFT")
+                and not self.settings.include_all_craft
             ):
                 continue
 
             event: Optional[bytes] = adsbcot.adsb_to_cot(
-                craft, self.config, known_craft
+                craft, self.settings, known_craft
             )
 
             if not event:
@@ -546,31 +2520,42 @@ class xFileWatcher(pytak.QueueWorker):
             self._logger.debug("Handling %s/%s ICAO: %s", i, lod, icao)
             await self.put_queue(event)
 
-    async def get_feed(self, url: bytes) -> None:
-        """Poll the ADS-B feed and pass data to the data handler."""
+    async def get_feed(self, url: bytes) -> Optional[bool]:
+        """Poll the ADS-B feed and pass data to the data handler.
+
+        Returns True if the feed changed since the last poll, False if it didn't,
+        or None if it couldn't be polled.
+        """
         if not self.session:
             self._logger.warning("No aiohttp session available.")
-            return
+            return None
 
         async with self.session.get(url) as resp:
             if resp.status != 200:
                 response_content = await resp.text()
                 self._logger.error("Received HTTP Status %s for %s", resp.status, url)
                 self._logger.error(response_content)
-                return
+                return None
+
+            body: bytes = await resp.read()
+            digest: int = hash(body)
+            if digest == self.feed_digest:
+                return False
+            self.feed_digest = digest
 
-            json_resp = await resp.json(content_type=None)
+            json_resp = self.json_loads(body) if body else None
             if json_resp is None:
-                return
+                return True
 
             data = json_resp.get("aircraft", json_resp.get("ac"))
             if data is None:
-                return
+                return True
 
             self._logger.info(
                 "Retrieved %s ADS-B aircraft messages.", str(len(data) or "No")
             )
             await self.handle_data(data)
+            return True
 
     async def run(self, _=-1) -> None:
         """Run this Thread, Reads from Pollers."""
@@ -581,21 +2566,22 @@ class xFileWatcher(pytak.QueueWorker):
         self._logger.info("Running %s", self.__class__)
 
         known_craft: bytes = self.config.get("KNOWN_CRAFT", "")
-        poll_interval: bytes = self.config.get(
-            "POLL_INTERVAL", adsbcot.DEFAULT_POLL_INTERVAL
-        )
+        scheduler: PollScheduler = PollScheduler.from_config(self.config)
 
-        if known_craft:
+        if known_craft and self.known_craft_db is None:
             self._logger.info("Using KNOWN_CRAFT: %s", known_craft)
-            self.known_craft_db = aircot.read_known_craft(known_craft)
+            self.known_craft_db = KnownCraftIndex.from_file(known_craft)
 
         async with aiohttp.ClientSession() as self.session:
             while 1:
                 self._logger.info(
-                    "%s polling every %ss: %s", self.__class__, poll_interval, url
+                    "%s polling every %.3gs: %s",
+                    self.__class__,
+                    scheduler.interval,
+                    url,
                 )
-                await self.get_feed(url)
-                await asyncio.sleep(int(poll_interval))
+                scheduler.update(await self.get_feed(url))
+                await scheduler.wait()
 
 
 class SensorWorker(pytak.QueueWorker):
@@ -40,3 +40,88 @@ import socket as _socket
 DEFAULT_SENSOR_ID: str = f"adsbcot_{_socket.gethostname()}"
 DEFAULT_SENSOR_COT_TYPE: str = "a-f-G-E-S-E"
 DEFAULT_SENSOR_PAYLOAD_TYPE: str = "ADS-B-Receiver"
+
+# Change-detection cache: suppress CoT for aircraft that haven't moved since the
+# last emitted event.
+DEFAULT_SUPPRESS_UNCHANGED: bool = False
+DEFAULT_CRAFT_CACHE_SIZE: int = 20000
+DEFAULT_CRAFT_CACHE_TTL: int = 600  # seconds since last emitted event
+DEFAULT_CHANGE_DISTANCE: float = 0.0  # meters
+DEFAULT_CHANGE_ALT: float = 0.0  # feet
+DEFAULT_CHANGE_TRACK: float = 0.0  # degrees
+# Force a refresh after this fraction of COT_STALE, so TAK never sees a stale track.
+DEFAULT_CHANGE_REFRESH: float = 0.5
+
+# CoT serializer: "etree" (xml.etree.ElementTree) or "template" (pre-computed).
+DEFAULT_COT_SERIALIZER: str = "etree"
+
+# Number of aircraft converted between yields to the event loop.
+DEFAULT_BATCH_SIZE: int = 500
+
+# Process pool serialization of large polls. 0 workers disables the pool.
+DEFAULT_POOL_WORKERS: int = 0
+DEFAULT_POOL_THRESHOLD: int = 2000  # aircraft
+DEFAULT_POOL_CHUNK_SIZE: int = 1000  # aircraft
+
+# With many FEED_URLs, how often the freshest report of each aircraft is emitted.
+DEFAULT_MERGE_WINDOW: float = 1.0  # seconds
+
+# Adaptive polling: how much the poll interval grows while a feed is unchanged.
+DEFAULT_POLL_BACKOFF: float = 1.5
+
+# HTTP feed failures: retries back off from POLL_INTERVAL up to RETRY_MAX_DELAY, and
+# after BREAKER_THRESHOLD consecutive failures polling pauses for BREAKER_TIMEOUT.
+DEFAULT_RETRY_MAX_DELAY: float = 300.0  # seconds
+DEFAULT_BREAKER_THRESHOLD: int = 5  # consecutive failures
+DEFAULT_BREAKER_TIMEOUT: float = 60.0  # seconds
+
+# Parse the aircraft array of JSON feeds incrementally, as it's read.
+DEFAULT_STREAM_JSON: bool = False
+DEFAULT_STREAM_CHUNK_SIZE: int = 65536  # bytes
+
+# JSON decoder for feeds: "auto" (orjson if installed, else json), "orjson" or "json".
+DEFAULT_JSON_CODEC: str = "auto"
+
+# Read file feeds through mmap, rather than into a new bytes object.
+DEFAULT_FILE_MMAP: bool = False
+
+# inotify file watching: "rename" reacts to a new file renamed over the feed, or the
+# close of a write to it; "modify" also reacts to partial writes. Events within
+# FILE_DEBOUNCE of the first are coalesced into a single read.
+DEFAULT_FILE_WATCH: str = "rename"
+DEFAULT_FILE_DEBOUNCE: float = 0.05  # seconds
+
+# Websocket feeds: keepalive pings, and the time allowed for a pong (or to connect).
+DEFAULT_WS_PING_INTERVAL: float = 20.0  # seconds
+DEFAULT_WS_PING_TIMEOUT: float = 20.0  # seconds
+
+# TCP feeds: size of the queue between receiver & decoder, and what to do when it's
+# full: "drop_oldest", "drop_newest" or "backpressure" (stop reading the socket).
+DEFAULT_NET_QUEUE_SIZE: int = 1000  # reads
+DEFAULT_NET_QUEUE_POLICY: str = "drop_oldest"
+
+# Mode S: how long an ICAO address seen in a valid DF17/18 frame is used to validate
+# the Address/Parity of DF20/21 frames.
+DEFAULT_MODES_ICAO_TTL: float = 60.0  # seconds
+
+# How often TCP feed workers re-send CoT for every aircraft they know:
+DEFAULT_NET_SWEEP_INTERVAL: float = 15.0  # seconds
+
+# How long TCP feed workers keep the state of an aircraft that isn't heard from:
+DEFAULT_AIRCRAFT_TTL: float = 60.0  # seconds
+
+# Receiver's horizon, within which TCP feeds' positions may be decoded relative to
+# the receiver, or 0 to only decode them from even/odd pairs:
+DEFAULT_CPR_MAX_RANGE: float = 0.0  # meters
+
+# Number of processes Mode S frames from TCP feeds are decoded in, sharded by ICAO
+# address, or 0 to decode them in the feed's worker:
+DEFAULT_DECODE_PROCESSES: int = 0
+
+# Speed replay:// captures are played at, relative to when they were recorded, or 0
+# for as fast as they can be handled:
+DEFAULT_REPLAY_SPEED: float = 1.0
+
+# Address of the Prometheus metrics endpoint, which is only served if the port is set:
+DEFAULT_METRICS_HOST: str = "127.0.0.1"
+DEFAULT_METRICS_PORT: int = 0
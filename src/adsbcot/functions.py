@@ -19,14 +19,20 @@
 """ADSBCOT Functions."""
 
 import asyncio
+import atexit
+import datetime
+import email.utils
 import importlib.util
+import json
 import logging
 import os
+import re
+import time
 import warnings
 import xml.etree.ElementTree as ET
 
 from configparser import SectionProxy
-from typing import Optional, Set, Union
+from typing import Any, Callable, Iterable, List, Optional, Set, Tuple, Union
 from urllib.parse import ParseResult, urlparse
 
 import aircot
@@ -40,11 +46,38 @@ except ImportError as exc:
     warnings.warn(str(exc))
     warnings.warn("ADSBCOT ignoring ImportError for: pyModeS")
 
+# orjson is an optional, faster JSON decoder, see `get_json_loads()`:
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 APP_NAME = "adsbcot"
 Logger = logging.getLogger(__name__)
 Debug = bool(os.getenv("DEBUG", False))
 
+# Per-process state of process pool workers, see `init_pool_worker()`.
+_POOL_STATE: dict = {}
+
+# Separates many FEED_URLs: whitespace, or a comma followed by a URL scheme.
+FEED_URL_SEPARATOR = re.compile(r"\s+|,\s*(?=[A-Za-z][A-Za-z0-9+.-]*://)")
+
+# Capture files being recorded, shared by every feed's workers, see `get_recorder()`.
+_RECORDERS: dict = {}
+
+
+def get_feed_urls(config: Union[SectionProxy, dict]) -> List[str]:
+    """Get the list of FEED_URLs, which may be separated by whitespace or commas.
+
+    Only a comma followed by another URL's scheme separates feeds, so a URL may
+    itself contain commas (ex. in its query).
+    """
+    feed_urls = config.get("FEED_URL", adsbcot.DEFAULT_FEED_URL)
+    if isinstance(feed_urls, (list, tuple)):
+        return [str(url).strip() for url in feed_urls if str(url).strip()]
+    return [url for url in FEED_URL_SEPARATOR.split(str(feed_urls)) if url]
+
 
 def create_tasks(config: SectionProxy, clitool: pytak.CLITool) -> Set[pytak.Worker,]:
     """Create specific coroutine task set for this application.
@@ -65,22 +98,62 @@ def create_tasks(config: SectionProxy, clitool: pytak.CLITool) -> Set[pytak.Work
 
     _feed_url: str = config.get("FEED_URL", adsbcot.DEFAULT_FEED_URL)
     config.setdefault("FEED_URL", _feed_url)
-    _feed_url = config.get("FEED_URL", "")
+    feed_urls: List[str] = get_feed_urls(config)
+
+    for _feed_url in feed_urls or [""]:
+        if "://" not in _feed_url:
+            warnings.warn(f"Invalid FEED_URL: '{_feed_url}'", SyntaxWarning)
+            raise ValueError(
+                "Please specify FEED_URL with full URL, including '://', for "
+                "example: tcp+beast://example.com:30005"
+            )
+
+    # With many feeds, each feed's worker offers aircraft to a shared merge stage,
+    # which emits the freshest report of each aircraft once:
+    merger = None
+    if len(feed_urls) > 1:
+        merger = adsbcot.CraftMerger()
+        tasks.add(adsbcot.ADSBMergeWorker(clitool.tx_queue, config, merger))
+
+    for _feed_url in feed_urls:
+        tasks.update(_create_feed_tasks(config, clitool, _feed_url, merger))
 
-    if "://" not in _feed_url:
-        warnings.warn(f"Invalid FEED_URL: '{_feed_url}'", SyntaxWarning)
-        raise ValueError(
-            "Please specify FEED_URL with full URL, including '://', for "
-            "example: tcp+beast://example.com:30005"
+    tasks.add(adsbcot.SensorWorker(clitool.tx_queue, config))
+
+    if int(config.get("METRICS_PORT") or adsbcot.DEFAULT_METRICS_PORT) > 0:
+        tasks.add(
+            adsbcot.MetricsWorker(clitool.tx_queue, config, _get_metered(tasks))
         )
 
+    return tasks
+
+
+def _get_metered(tasks: Set[pytak.Worker,]) -> List[pytak.Worker]:
+    """Get the workers with counters, including those fed by a replay."""
+    workers: List[pytak.Worker] = []
+    for task in tasks:
+        workers.append(task)
+        if isinstance(task, adsbcot.ADSBReplayWorker):
+            workers.extend(task.targets.values())
+    return [worker for worker in workers if hasattr(worker, "counters")]
+
+
+def _create_feed_tasks(
+    config: SectionProxy,
+    clitool: pytak.CLITool,
+    _feed_url: str,
+    merger: Optional["adsbcot.CraftMerger"] = None,
+) -> Set[pytak.Worker,]:
+    """Create the coroutine task set for a single FEED_URL."""
+    tasks = set()
+
     # Gateway code:
-    feed_url: ParseResult = urlparse(config.get("FEED_URL", ""))
+    feed_url: ParseResult = urlparse(_feed_url)
 
     # ADS-B Workers (receivers):
-    if feed_url.scheme in ["http", "file", "ws", "wss"]:
+    if feed_url.scheme in ["http", "https", "file", "ws", "wss"]:
         # HTTP, WebSocket, or file-based input:
-        tasks.add(adsbcot.ADSBWorker(clitool.tx_queue, config))
+        tasks.add(adsbcot.ADSBWorker(clitool.tx_queue, config, _feed_url, merger))
     elif "tcp" in feed_url.scheme:
         if importlib.util.find_spec("pyModeS") is None:
             warnings.warn(
@@ -92,45 +165,173 @@ def create_tasks(config: SectionProxy, clitool: pytak.CLITool) -> Set[pytak.Work
             )
             raise ValueError
 
-        net_queue: asyncio.Queue = asyncio.Queue()
+        net_queue: asyncio.Queue = asyncio.Queue(
+            maxsize=int(
+                config.get("NET_QUEUE_SIZE") or adsbcot.DEFAULT_NET_QUEUE_SIZE
+            )
+        )
 
-        if "+" in feed_url.scheme:
-            _, data_type = feed_url.scheme.split("+")
-        else:
-            data_type = "raw"
+        data_type: str = _get_data_type(feed_url)
 
-        tasks.add(adsbcot.ADSBNetReceiver(net_queue, config, data_type))
+        tasks.add(adsbcot.ADSBNetReceiver(net_queue, config, data_type, _feed_url))
 
-        tasks.add(adsbcot.ADSBNetWorker(clitool.tx_queue, net_queue, config, data_type))
+        tasks.add(
+            adsbcot.ADSBNetWorker(
+                clitool.tx_queue, net_queue, config, data_type, _feed_url, merger
+            )
+        )
+    elif feed_url.scheme == "replay":
+        tasks.update(_create_replay_tasks(config, clitool, feed_url.path, merger))
 
-    tasks.add(adsbcot.SensorWorker(clitool.tx_queue, config))
+    return tasks
+
+
+def _get_data_type(feed_url: ParseResult) -> str:
+    """Get the data type of a TCP FEED_URL, ex. beast for tcp+beast://..."""
+    if "+" in feed_url.scheme:
+        _, data_type = feed_url.scheme.split("+")
+        return data_type
+    return "raw"
+
+
+def _create_replay_tasks(
+    config: SectionProxy,
+    clitool: pytak.CLITool,
+    path: str,
+    merger: Optional["adsbcot.CraftMerger"] = None,
+) -> Set[pytak.Worker,]:
+    """Create the coroutine task set to replay a capture, see `ADSBReplayWorker`.
+
+    Each feed recorded in the capture gets the same workers it would have live,
+    except for the receivers & pollers, which are replaced by the replay.
+    """
+    tasks = set()
+    replayer = adsbcot.FeedReplayer(path)
+    feeds: List[Tuple[str, str]] = replayer.feeds()
+
+    if merger is None and len(feeds) > 1:
+        merger = adsbcot.CraftMerger()
+        tasks.add(adsbcot.ADSBMergeWorker(clitool.tx_queue, config, merger))
+
+    targets: dict = {}
+    for kind, url in feeds:
+        if kind == "tcp":
+            net_queue: asyncio.Queue = asyncio.Queue(
+                maxsize=int(
+                    config.get("NET_QUEUE_SIZE") or adsbcot.DEFAULT_NET_QUEUE_SIZE
+                )
+            )
+            tasks.add(
+                adsbcot.ADSBNetWorker(
+                    clitool.tx_queue,
+                    net_queue,
+                    config,
+                    _get_data_type(urlparse(url)),
+                    url,
+                    merger,
+                )
+            )
+            targets[(kind, url)] = net_queue
+        else:
+            targets[(kind, url)] = adsbcot.ADSBWorker(
+                clitool.tx_queue, config, url, merger
+            )
 
+    tasks.add(adsbcot.ADSBReplayWorker(clitool.tx_queue, config, replayer, targets))
     return tasks
 
 
-def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,too-many-statements
-    craft: dict,
-    config: Union[SectionProxy, dict, None] = None,
-    known_craft: Optional[dict] = None,
-) -> Optional[ET.Element]:
+def compile_config(
+    config: Union["adsbcot.CompiledConfig", SectionProxy, dict, None] = None,
+) -> "adsbcot.CompiledConfig":
+    """Compile config into an immutable `CompiledConfig`, unless it already is one.
+
+    Parameters
+    ----------
+    config : `CompiledConfig`, `configparser.SectionProxy` or `dict`
+        Configuration options and values.
+
+    Returns
+    -------
+    `CompiledConfig`
+        Immutable snapshot of the config options used for every aircraft.
     """
-    Serialize ADS-B data as Cursor on Target.
+    if isinstance(config, adsbcot.CompiledConfig):
+        return config
+    return adsbcot.CompiledConfig(config)
+
+
+def get_craft_icao(craft: dict) -> str:
+    """Get the ICAO 24-bit address of an aircraft, as upper-case hex."""
+    icao_int = craft.get("Icao_addr", "")  # Stratux: 24-bit ICAO address
+    if icao_int:
+        return aircot.icao_int_to_hex(icao_int).strip().upper()
+    return str(craft.get("hex", craft.get("icao", "")) or "").strip().upper()
+
+
+def get_craft_state(craft: dict) -> Tuple[Any, Any, Any, Any]:
+    """Get the position, altitude & track of an aircraft, as reported by any feed.
 
     Parameters
     ----------
     craft : `dict`
         Key/Value data struct of decoded ADS-B aircraft data.
-    config : `configparser.SectionProxy`
-        Configuration options and values.
-        Uses config options: UID_KEY, COT_STALE, COT_HOST_ID
-    kown_craft : `dict`
-        Optional list of know craft to transform CoT data.
 
     Returns
     -------
-    `xml.etree.ElementTree.Element`
-        Cursor-On-Target XML ElementTree object.
+    `tuple`
+        (lat, lon, alt, track), any of which may be None if not reported.
+    """
+    position = craft.get("lastPosition") or craft
+    lat = position.get("lat", position.get("Lat"))
+    lon = position.get("lon", position.get("Lon", position.get("Lng")))
+    alt = craft.get("alt_geom", craft.get("alt_baro", craft.get("Alt")))
+    track = craft.get("trk", craft.get("track", craft.get("Track")))
+    return lat, lon, alt, track
+
+
+def get_json_loads(
+    codec: Optional[str] = adsbcot.DEFAULT_JSON_CODEC,
+) -> Callable[[Union[str, bytes]], Any]:
+    """Get the JSON decoding function of the named codec: auto, orjson or json.
+
+    Both accept `str` or `bytes`, and raise a subclass of `json.JSONDecodeError`.
     """
+    codec = str(codec or adsbcot.DEFAULT_JSON_CODEC).strip().lower()
+    if codec not in ("auto", "orjson", "json"):
+        raise ValueError(f"Unknown JSON_CODEC: {codec}")
+    if codec == "json":
+        return json.loads
+    if orjson is None:
+        if codec == "orjson":
+            Logger.warning("JSON_CODEC=orjson, but orjson isn't installed: using json")
+        return json.loads
+    return orjson.loads
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse an HTTP Retry-After header, in seconds or as an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+def _adsb_to_cot_fields(  # NOQA pylint: disable=too-many-locals,too-many-branches,too-many-statements
+    craft: dict,
+    settings: "adsbcot.CompiledConfig",
+    known_craft: Optional[dict] = None,
+) -> Optional[dict]:
+    """Derive the values of a CoT Event from ADS-B data, for any serializer."""
     lastPosition = craft.get("lastPosition")
     if lastPosition:
         craft.update(lastPosition)
@@ -144,16 +345,14 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
 
     remarks_fields = []
     known_craft = known_craft or {}
-    config = config or {}
     category = None
     tisb: bool = False
 
-    uid_key: str = config.get("UID_KEY", "ICAO")
-    cot_stale: int = int(config.get("COT_STALE", pytak.DEFAULT_COT_STALE))
-    cot_host_id: str = config.get("COT_HOST_ID", pytak.DEFAULT_HOST_ID)
+    uid_key: str = settings.uid_key
+    cot_host_id: str = settings.cot_host_id
 
-    __adsb = ET.Element("__adsb")
-    __adsb.set("cot_host_id", cot_host_id)
+    # Attributes of the __adsb element, in document order:
+    __adsb: dict = {"cot_host_id": cot_host_id}
 
     # Stratux reports Icao_addr as an int:
     icao_addr: str = aircot.icao_int_to_hex(
@@ -176,8 +375,8 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
     _type = craft.get("t", craft.get("TargetType", 0))
     craft_type: str = str(_type).strip().upper()
 
-    alt_upper: int = int(config.get("ALT_UPPER", "0"))
-    alt_lower: int = int(config.get("ALT_LOWER", "0"))
+    alt_upper: int = settings.alt_upper
+    alt_lower: int = settings.alt_lower
 
     alt_geom = craft.get("alt_geom")
 
@@ -197,34 +396,34 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
                     "altitude too low, ignoring COT"
                 )
                 return None
-    __adsb.set("alt_geom", str(craft.get("alt_geom")))
-    __adsb.set("x_alt_geom", str(craft.get("x_alt_geom")))
-    __adsb.set("alt_baro", str(craft.get("alt_baro")))
-    __adsb.set("x_alt_baro_offset", str(craft.get("x_alt_baro_offset")))
+    __adsb["alt_geom"] = str(craft.get("alt_geom"))
+    __adsb["x_alt_geom"] = str(craft.get("x_alt_geom"))
+    __adsb["alt_baro"] = str(craft.get("alt_baro"))
+    __adsb["x_alt_baro_offset"] = str(craft.get("x_alt_baro_offset"))
 
     if flight:
         remarks_fields.append(flight)
-        __adsb.set("flight", flight)
+        __adsb["flight"] = flight
 
     if reg:
         remarks_fields.append(reg)
-        __adsb.set("reg", reg)
+        __adsb["reg"] = reg
 
     if squawk:
         remarks_fields.append(f"Squawk: {squawk}")
-        __adsb.set("squawk", squawk)
+        __adsb["squawk"] = squawk
 
     if icao_hex:
         remarks_fields.append(icao_hex)
-        __adsb.set("icao", icao_hex)
+        __adsb["icao"] = icao_hex
 
     if cat:
         category = aircot.set_category(cat, known_craft)
         remarks_fields.append(f"Cat.: {cat}")
-        __adsb.set("cat", cat)
+        __adsb["cat"] = cat
 
     if craft_type:
-        __adsb.set("craft_type", str(craft_type))
+        __adsb["craft_type"] = str(craft_type)
         remarks_fields.append(f"Type:{craft_type}")
 
         craft_type_name: Union[str, None] = None
@@ -242,7 +441,7 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
             tisb = True
         if craft_type_name:
             remarks_fields.append(f"ADS-B Type: {craft_type}")
-            __adsb.set("craft_type", craft_type)
+            __adsb["craft_type"] = craft_type
 
     cot_uid: str = ""
     if "REG" in uid_key and reg:
@@ -259,19 +458,10 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
         Logger.warning(f"cot_uid={cot_uid}")
         return None
 
-    if flight:
-        callsign = flight
-    elif reg:
-        callsign = reg
-    else:
-        callsign = icao_hex
-
     _, callsign = aircot.set_name_callsign(
         icao_hex, reg, craft_type, flight, known_craft
     )
 
-    cat = aircot.set_category(cat, known_craft)
-
     if tisb:
         cot_type = "a-u-A"
     else:
@@ -290,41 +480,86 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
             craft.get("Alt", craft.get("alt_geom", craft.get("alt_geom_x")))
         )
 
-    ce = str(float(nac_p) + ground_const)
-    le = str(float(nac_v) + 12.5)
-
-    contact: ET.Element = ET.Element("contact")
-    contact.set("callsign", callsign)
-
-    uid = ET.Element("UID")
-    uid.set("Droid", str(callsign))
-
-    track: ET.Element = ET.Element("track")
-
     course = craft.get(
         "trk", craft.get("track", craft.get("Track", pytak.DEFAULT_COT_VAL))
     )
-    track.set("course", str(course))
 
     _speed = craft.get("gs", craft.get("Speed", 0.0))
     speed = aircot.functions.get_speed(_speed)
-    track.set("speed", str(speed))
-
-    track.set("slope", str(craft.get("Vvel", pytak.DEFAULT_COT_VAL)))
 
-    _radio = ET.Element("_radio")
     _signal = craft.get("SignalLevel", craft.get("rssi"))
     if _signal:
-        __adsb.set("signalLevel", str(_signal))
-        _radio.set("signal", str(_signal))
+        __adsb["signalLevel"] = str(_signal)
+
+    remarks_fields.append(f"FEED_URL: {settings.feed_url}")
+    __adsb["feed_url"] = settings.feed_url
+    remarks_fields.append(f"{cot_host_id}")
+
+    return {
+        "lat": str(lat),
+        "lon": str(lon),
+        "ce": str(float(nac_p) + ground_const),
+        "le": str(float(nac_v) + 12.5),
+        "hae": str(hae),
+        "uid": cot_uid,
+        "cot_type": cot_type,
+        "callsign": callsign,
+        "course": str(course),
+        "speed": str(speed),
+        "slope": str(craft.get("Vvel", pytak.DEFAULT_COT_VAL)),
+        "remarks": " ".join(list(filter(None, remarks_fields))),
+        "__adsb": __adsb,
+        "signal": str(_signal) if _signal else None,
+        "icon": known_craft.get("ICON"),
+    }
+
+
+def adsb_to_cot_xml(
+    craft: dict,
+    config: Union["adsbcot.CompiledConfig", SectionProxy, dict, None] = None,
+    known_craft: Optional[dict] = None,
+) -> Optional[ET.Element]:
+    """
+    Serialize ADS-B data as Cursor on Target.
+
+    Parameters
+    ----------
+    craft : `dict`
+        Key/Value data struct of decoded ADS-B aircraft data.
+    config : `CompiledConfig`, `configparser.SectionProxy` or `dict`
+        Configuration options and values, ideally pre-compiled with `compile_config`.
+        Uses config options: UID_KEY, COT_STALE, COT_HOST_ID, COT_ACCESS,
+        ALT_UPPER, ALT_LOWER, FEED_URL
+    kown_craft : `dict`
+        Optional list of know craft to transform CoT data.
+
+    Returns
+    -------
+    `xml.etree.ElementTree.Element`
+        Cursor-On-Target XML ElementTree object.
+    """
+    settings = compile_config(config)
+    fields: Optional[dict] = _adsb_to_cot_fields(craft, settings, known_craft)
+    if fields is None:
+        return None
+
+    contact: ET.Element = ET.Element("contact")
+    contact.set("callsign", fields["callsign"])
+
+    track: ET.Element = ET.Element("track")
+    track.set("course", fields["course"])
+    track.set("speed", fields["speed"])
+    track.set("slope", fields["slope"])
+
+    __adsb = ET.Element("__adsb", fields["__adsb"])
+
+    _radio = ET.Element("_radio")
+    if fields["signal"]:
+        _radio.set("signal", fields["signal"])
 
-    remarks_fields.append(f"FEED_URL: {config.get('FEED_URL', '')}")
-    __adsb.set("feed_url", config.get("FEED_URL", ""))
     # Remarks should always be the first sub-entity within the Detail entity.
     remarks = ET.Element("remarks")
-    remarks_fields.append(f"{cot_host_id}")
-    _remarks = " ".join(list(filter(None, remarks_fields)))
-    remarks.text = _remarks
+    remarks.text = fields["remarks"]
 
     detail = ET.Element("detail")
     detail.append(track)
@@ -333,24 +568,23 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
     detail.append(__adsb)
     detail.append(_radio)
 
-    icon = known_craft.get("ICON")
-    if icon:
+    if fields["icon"]:
         usericon = ET.Element("usericon")
-        usericon.set("iconsetpath", icon)
+        usericon.set("iconsetpath", fields["icon"])
         detail.append(usericon)
 
     cot_d = {
-        "lat": str(lat),
-        "lon": str(lon),
-        "ce": str(ce),
-        "le": str(le),
-        "hae": str(hae),
-        "uid": cot_uid,
-        "cot_type": cot_type,
-        "stale": cot_stale,
+        "lat": fields["lat"],
+        "lon": fields["lon"],
+        "ce": fields["ce"],
+        "le": fields["le"],
+        "hae": fields["hae"],
+        "uid": fields["uid"],
+        "cot_type": fields["cot_type"],
+        "stale": settings.cot_stale,
     }
     cot = pytak.gen_cot_xml(**cot_d)
-    cot.set("access", config.get("COT_ACCESS", pytak.DEFAULT_COT_ACCESS))
+    cot.set("access", settings.cot_access)
     cot.set("qos", "1-r-c")
 
     _detail = cot.findall("detail")[0]
@@ -362,6 +596,130 @@ def adsb_to_cot_xml(  # NOQA pylint: disable=too-many-locals,too-many-branches,t
     return cot
 
 
+# Pre-computed CoT Event template for `adsb_to_cot_template()`. Element & attribute
+# order matches the ElementTree serializer, so both produce the same document.
+COT_EVENT_TEMPLATE: str = (
+    '<event version="2.0" type="%s" uid="%s" how="m-g" time="%s" start="%s" '
+    'stale="%s" access="%s" qos="1-r-c"><point lat="%s" lon="%s" le="%s" '
+    'hae="%s" ce="%s" /><detail><track course="%s" speed="%s" slope="%s" />'
+    '<contact callsign="%s" /><remarks>%s</remarks><__adsb %s />%s%s'
+    '<_flow-tags_ %s="%s" /></detail></event>'
+)
+FLOW_TAG: str = f"{pytak.DEFAULT_HOST_ID}-pytak".replace("@", "-")
+
+
+def _escape_attrib(text: str) -> str:
+    """Escape an XML attribute value, as `xml.etree.ElementTree` would."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    if '"' in text:
+        text = text.replace('"', "&quot;")
+    if "\r" in text:
+        text = text.replace("\r", "&#13;")
+    if "\n" in text:
+        text = text.replace("\n", "&#10;")
+    if "\t" in text:
+        text = text.replace("\t", "&#09;")
+    return text
+
+
+def _escape_text(text: str) -> str:
+    """Escape XML character data, as `xml.etree.ElementTree` would."""
+    if "&" in text:
+        text = text.replace("&", "&amp;")
+    if "<" in text:
+        text = text.replace("<", "&lt;")
+    if ">" in text:
+        text = text.replace(">", "&gt;")
+    return text
+
+
+def cot_times(cot_stale: int) -> Tuple[str, str]:
+    """Get the CoT time & stale strings for an Event generated now."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    stale = now + datetime.timedelta(seconds=int(cot_stale))
+    return (
+        now.strftime(pytak.W3C_XML_DATETIME),
+        stale.strftime(pytak.W3C_XML_DATETIME),
+    )
+
+
+def adsb_to_cot_template(
+    craft: dict,
+    config: Union["adsbcot.CompiledConfig", SectionProxy, dict, None] = None,
+    known_craft: Optional[dict] = None,
+    times: Optional[Tuple[str, str]] = None,
+) -> Optional[bytes]:
+    """
+    Serialize ADS-B data as Cursor on Target XML bytes, without ElementTree.
+
+    Produces the same document as `adsb_to_cot()`, by filling in a pre-computed
+    template rather than building & serializing an ElementTree.
+
+    Parameters
+    ----------
+    craft : `dict`
+        Key/Value data struct of decoded ADS-B aircraft data.
+    config : `CompiledConfig`, `configparser.SectionProxy` or `dict`
+        Configuration options and values.
+    kown_craft : `dict`
+        Optional list of know craft to transform CoT data.
+    times : `tuple`
+        Optional (time, stale) strings from `cot_times()`, to share between Events.
+
+    Returns
+    -------
+    `bytes`
+        Cursor-On-Target XML, including the XML declaration.
+    """
+    settings = compile_config(config)
+    fields: Optional[dict] = _adsb_to_cot_fields(craft, settings, known_craft)
+    if fields is None:
+        return None
+
+    cot_time, cot_stale = times or cot_times(settings.cot_stale)
+
+    __adsb: str = " ".join(
+        f'{key}="{_escape_attrib(value)}"' for key, value in fields["__adsb"].items()
+    )
+    signal = fields["signal"]
+    _radio = f'<_radio signal="{_escape_attrib(signal)}" />' if signal else "<_radio />"
+    icon = fields["icon"]
+    usericon = f'<usericon iconsetpath="{_escape_attrib(icon)}" />' if icon else ""
+
+    cot: str = COT_EVENT_TEMPLATE % (
+        _escape_attrib(fields["cot_type"]),
+        _escape_attrib(fields["uid"]),
+        cot_time,
+        cot_time,
+        cot_stale,
+        _escape_attrib(settings.cot_access),
+        _escape_attrib(fields["lat"]),
+        _escape_attrib(fields["lon"]),
+        _escape_attrib(fields["le"]),
+        _escape_attrib(fields["hae"]),
+        _escape_attrib(fields["ce"]),
+        _escape_attrib(fields["course"]),
+        _escape_attrib(fields["speed"]),
+        _escape_attrib(fields["slope"]),
+        _escape_attrib(fields["callsign"]),
+        _escape_text(fields["remarks"]),
+        __adsb,
+        _radio,
+        usericon,
+        FLOW_TAG,
+        cot_time,
+    )
+    # Same encoding as `ET.tostring()`: ASCII, with character references.
+    return b"\n".join(
+        [pytak.DEFAULT_XML_DECLARATION, cot.encode("ascii", "xmlcharrefreplace")]
+    )
+
+
 def gen_sensor_cot(
     config=None, lat: float = 0.0, lon: float = 0.0, hae: float = 0.0,
     ce: str = "9999999.0", le: str = "9999999.0",
@@ -372,7 +730,9 @@ def gen_sensor_cot(
     cot_type = config.get("SENSOR_COT_TYPE", adsbcot.DEFAULT_SENSOR_COT_TYPE)
     cot_stale = int(config.get("COT_STALE", pytak.DEFAULT_COT_STALE))
     callsign = config.get("SENSOR_CALLSIGN", sensor_id)
-    payload_type = config.get("SENSOR_PAYLOAD_TYPE", adsbcot.DEFAULT_SENSOR_PAYLOAD_TYPE)
+    payload_type = config.get(
+        "SENSOR_PAYLOAD_TYPE", adsbcot.DEFAULT_SENSOR_PAYLOAD_TYPE
+    )
 
     contact = ET.Element("contact")
     contact.set("callsign", callsign)
@@ -400,11 +760,125 @@ def gen_sensor_cot(
 
 def adsb_to_cot(
     craft: dict,
-    config: Union[SectionProxy, dict, None] = None,
+    config: Union["adsbcot.CompiledConfig", SectionProxy, dict, None] = None,
     known_craft: Optional[dict] = None,
 ) -> Optional[bytes]:
     """Return CoT XML object as an XML string."""
-    cot: Optional[ET.Element] = adsb_to_cot_xml(craft, config, known_craft)
+    settings = compile_config(config)
+    if settings.cot_serializer == "template":
+        return adsb_to_cot_template(craft, settings, known_craft)
+    cot: Optional[ET.Element] = adsb_to_cot_xml(craft, settings, known_craft)
     return (
         b"\n".join([pytak.DEFAULT_XML_DECLARATION, ET.tostring(cot)]) if cot else None
     )
+
+
+def adsb_to_cot_batch(
+    crafts: Iterable[dict],
+    config: Union["adsbcot.CompiledConfig", SectionProxy, dict, None] = None,
+    known_craft_index: Optional["adsbcot.KnownCraftIndex"] = None,
+) -> List[bytes]:
+    """
+    Serialize many ADS-B aircraft as Cursor on Target XML strings.
+
+    Config is compiled, the serializer chosen and (for the template serializer)
+    the CoT timestamps generated once for the whole batch, rather than per aircraft.
+
+    Parameters
+    ----------
+    crafts : `list[dict, ]`
+        Key/Value data structs of decoded ADS-B aircraft data.
+    config : `CompiledConfig`, `configparser.SectionProxy` or `dict`
+        Configuration options and values.
+    known_craft_index : `KnownCraftIndex`
+        Optional index of known craft, looked up by each aircraft's ICAO.
+
+    Returns
+    -------
+    `list[bytes, ]`
+        CoT Events for each aircraft that could be serialized, in order.
+    """
+    settings = compile_config(config)
+    get_known = known_craft_index.get if known_craft_index else None
+    events: List[bytes] = []
+
+    if settings.cot_serializer == "template":
+        times = cot_times(settings.cot_stale)
+        for craft in crafts:
+            if not isinstance(craft, dict):
+                continue
+            known_craft = get_known(get_craft_icao(craft)) if get_known else None
+            event = adsb_to_cot_template(craft, settings, known_craft, times)
+            if event:
+                events.append(event)
+    else:
+        for craft in crafts:
+            if not isinstance(craft, dict):
+                continue
+            known_craft = get_known(get_craft_icao(craft)) if get_known else None
+            cot = adsb_to_cot_xml(craft, settings, known_craft)
+            if cot is not None:
+                events.append(
+                    b"\n".join([pytak.DEFAULT_XML_DECLARATION, ET.tostring(cot)])
+                )
+
+    return events
+
+
+def get_recorder(path: Optional[str]) -> Optional["adsbcot.FeedRecorder"]:
+    """Get the `FeedRecorder` of a CAPTURE_FILE, or None if it isn't set.
+
+    Every feed's workers share one recorder per capture file, closed at exit.
+    """
+    if not path:
+        return None
+    recorder = _RECORDERS.get(path)
+    if recorder is None:
+        recorder = adsbcot.FeedRecorder(path)
+        _RECORDERS[path] = recorder
+        atexit.register(recorder.close)
+    return recorder
+
+
+def init_pool_worker(
+    config: Union["adsbcot.CompiledConfig", SectionProxy, dict, None] = None,
+    known_craft: Optional[str] = None,
+) -> None:
+    """Initialize a process pool worker, loading KNOWN_CRAFT once per process."""
+    _POOL_STATE["settings"] = compile_config(config)
+    _POOL_STATE["known_craft_index"] = (
+        adsbcot.KnownCraftIndex.from_file(known_craft) if known_craft else None
+    )
+
+
+def init_decode_shard(
+    ttl: float,
+    max_range: float,
+    reference: Optional[Tuple[float, float]] = None,
+) -> None:
+    """Initialize an `ADSBNetWorker` decoder process, with its own `ModeSDecoder`."""
+    _POOL_STATE["modes_decoder"] = adsbcot.ModeSDecoder(ttl, max_range, reference)
+
+
+def shard_decode(frames: list, t_received: float) -> List[Tuple[str, dict]]:
+    """Decode Mode S frames within a decoder process.
+
+    Returns the ICAO address & state of each aircraft with a frame in the batch.
+    """
+    modes = _POOL_STATE["modes_decoder"]
+    modes.buffer_frames(frames, t_received)
+    return [(state.icao, state.values()) for state in modes.decode()]
+
+
+def pool_adsb_to_cot_batch(crafts: List[dict]) -> Tuple[List[bytes], float]:
+    """Serialize aircraft as CoT within a process pool worker.
+
+    Returns the CoT Events & the time, in seconds, they took to serialize.
+    """
+    started: float = time.perf_counter()
+    events: List[bytes] = adsb_to_cot_batch(
+        crafts,
+        _POOL_STATE.get("settings"),
+        _POOL_STATE.get("known_craft_index"),
+    )
+    return events, time.perf_counter() - started
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""ADSBCOT Mode S Class Definitions."""
+
+import time
+
+from collections import Counter
+from typing import (
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import adsbcot
+
+from adsbcot.modes_functions import (
+    CPR_LOCAL_RANGE,
+    cpr_frame,
+    cpr_global,
+    cpr_local,
+    great_circle_distance,
+    modes_crc_batch,
+    modes_typecode,
+)
+
+
+class ModeSFrame(NamedTuple):
+    """A Mode S (or Mode A/C) frame, as received from a Beast or AVR feed.
+
+    `mlat` is the receiver's 12 MHz MLAT timestamp, and `rssi` its signal level
+    (0-255), or 0 if the feed doesn't give them.
+    """
+
+    msg: bytes
+    mlat: int = 0
+    rssi: int = 0
+
+
+class BeastFramer:
+    """Incrementally split a Mode-S Beast binary stream into frames.
+
+    Each frame is <esc> type, a 6 byte MLAT timestamp, a 1 byte signal level and
+    a 2 (Mode A/C), 7 (Mode S short) or 14 (Mode S long) byte message, where
+    <esc> is 0x1a and any 0x1a in the rest of the frame is doubled. `feed()`
+    reads as they arrive; a partial frame at the end of a read is kept until
+    the next. Bytes that aren't part of a frame are skipped, resynchronizing on
+    the next <esc>.
+    """
+
+    ESC: int = 0x1A
+    # Length of the timestamp, signal level & message of each frame type:
+    LENGTHS: Dict[int, int] = {0x31: 9, 0x32: 14, 0x33: 21}
+
+    def __init__(self) -> None:
+        """Initialize this class."""
+        self._buffer: bytearray = bytearray()
+        self.counters: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[ModeSFrame]:
+        """Read data from the stream, returns the frames completed by it."""
+        buffer: bytearray = self._buffer
+        buffer += data
+        size: int = len(buffer)
+        frames: List[ModeSFrame] = []
+        esc: int = self.ESC
+        lengths: Dict[int, int] = self.LENGTHS
+        pos: int = 0
+
+        # Frames are read through a view of the buffer, so each message is copied
+        # once, into the bytes of its frame. Frames can't be views themselves: they
+        # outlive the buffer, and are pickled to decoder processes.
+        with memoryview(buffer) as view:
+            while 1:
+                start: int = buffer.find(esc, pos)
+                if start < 0:
+                    self.counters["beast_skipped_bytes"] += size - pos
+                    pos = size
+                    break
+                if start > pos:
+                    self.counters["beast_skipped_bytes"] += start - pos
+                if start + 1 >= size:
+                    pos = start
+                    break
+
+                length = lengths.get(buffer[start + 1])
+                if length is None:
+                    # An escaped 0x1a or unknown frame type, so we're out of sync:
+                    self.counters["beast_unknown_frames"] += 1
+                    pos = start + 2 if buffer[start + 1] == esc else start + 1
+                    continue
+
+                end: int = start + 2 + length
+                if end > size:
+                    pos = start
+                    break
+
+                if buffer.find(esc, start + 2, end) < 0:
+                    frames.append(
+                        ModeSFrame(
+                            view[start + 9 : end].tobytes(),
+                            int.from_bytes(view[start + 2 : start + 8], "big"),
+                            buffer[start + 8],
+                        )
+                    )
+                    pos = end
+                    continue
+
+                body, end = self._unescape(buffer, start + 2, length)
+                if body is None:
+                    if end < 0:  # Incomplete, wait for the next read.
+                        pos = start
+                        break
+                    # An unescaped <esc> inside a frame: it was truncated.
+                    self.counters["beast_truncated_frames"] += 1
+                    pos = end
+                    continue
+                frames.append(
+                    ModeSFrame(
+                        bytes(body[7:]), int.from_bytes(body[:6], "big"), body[6]
+                    )
+                )
+                pos = end
+
+        # Frames are consumed from the front of the buffer, which CPython's
+        # bytearray does without moving the remainder on every read:
+        del buffer[:pos]
+        self.counters["beast_frames"] += len(frames)
+        return frames
+
+    def _unescape(self, buffer: bytearray, pos: int, length: int):
+        """Read `length` bytes of a frame, undoubling any escaped 0x1a.
+
+        Returns the frame & the position after it, or None & -1 if the buffer ends
+        first, or None & the position of an unescaped 0x1a that cut the frame short.
+        """
+        esc: int = self.ESC
+        size: int = len(buffer)
+        body: bytearray = bytearray()
+        while len(body) < length:
+            if pos >= size:
+                return None, -1
+            byte: int = buffer[pos]
+            if byte == esc:
+                if pos + 1 >= size:
+                    return None, -1
+                if buffer[pos + 1] != esc:
+                    return None, pos
+                pos += 1
+            body.append(byte)
+            pos += 1
+        return body, pos
+
+
+class AVRFramer:
+    """Incrementally split an AVR (raw) text stream into frames.
+
+    Frames are hex messages terminated by ';', prefixed with '*' (no timestamp),
+    '@' or '%' (12 hex digit MLAT timestamp), or '<' (timestamp & 2 hex digit
+    signal level), as sent on dump1090's & readsb's raw output port.
+    """
+
+    TERMINATOR: bytes = b";"
+
+    def __init__(self) -> None:
+        """Initialize this class."""
+        self._buffer: bytearray = bytearray()
+        self.counters: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> List[ModeSFrame]:
+        """Read data from the stream, returns the frames completed by it."""
+        buffer: bytearray = self._buffer
+        buffer += data
+        end: int = buffer.rfind(self.TERMINATOR)
+        if end < 0:
+            return []
+
+        frames: List[ModeSFrame] = []
+        for line in buffer[:end].split(self.TERMINATOR):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                prefix: int = line[0]
+                if prefix == 0x2A:  # '*'
+                    frames.append(ModeSFrame(bytes.fromhex(line[1:].decode())))
+                elif prefix in (0x40, 0x25):  # '@' & '%'
+                    frames.append(
+                        ModeSFrame(
+                            bytes.fromhex(line[13:].decode()), int(line[1:13], 16)
+                        )
+                    )
+                elif prefix == 0x3C:  # '<'
+                    frames.append(
+                        ModeSFrame(
+                            bytes.fromhex(line[15:].decode()),
+                            int(line[1:13], 16),
+                            int(line[13:15], 16),
+                        )
+                    )
+                else:
+                    self.counters["avr_invalid_frames"] += 1
+            except ValueError:
+                self.counters["avr_invalid_frames"] += 1
+
+        del buffer[: end + 1]
+        self.counters["avr_frames"] += len(frames)
+        return frames
+
+
+class FrameFilter:
+    """Validate a batch of Mode S frames, keeping only those the decoder uses.
+
+    DF17/18 (ADS-B) frames are kept if their CRC is valid, and their senders'
+    ICAO addresses remembered for `icao_ttl` seconds. DF20/21 (Comm-B) frames,
+    whose CRC is overlaid with the sender's address, are kept if that address is
+    one of those remembered.
+    """
+
+    ADSB_DFS: FrozenSet[int] = frozenset((17, 18))
+    DFS: FrozenSet[int] = frozenset((17, 18, 20, 21))
+
+    def __init__(self, icao_ttl: float = adsbcot.DEFAULT_MODES_ICAO_TTL) -> None:
+        """Initialize this class."""
+        self.icao_ttl: float = icao_ttl
+        self.known: Dict[int, float] = {}
+        self.counters: Counter = Counter()
+        self._pruned: float = 0.0
+
+    def filter(
+        self, frames: Sequence[ModeSFrame], now: Optional[float] = None
+    ) -> List[ModeSFrame]:
+        """Get the valid DF17/18/20/21 frames of a batch, in order."""
+        now = time.monotonic() if now is None else now
+        self.counters["frames"] += len(frames)
+
+        # DF17/18/20/21 are all long frames, & the DF is the first 5 bits:
+        dfs = self.DFS
+        candidates: List[ModeSFrame] = [
+            frame
+            for frame in frames
+            if len(frame.msg) == 14 and frame.msg[0] >> 3 in dfs
+        ]
+        self.counters["df_skipped"] += len(frames) - len(candidates)
+        if not candidates:
+            return []
+
+        syndromes: List[int] = modes_crc_batch([frame.msg for frame in candidates])
+
+        # Learn addresses from the whole batch before checking Comm-B frames:
+        adsb_dfs = self.ADSB_DFS
+        known: Dict[int, float] = self.known
+        for frame, syndrome in zip(candidates, syndromes):
+            if syndrome == 0 and frame.msg[0] >> 3 in adsb_dfs:
+                known[int.from_bytes(frame.msg[1:4], "big")] = now
+
+        valid: List[ModeSFrame] = []
+        for frame, syndrome in zip(candidates, syndromes):
+            if frame.msg[0] >> 3 in adsb_dfs:
+                if syndrome == 0:
+                    valid.append(frame)
+                    continue
+            else:
+                seen: Optional[float] = known.get(syndrome)
+                if seen is not None and now - seen <= self.icao_ttl:
+                    valid.append(frame)
+                    continue
+            self.counters["crc_failed"] += 1
+
+        if now - self._pruned > self.icao_ttl:
+            self._pruned = now
+            self.known = {
+                icao: seen
+                for icao, seen in known.items()
+                if now - seen <= self.icao_ttl
+            }
+
+        self.counters["valid"] += len(valid)
+        return valid
+
+
+class PositionDecoder:
+    """Decode ADS-B airborne & surface positions from single CPR frames.
+
+    Each frame is decoded, in order of preference:
+
+    1. Globally, with the aircraft's other (even or odd) frame, if it was received
+       within `pair_window` seconds. Airborne positions only.
+    2. Locally, relative to the aircraft's last confirmed position, if it was
+       decoded within `ttl` seconds.
+    3. Locally, relative to the receiver's `reference` position. Surface positions
+       always, but airborne positions only if `max_range` is set, and within
+       180 NM: an aircraft heard from farther away is decoded to a wrong position,
+       which is always within 180 NM, so `max_range` must be the receiver's real
+       horizon.
+
+    Airborne positions decoded relative to the receiver are provisional: they're
+    never decoded relative to, and are replaced by the aircraft's next global
+    decode. Those more than `max_range` meters from the receiver are rejected, but
+    global decodes, and local decodes relative to them, are unambiguous so never
+    are.
+    """
+
+    def __init__(
+        self,
+        reference: Optional[Tuple[float, float]] = None,
+        max_range: float = adsbcot.DEFAULT_CPR_MAX_RANGE,
+        ttl: float = adsbcot.DEFAULT_AIRCRAFT_TTL,
+        pair_window: float = 10.0,
+    ) -> None:
+        """Initialize this class."""
+        self.reference: Optional[Tuple[float, float]] = reference
+        self.max_range: float = max_range
+        self.ttl: float = ttl
+        self.pair_window: float = pair_window
+        # Last even & odd CPR frame, and last position, of each aircraft:
+        self.frames: Dict[str, list] = {}
+        self.positions: Dict[str, Tuple[float, float, float]] = {}
+        self.counters: Counter = Counter()
+        self._pruned: float = 0.0
+
+    def decode(
+        self, icao: str, msg: bytes, now: Optional[float] = None
+    ) -> Optional[Tuple[float, float]]:
+        """Decode the position in an ADS-B message, or None if it can't be."""
+        now = time.monotonic() if now is None else now
+        typecode: int = modes_typecode(msg)
+        surface: bool = 5 <= typecode <= 8
+        if not surface and not (9 <= typecode <= 18 or 20 <= typecode <= 22):
+            return None
+
+        odd, lat_cpr, lon_cpr = cpr_frame(msg)
+        frames: list = self.frames.setdefault(icao, [None, None])
+        frames[odd] = (lat_cpr, lon_cpr, now)
+        other = frames[1 - odd]
+        last = self.positions.get(icao)
+        reference = self.reference
+        max_range: float = self.max_range
+
+        position: Optional[Tuple[float, float]] = None
+        method: str = ""
+        if not surface and other is not None and now - other[2] <= self.pair_window:
+            even_frame, odd_frame = (other, frames[1]) if odd else (frames[0], other)
+            position = cpr_global(even_frame[:2], odd_frame[:2], bool(odd))
+            method = "global"
+        if position is None and last is not None and now - last[2] <= self.ttl:
+            position = cpr_local(lat_cpr, lon_cpr, odd, last[0], last[1], surface)
+            method = "local"
+        if (
+            position is None
+            and reference is not None
+            and (surface or 0 < max_range <= CPR_LOCAL_RANGE)
+        ):
+            position = cpr_local(
+                lat_cpr, lon_cpr, odd, reference[0], reference[1], surface
+            )
+            method = "reference"
+
+        self.prune(now)
+        if position is None:
+            self.counters["cpr_undecoded"] += 1
+            return None
+
+        if (
+            method == "reference"
+            and max_range > 0
+            and great_circle_distance(reference[0], reference[1], *position) > max_range
+        ):
+            self.counters["cpr_range_rejected"] += 1
+            return None
+
+        if surface or method != "reference":
+            self.positions[icao] = (position[0], position[1], now)
+        self.counters[f"cpr_{method}"] += 1
+        return position
+
+    def prune(self, now: float) -> None:
+        """Forget aircraft whose last frame is older than the TTL."""
+        if now - self._pruned <= self.ttl:
+            return
+        self._pruned = now
+        self.frames = {
+            icao: frames
+            for icao, frames in self.frames.items()
+            if any(frame and now - frame[2] <= self.ttl for frame in frames)
+        }
+        self.positions = {
+            icao: position
+            for icao, position in self.positions.items()
+            if now - position[2] <= self.ttl
+        }
+
+
+def get_framer(data_type: str) -> Union[BeastFramer, AVRFramer]:
+    """Get a framer for the given TCP feed data type: beast or raw."""
+    if "beast" in data_type:
+        return BeastFramer()
+    if "raw" in data_type:
+        return AVRFramer()
+    raise ValueError(f"No framer for data_type='{data_type}'")
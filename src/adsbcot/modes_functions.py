@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""ADSBCOT Mode S Functions."""
+
+import math
+
+from typing import List, Optional, Sequence, Tuple
+
+# NumPy is optional, and only used to check the CRC of many messages at once:
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Mode S CRC-24 generator polynomial, x^24 + ... + 1 (the x^24 term is implicit).
+CRC24_POLY: int = 0xFFF409
+
+# Batches smaller than this are checked in Python, even if NumPy is installed.
+NUMPY_MIN_BATCH: int = 64
+
+# CPR: number of latitude zones per hemisphere quadrant, and the distance (180 NM)
+# within which a local reference decodes an airborne position unambiguously.
+CPR_NZ: int = 15
+CPR_LOCAL_RANGE: float = 333360.0  # meters
+EARTH_RADIUS: float = 6371008.8  # meters
+
+
+def _crc24_table() -> List[int]:
+    table: List[int] = []
+    for byte in range(256):
+        crc: int = byte << 16
+        for _ in range(8):
+            crc = (crc << 1) ^ CRC24_POLY if crc & 0x800000 else crc << 1
+        table.append(crc & 0xFFFFFF)
+    return table
+
+
+CRC24_TABLE: List[int] = _crc24_table()
+_NP_CRC24_TABLE = np.array(CRC24_TABLE, dtype=np.uint32) if np is not None else None
+
+
+def modes_df(msg: bytes) -> int:
+    """Get the Downlink Format of a Mode S message."""
+    return msg[0] >> 3
+
+
+def modes_crc(msg: bytes) -> int:
+    """Get the CRC-24 syndrome of a Mode S message.
+
+    This is 0 for a valid DF11/17/18 message, and the ICAO address of the sender
+    for a valid Address/Parity message (ex. DF4/5/20/21).
+    """
+    table: List[int] = CRC24_TABLE
+    crc: int = 0
+    for byte in msg[:-3]:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ byte]
+    return crc ^ int.from_bytes(msg[-3:], "big")
+
+
+def modes_crc_batch(msgs: Sequence[bytes]) -> List[int]:
+    """Get the CRC-24 syndromes of many Mode S messages of the same length.
+
+    With NumPy, each byte position is checked across all the messages at once.
+    """
+    if np is None or len(msgs) < NUMPY_MIN_BATCH:
+        return [modes_crc(msg) for msg in msgs]
+
+    length: int = len(msgs[0])
+    data = np.frombuffer(b"".join(msgs), dtype=np.uint8).reshape(len(msgs), length)
+    data = data.astype(np.uint32)
+    crc = np.zeros(len(msgs), dtype=np.uint32)
+    for col in range(length - 3):
+        crc = ((crc << 8) & 0xFFFFFF) ^ _NP_CRC24_TABLE[(crc >> 16) ^ data[:, col]]
+    parity = (data[:, -3] << 16) | (data[:, -2] << 8) | data[:, -1]
+    return (crc ^ parity).tolist()
+
+
+def modes_typecode(msg: bytes) -> int:
+    """Get the Type Code of an ADS-B (DF17/18) message."""
+    return msg[4] >> 3
+
+
+def cpr_frame(msg: bytes) -> Tuple[int, float, float]:
+    """Get the CPR format (0 even, 1 odd), latitude & longitude of a position."""
+    me: int = int.from_bytes(msg[4:11], "big")
+    return (me >> 34) & 1, ((me >> 17) & 0x1FFFF) / 131072.0, (me & 0x1FFFF) / 131072.0
+
+
+def cpr_nl(lat: float) -> int:
+    """Get the number of longitude zones at a latitude."""
+    lat = abs(lat)
+    if lat == 0:
+        return 59
+    if lat == 87:
+        return 2
+    if lat > 87:
+        return 1
+    a: float = 1 - math.cos(math.pi / (2 * CPR_NZ))
+    b: float = math.cos(math.radians(lat)) ** 2
+    return int(math.floor(2 * math.pi / math.acos(1 - a / b)))
+
+
+def cpr_local(  # NOQA pylint: disable=too-many-arguments
+    lat_cpr: float,
+    lon_cpr: float,
+    odd: int,
+    ref_lat: float,
+    ref_lon: float,
+    surface: bool = False,
+) -> Tuple[float, float]:
+    """Decode a single CPR position, relative to a nearby reference position.
+
+    The reference must be within 180 NM (45 NM for surface positions) of the
+    aircraft, or the position decoded is wrong, by a multiple of the zone size.
+    """
+    zone: float = 90.0 if surface else 360.0
+    dlat: float = zone / (4 * CPR_NZ - odd)
+    j: int = math.floor(ref_lat / dlat) + math.floor(
+        0.5 + (ref_lat % dlat) / dlat - lat_cpr
+    )
+    lat: float = dlat * (j + lat_cpr)
+
+    dlon: float = zone / max(cpr_nl(lat) - odd, 1)
+    m: int = math.floor(ref_lon / dlon) + math.floor(
+        0.5 + (ref_lon % dlon) / dlon - lon_cpr
+    )
+    return lat, dlon * (m + lon_cpr)
+
+
+def cpr_global(
+    even: Tuple[float, float], odd: Tuple[float, float], odd_latest: bool
+) -> Optional[Tuple[float, float]]:
+    """Decode an airborne position from an even & odd CPR position pair.
+
+    The position is that of the latest of the two, or None if they straddle a
+    longitude zone boundary.
+    """
+    lat_e_cpr, lon_e_cpr = even
+    lat_o_cpr, lon_o_cpr = odd
+
+    j: int = math.floor(59 * lat_e_cpr - 60 * lat_o_cpr + 0.5)
+    lat_e: float = 360.0 / 60 * (j % 60 + lat_e_cpr)
+    lat_o: float = 360.0 / 59 * (j % 59 + lat_o_cpr)
+    if lat_e >= 270:
+        lat_e -= 360
+    if lat_o >= 270:
+        lat_o -= 360
+    if cpr_nl(lat_e) != cpr_nl(lat_o):
+        return None
+
+    lat: float = lat_o if odd_latest else lat_e
+    nl: int = cpr_nl(lat)
+    ni: int = max(nl - odd_latest, 1)
+    m: int = math.floor(lon_e_cpr * (nl - 1) - lon_o_cpr * nl + 0.5)
+    lon: float = 360.0 / ni * (m % ni + (lon_o_cpr if odd_latest else lon_e_cpr))
+    if lon >= 180:
+        lon -= 360
+    return lat, lon
+
+
+def great_circle_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Get the distance, in meters, between two positions."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi: float = phi2 - phi1
+    d_lambda: float = math.radians(lon2 - lon1)
+    a: float = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
@@ -4,10 +4,39 @@
 """ADSBCOT Class Tests."""
 
 import pytest
-from adsbcot.classes import ADSBWorker
+from adsbcot.classes import (
+    ADSBMergeWorker,
+    ADSBNetReceiver,
+    ADSBNetWorker,
+    ADSBReplayWorker,
+    ADSBWorker,
+    AircraftTable,
+    FeedRecorder,
+    FeedReplayer,
+    Histogram,
+    MetricsWorker,
+    AircraftStreamParser,
+    CircuitBreaker,
+    CompiledConfig,
+    CraftMerger,
+    CraftStateCache,
+    KnownCraftIndex,
+    PollScheduler,
+)
 from configparser import ConfigParser, SectionProxy
 import asyncio
+import json
 import logging
+import os
+import pickle
+import socket
+import time
+import urllib.parse
+
+import aiohttp
+import aircot
+
+from aiohttp import web
 
 from unittest.mock import patch, MagicMock
 
@@ -170,6 +199,7 @@ async def test_process_craft_no_icao(real_worker, capsys):
 async def test_process_craft_exclude_tisb(real_worker):
     craft = {"hex": "~ABC123"}
     real_worker.config["INCLUDE_TISB"] = "false"
+    real_worker.settings = CompiledConfig(real_worker.config)
     result = await real_worker.process_craft(craft)
     assert result is None
 
@@ -178,6 +208,7 @@ async def test_process_craft_exclude_tisb(real_worker):
 async def test_process_craft_tisb_only(real_worker):
     craft = {"hex": "ABC123"}
     real_worker.config["TISB_ONLY"] = "true"
+    real_worker.settings = CompiledConfig(real_worker.config)
     result = await real_worker.process_craft(craft)
     assert result is None
 
@@ -228,3 +259,1028 @@ async def test_process_craft_empty_cot(real_worker):
 #                     result = await real_worker.process_craft(craft)
 #                     assert result == "ABC123"
 #                     mock_put_queue.assert_called_once_with(b"cot_event")
+
+
+def test_craft_state_cache_changed():
+    cache = CraftStateCache(refresh=60)
+    assert cache.changed("ABC123", 37.0, -122.0, 3700, 50.1, now=0)
+    cache.update("ABC123", 37.0, -122.0, 3700, 50.1, now=0)
+    assert not cache.changed("ABC123", 37.0, -122.0, 3700, 50.1, now=1)
+    assert cache.changed("ABC123", 37.001, -122.0, 3700, 50.1, now=1)
+    assert cache.changed("ABC123", 37.0, -122.0, 3725, 50.1, now=1)
+    assert cache.changed("ABC123", 37.0, -122.0, 3700, 51.0, now=1)
+    # Forced refresh before COT_STALE:
+    assert cache.changed("ABC123", 37.0, -122.0, 3700, 50.1, now=60)
+
+
+def test_craft_state_cache_thresholds():
+    cache = CraftStateCache(refresh=60, min_distance=500, min_alt=100, min_track=5)
+    cache.update("ABC123", 37.0, -122.0, 3700, 359.0, now=0)
+    assert not cache.changed("ABC123", 37.001, -122.0, 3750, 2.0, now=1)
+    assert cache.changed("ABC123", 37.01, -122.0, 3700, 359.0, now=1)
+    assert cache.changed("ABC123", 37.0, -122.0, 3900, 359.0, now=1)
+    assert cache.changed("ABC123", 37.0, -122.0, 3700, 10.0, now=1)
+
+
+def test_craft_state_cache_eviction():
+    cache = CraftStateCache(max_size=2, ttl=10, refresh=60)
+    cache.update("A", 1.0, 1.0, 100, 1.0, now=0)
+    cache.update("B", 1.0, 1.0, 100, 1.0, now=5)
+    cache.update("C", 1.0, 1.0, 100, 1.0, now=6)
+    assert len(cache) == 2
+    assert cache.changed("A", 1.0, 1.0, 100, 1.0, now=7)
+    assert not cache.changed("B", 1.0, 1.0, 100, 1.0, now=7)
+    assert cache.expire(now=16) == 1
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_process_craft_suppress_unchanged(config):
+    config["SUPPRESS_UNCHANGED"] = "true"
+    worker = ADSBWorker(asyncio.Queue(), config)
+    craft = {"hex": "a9ee47", "lat": 37.8, "lon": -122.0, "alt_baro": 3700}
+
+    assert await worker.process_craft(dict(craft)) == "A9EE47"
+    assert await worker.process_craft(dict(craft)) is None
+    assert worker.queue.qsize() == 1
+
+    craft["lat"] = 37.9
+    assert await worker.process_craft(dict(craft)) == "A9EE47"
+    assert worker.queue.qsize() == 2
+
+
+KNOWN_CRAFT_CSV = """DOMAIN,AGENCY,REG,FLIGHT,CALLSIGN,TYPE,MODEL,HEX,COT,TYPE,,
+EMS,CALSTAR,N832CS,CSTAR7,CALSTAR7,HELICOPTER,,AB1234,a-f-A-C-H,HELICOPTER,,
+FED,USCG,1339,,USCG1339,FIXED WING,,ADF9A1,a-f-A-M-F-R,FIXED WING,,
+FED,TACO,N739UL,,TACO_01,FIXED WING,,A9EE47,a-f-A-T-A-C-O,FIXED WING,,
+"""
+
+
+def test_known_craft_index(tmp_path):
+    known_file = tmp_path / "known_craft.csv"
+    known_file.write_text(KNOWN_CRAFT_CSV)
+    known_craft_db = aircot.read_known_craft(str(known_file))
+    index = KnownCraftIndex.from_file(str(known_file))
+
+    assert len(index) == 3
+    for icao in ("A9EE47", " adf9a1 ", "FFFFFF"):
+        assert index.get(icao, "HEX") == aircot.get_known_craft(
+            known_craft_db, icao, "HEX"
+        )
+    assert index.get("n739ul", "REG")["CALLSIGN"] == "TACO_01"
+    assert index.get("CSTAR7", "FLIGHT")["CALLSIGN"] == "CALSTAR7"
+    assert index.get("", "HEX") == {}
+
+
+def test_known_craft_index_rows():
+    rows = [
+        {"HEX": "A9EE47", "REG": "N739UL", "CALLSIGN": "FIRST"},
+        {"HEX": "a9ee47", "REG": "N739UL", "CALLSIGN": "SECOND"},
+    ]
+    index = KnownCraftIndex(rows)
+    assert index.get("A9EE47")["CALLSIGN"] == "FIRST"
+    assert index.get("N739UL", "REG")["CALLSIGN"] == "FIRST"
+    assert not KnownCraftIndex(None)
+
+
+def test_compiled_config(config):
+    config["ALT_UPPER"] = "40000"
+    config["COT_STALE"] = "60"
+    settings = CompiledConfig(config)
+    assert settings.alt_upper == 40000
+    assert settings.cot_stale == 60
+    assert settings.uid_key == "ICAO"
+    assert settings.include_all_craft is True
+    assert settings.include_tisb is False
+
+    dict_settings = CompiledConfig(
+        {"ALT_UPPER": "40000", "COT_STALE": 60, "INCLUDE_ALL_CRAFT": True}
+    )
+    assert dict_settings.alt_upper == 40000
+    assert dict_settings.cot_stale == 60
+    assert dict_settings.include_all_craft is True
+
+
+def test_compiled_config_immutable():
+    settings = CompiledConfig({"UID_KEY": "REG"})
+    with pytest.raises(AttributeError):
+        settings.uid_key = "ICAO"
+    with pytest.raises(AttributeError):
+        settings.taco = "burrito"
+    assert settings.replace(uid_key="ICAO").uid_key == "ICAO"
+    assert settings.uid_key == "REG"
+
+    restored = pickle.loads(pickle.dumps(settings))
+    assert repr(restored) == repr(settings)
+
+
+@pytest.mark.asyncio
+async def test_handle_data_batch(config):
+    config["BATCH_SIZE"] = "2"
+    config["COT_SERIALIZER"] = "template"
+    worker = ADSBWorker(asyncio.Queue(), config)
+    data = [
+        {"hex": f"a9ee{i:02x}", "lat": 37.8, "lon": -122.0, "alt_baro": 3700}
+        for i in range(5)
+    ]
+    data.append({"hex": "~a9ee47", "lat": 37.8, "lon": -122.0})
+    data.append({"some_key": "some_value"})
+    await worker.handle_data(data)
+    assert worker.queue.qsize() == 5
+    assert b"ICAO-A9EE00" in worker.queue.get_nowait()
+
+
+@pytest.mark.asyncio
+async def test_handle_data_pool(config):
+    config["POOL_WORKERS"] = "1"
+    config["POOL_THRESHOLD"] = "2"
+    config["POOL_CHUNK_SIZE"] = "2"
+    worker = ADSBWorker(asyncio.Queue(), config)
+    data = [
+        {"hex": f"a9ee{i:02x}", "lat": 37.8, "lon": -122.0, "alt_baro": 3700}
+        for i in range(5)
+    ]
+    try:
+        await worker.handle_data(data)
+    finally:
+        worker.pool.shutdown()
+    assert worker.queue.qsize() == 5
+    assert worker.histograms["serialize_seconds"].count == 5
+    for i in range(5):
+        assert f"ICAO-A9EE{i:02X}".encode() in worker.queue.get_nowait()
+
+
+@pytest.mark.asyncio
+async def test_handle_data_pool_broken(config):
+    """A pool whose process died is restarted, converting meanwhile in-process."""
+    config["POOL_WORKERS"] = "1"
+    config["POOL_THRESHOLD"] = "2"
+    config["POOL_CHUNK_SIZE"] = "2"
+    worker = ADSBWorker(asyncio.Queue(), config)
+    data = [
+        {"hex": f"a9ee{i:02x}", "lat": 37.8, "lon": -122.0, "alt_baro": 3700}
+        for i in range(5)
+    ]
+    broken = worker.pool
+    try:
+        await worker.handle_data(data)
+        for process in list(broken._processes.values()):
+            process.kill()
+        for _ in range(100):
+            if broken._broken:
+                break
+            await asyncio.sleep(0.05)
+        assert broken._broken
+
+        # Submitting to the broken pool fails, so this is converted here:
+        await worker.handle_data(data)
+        assert worker.pool is not broken
+        assert worker.counters["pool_restarts"] == 1
+
+        # ...and this in the new pool:
+        await worker.handle_data(data)
+        assert worker.counters["pool_restarts"] == 1
+    finally:
+        worker.pool.shutdown()
+    assert worker.queue.qsize() == 15
+
+
+def test_craft_merger():
+    now = time.time()
+    merger = CraftMerger()
+    assert merger.offer("A9EE47", {"feed": "a"}, "a", report_time=now)
+    assert not merger.offer("A9EE47", {"feed": "b"}, "b", report_time=now - 1)
+    assert merger.offer("A9EE47", {"feed": "c"}, "c", report_time=now + 1)
+    assert merger.offer("3C4586", {"feed": "b"}, "b", report_time=now - 50)
+    assert merger.drain() == [({"feed": "c"}, "c"), ({"feed": "b"}, "b")]
+    assert merger.drain() == []
+    # Already emitted a fresher report:
+    assert not merger.offer("A9EE47", {"feed": "a"}, "a", report_time=now + 1)
+
+
+@pytest.mark.asyncio
+async def test_merge_feeds(config):
+    tx_queue = asyncio.Queue()
+    merger = CraftMerger()
+    worker_a = ADSBWorker(tx_queue, config, "http://a/aircraft.json", merger)
+    worker_b = ADSBWorker(tx_queue, config, "http://b/aircraft.json", merger)
+    merge_worker = ADSBMergeWorker(tx_queue, config, merger)
+
+    craft = {"hex": "a9ee47", "lat": 37.8, "lon": -122.0, "alt_baro": 3700}
+    await worker_a.handle_data([dict(craft, seen_pos=2.0)])
+    await worker_b.handle_data([dict(craft, seen_pos=0.1, lat=37.9)])
+    assert tx_queue.empty()
+
+    await merge_worker.handle_data(merger.drain())
+    assert tx_queue.qsize() == 1
+    event = tx_queue.get_nowait()
+    assert b'lat="37.9"' in event
+    assert b"http://b/aircraft.json" in event
+    # Serialization is timed against the feed whose report was emitted:
+    assert worker_b.histograms["serialize_seconds"].count == 1
+    assert worker_a.histograms["serialize_seconds"].count == 0
+
+
+@pytest.mark.asyncio
+async def test_get_feed_conditional(config):
+    body = json.dumps(
+        {"aircraft": [{"hex": "a9ee47", "lat": 37.8, "lon": -122.0}] * 50}
+    ).encode()
+    requests = []
+
+    async def aircraft_json(request):
+        requests.append(request.headers)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        resp = web.Response(body=body, headers={"ETag": '"v1"'})
+        resp.enable_compression(web.ContentCoding.gzip)
+        return resp
+
+    app = web.Application()
+    app.router.add_get("/aircraft.json", aircraft_json)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/aircraft.json"
+
+    worker = ADSBWorker(asyncio.Queue(), config, url)
+    try:
+        async with aiohttp.ClientSession() as worker.session:
+            await worker.get_feed(url)
+            await worker.get_feed(url)
+    finally:
+        await runner.cleanup()
+
+    assert "gzip" in requests[0]["Accept-Encoding"]
+    assert "If-None-Match" not in requests[0]
+    assert requests[1]["If-None-Match"] == '"v1"'
+    assert worker.queue.qsize() == 50
+    assert worker.counters["http_requests"] == 2
+    assert worker.counters["http_not_modified"] == 1
+    assert worker.counters["http_bytes_received"] < len(body)
+    assert worker.counters["http_bytes_saved"] > len(body)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_poll_scheduler_deadlines():
+    clock = FakeClock()
+    scheduler = PollScheduler(0.5, clock=clock)
+    assert not scheduler.adaptive
+
+    # Time spent polling doesn't push back the next deadline:
+    clock.now += 0.2
+    assert scheduler.update(True) == 100.5
+    clock.now = 100.6
+    assert scheduler.update(True) == 101.0
+
+    # An overrun skips the deadlines it missed:
+    clock.now = 102.2
+    assert scheduler.update(True) == 102.5
+    assert scheduler.overruns == 2
+
+
+def test_poll_scheduler_adaptive():
+    clock = FakeClock()
+    scheduler = PollScheduler(
+        2, min_interval=0.5, max_interval=10, backoff=2, clock=clock
+    )
+    assert scheduler.adaptive
+
+    # Unchanged data backs off, up to max_interval:
+    for _ in range(5):
+        scheduler.update(False)
+    assert scheduler.interval == 10
+
+    # Polls track half the feed's update period:
+    for _ in range(10):
+        clock.now += 3.0
+        scheduler.update(True)
+    assert scheduler.interval == pytest.approx(1.5)
+
+    # ...but no faster than min_interval:
+    for _ in range(10):
+        clock.now += 0.2
+        scheduler.update(True)
+    assert scheduler.interval == 0.5
+
+
+def test_poll_scheduler_from_config():
+    scheduler = PollScheduler.from_config(
+        {"POLL_INTERVAL": "0.25", "POLL_INTERVAL_MAX": "5"}
+    )
+    assert scheduler.interval == 0.25
+    assert scheduler.min_interval == 0.25
+    assert scheduler.max_interval == 5
+
+    with pytest.raises(ValueError):
+        PollScheduler(0)
+
+
+@pytest.mark.asyncio
+async def test_get_file_feed_unchanged(config, tmp_path):
+    feed = tmp_path / "aircraft.json"
+    feed.write_text(
+        json.dumps({"aircraft": [{"hex": "a9ee47", "lat": 37.8, "lon": -122.0}]})
+    )
+    url = urllib.parse.urlparse(f"file://{feed}")
+
+    worker = ADSBWorker(asyncio.Queue(), config, str(url.geturl()))
+    assert await worker.get_file_feed(url) is True
+    assert await worker.get_file_feed(url) is False
+    assert worker.queue.qsize() == 1
+    assert worker.counters["feed_unchanged"] == 1
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(
+        base_delay=1, max_delay=3, threshold=4, timeout=60, rng=lambda: 1.0
+    )
+    assert breaker.failure() == 1
+    assert breaker.failure() == 2
+    assert breaker.failure() == 3  # max_delay
+    assert breaker.failure(retry_after=120) == 120
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # A failed trial re-opens the circuit, a successful one closes it:
+    breaker.attempt()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.failure() == 60
+    assert breaker.state == CircuitBreaker.OPEN
+    breaker.attempt()
+    assert breaker.success() == CircuitBreaker.HALF_OPEN
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+
+    # Jitter keeps at least half the delay:
+    breaker.rng = lambda: 0.0
+    assert breaker.failure() == 0.5
+
+
+@pytest.mark.asyncio
+async def test_poll_backoff(config):
+    statuses = [429, 503, 200]
+
+    async def aircraft_json(request):
+        status = statuses.pop(0)
+        if status == 429:
+            return web.Response(status=429, headers={"Retry-After": "30"})
+        if status == 503:
+            return web.Response(status=503, text="down for maintenance")
+        return web.json_response({"aircraft": []})
+
+    app = web.Application()
+    app.router.add_get("/aircraft.json", aircraft_json)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/aircraft.json"
+
+    config["BREAKER_THRESHOLD"] = "2"
+    worker = ADSBWorker(asyncio.Queue(), config, url)
+    clock = FakeClock()
+    scheduler = PollScheduler(1, clock=clock)
+    try:
+        with patch("asyncio.sleep"):
+            async with aiohttp.ClientSession() as worker.session:
+                await worker.poll(scheduler, worker.get_feed(url))
+                assert scheduler.deadline == clock.now + 30
+                assert worker.breaker.state == CircuitBreaker.CLOSED
+
+                await worker.poll(scheduler, worker.get_feed(url))
+                assert worker.breaker.state == CircuitBreaker.OPEN
+
+                await worker.poll(scheduler, worker.get_feed(url))
+                assert worker.breaker.state == CircuitBreaker.CLOSED
+    finally:
+        await runner.cleanup()
+
+    assert worker.counters["feed_errors"] == 2
+    assert worker.counters["breaker_opened"] == 1
+
+
+@pytest.mark.asyncio
+async def test_poll_connection_error(config):
+    worker = ADSBWorker(asyncio.Queue(), config, "http://127.0.0.1:1/aircraft.json")
+    scheduler = PollScheduler(1, clock=FakeClock())
+    with patch("asyncio.sleep"):
+        async with aiohttp.ClientSession() as worker.session:
+            await worker.poll(scheduler, worker.get_feed(worker.feed_url))
+    assert worker.counters["feed_errors"] == 1
+    assert worker.breaker.failures == 1
+    assert worker.histograms["poll_duration_seconds"].count == 1
+
+
+def test_aircraft_stream_parser():
+    doc = json.dumps(
+        {
+            "now": 1.5,
+            "ac": [{"hex": "a9ee47", "flight": "Zürich"}, {"hex": "c0ffee"}],
+            "total": 2,
+        }
+    ).encode()
+
+    # However the document is split, each aircraft is parsed once:
+    for split in range(len(doc)):
+        parser = AircraftStreamParser()
+        crafts = parser.feed(doc[:split]) + parser.feed(doc[split:])
+        crafts += parser.feed(b"", final=True)
+        assert [c["hex"] for c in crafts] == ["a9ee47", "c0ffee"]
+        assert crafts[0]["flight"] == "Zürich"
+
+    parser = AircraftStreamParser()
+    assert parser.feed(b'{"now": 1, "aircraft": [{"hex": "a9ee47"}, {"he') == [
+        {"hex": "a9ee47"}
+    ]
+    with pytest.raises(json.JSONDecodeError):
+        parser.feed(b"", final=True)
+
+
+@pytest.mark.asyncio
+async def test_get_file_feed_stream(config, tmp_path):
+    feed = tmp_path / "aircraft.json"
+    crafts = [{"hex": f"{i:06x}", "lat": 37.8, "lon": -122.0} for i in range(1, 8)]
+    feed.write_text(json.dumps({"now": 1, "aircraft": crafts}))
+    url = urllib.parse.urlparse(f"file://{feed}")
+
+    config["STREAM_JSON"] = "true"
+    config["BATCH_SIZE"] = "3"
+    worker = ADSBWorker(asyncio.Queue(), config, str(url.geturl()))
+    with patch.object(worker, "handle_data", wraps=worker.handle_data) as handle:
+        assert await worker.get_file_feed(url) is True
+        assert [len(call.args[0]) for call in handle.call_args_list] == [7]
+    assert worker.queue.qsize() == 7
+    assert await worker.get_file_feed(url) is False
+
+    # Aircraft are handled as each chunk is parsed:
+    with patch("adsbcot.DEFAULT_STREAM_CHUNK_SIZE", 64):
+        worker = ADSBWorker(asyncio.Queue(), config, str(url.geturl()))
+        with patch.object(worker, "handle_data", wraps=worker.handle_data) as handle:
+            await worker.get_file_feed(url)
+            assert len(handle.call_args_list) > 1
+    assert worker.queue.qsize() == 7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream_json", ["false", "true"])
+async def test_get_file_feed_stat_unchanged(config, tmp_path, stream_json):
+    feed = tmp_path / "aircraft.json"
+    crafts = [{"hex": "a9ee47", "lat": 37.8, "lon": -122.0}]
+    data = json.dumps({"now": 1, "aircraft": crafts})
+    feed.write_text(data)
+    url = urllib.parse.urlparse(f"file://{feed}")
+
+    config["STREAM_JSON"] = stream_json
+    worker = ADSBWorker(asyncio.Queue(), config, str(url.geturl()))
+    assert await worker.get_file_feed(url) is True
+
+    # Unchanged inode, size & mtime: the file isn't read again:
+    with patch("adsbcot.classes.open", side_effect=AssertionError, create=True):
+        assert await worker.get_file_feed(url) is False
+
+    # Rewritten with the same content: it's read, but not parsed again:
+    feed.write_text(data)
+    os.utime(feed, ns=(1, 1))
+    with patch.object(worker, "json_loads", side_effect=AssertionError), patch.object(
+        worker, "handle_data", side_effect=AssertionError
+    ):
+        assert await worker.get_file_feed(url) is False
+    assert worker.counters["feed_unchanged"] == 2
+    assert worker.queue.qsize() == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+@pytest.mark.parametrize("stream_json", ["false", "true"])
+async def test_get_file_feed_mmap(config, tmp_path, codec, stream_json):
+    feed = tmp_path / "aircraft.json"
+    crafts = [{"hex": f"{i:06x}", "lat": 37.8, "lon": -122.0} for i in range(1, 8)]
+    feed.write_text(json.dumps({"now": 1, "aircraft": crafts}))
+    url = urllib.parse.urlparse(f"file://{feed}")
+
+    config["FILE_MMAP"] = "true"
+    config["JSON_CODEC"] = codec
+    config["STREAM_JSON"] = stream_json
+    worker = ADSBWorker(asyncio.Queue(), config, str(url.geturl()))
+    with patch("adsbcot.DEFAULT_STREAM_CHUNK_SIZE", 64):
+        assert await worker.get_file_feed(url) is True
+    assert worker.queue.qsize() == 7
+
+
+@pytest.mark.asyncio
+async def test_watch_file(config, tmp_path):
+    pytest.importorskip("asyncinotify")
+    feed = tmp_path / "aircraft.json"
+    feed.write_text(json.dumps({"now": 0, "aircraft": []}))
+    url = urllib.parse.urlparse(f"file://{feed}")
+
+    def write_feed(now, lat):
+        # As dump1090 & readsb do: write a temporary file, then rename it.
+        tmp_feed = tmp_path / "aircraft.json.tmp"
+        crafts = [{"hex": "a9ee47", "lat": lat, "lon": -122.0}]
+        tmp_feed.write_text(json.dumps({"now": now, "aircraft": crafts}))
+        os.replace(tmp_feed, feed)
+
+    config["FILE_DEBOUNCE"] = "0.2"
+    worker = ADSBWorker(asyncio.Queue(), config, str(url.geturl()))
+    watcher = asyncio.create_task(worker.watch_file(url))
+    await asyncio.sleep(0.05)
+    try:
+        # A burst of writes is read once, after the last:
+        for now in range(1, 4):
+            write_feed(now, 37.0 + now)
+        # ...and a partial write in place isn't read at all:
+        with open(feed, "a", encoding="UTF-8") as feed_fd:
+            feed_fd.write(" ")
+            feed_fd.flush()
+            await asyncio.sleep(0.4)
+        assert worker.queue.qsize() == 1
+        assert b'lat="40.0"' in worker.queue.get_nowait()
+        assert worker.counters["file_events"] == 3
+        assert worker.counters["file_events_coalesced"] == 2
+    finally:
+        watcher.cancel()
+
+
+@pytest.mark.asyncio
+async def test_watch_websocket(config):
+    websockets = pytest.importorskip("websockets")
+    connections = []
+
+    async def traffic(websocket, *args):
+        connections.append(websocket)
+        craft = {"hex": f"a9ee4{len(connections)}", "lat": 37.8, "lon": -122.0}
+        await websocket.send("not json")
+        await websocket.send(json.dumps(craft))
+        # Drop the connection, the worker should reconnect:
+        await websocket.close()
+
+    async with websockets.serve(traffic, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        url = f"ws://127.0.0.1:{port}/traffic"
+        config["POLL_INTERVAL"] = "0.01"
+        worker = ADSBWorker(asyncio.Queue(), config, url)
+        watcher = asyncio.create_task(worker.watch_websocket(url))
+        try:
+            for _ in range(100):
+                if worker.queue.qsize() >= 2:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            watcher.cancel()
+
+    assert worker.queue.qsize() >= 2
+    assert worker.counters["ws_reconnects"] >= 1
+    assert worker.counters["ws_connects"] == worker.counters["ws_reconnects"] + 1
+    assert worker.counters["ws_invalid_messages"] >= 2
+    assert "permessage-deflate" in connections[0].request_headers[
+        "Sec-WebSocket-Extensions"
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "policy,expected",
+    [("drop_oldest", [b"2", b"3"]), ("drop_newest", [b"1", b"2"])],
+)
+async def test_net_receiver_drop(config, policy, expected):
+    config["NET_QUEUE_POLICY"] = policy
+    receiver = ADSBNetReceiver(asyncio.Queue(maxsize=2), config, "beast")
+    for received in (b"1", b"2", b"3"):
+        await receiver.put_net_queue(received)
+    assert [receiver.queue.get_nowait() for _ in range(2)] == expected
+    assert receiver.counters["net_queue_dropped"] == 1
+    assert receiver.counters["net_queue_high_water"] == 2
+
+
+@pytest.mark.asyncio
+async def test_net_receiver_backpressure(config):
+    config["NET_QUEUE_POLICY"] = "backpressure"
+    receiver = ADSBNetReceiver(asyncio.Queue(maxsize=1), config, "beast")
+    await receiver.put_net_queue(b"1")
+
+    # A full queue holds up the receiver, until the decoder catches up:
+    put = asyncio.ensure_future(receiver.put_net_queue(b"2"))
+    await asyncio.sleep(0.01)
+    assert not put.done()
+    assert receiver.queue.get_nowait() == b"1"
+    await asyncio.wait_for(put, 1)
+    assert receiver.queue.get_nowait() == b"2"
+    assert receiver.counters["net_queue_full"] == 1
+    assert receiver.counters["net_queue_dropped"] == 0
+
+    config["NET_QUEUE_POLICY"] = "block"
+    with pytest.raises(ValueError):
+        ADSBNetReceiver(asyncio.Queue(), config, "beast")
+
+
+def avr(*msgs: str) -> bytes:
+    """Encode Mode S messages as AVR frames."""
+    return b"".join(b"*" + msg.encode() + b";\n" for msg in msgs)
+
+
+@pytest.mark.asyncio
+async def test_net_worker_touched(config):
+    """Only aircraft heard in a batch are sent, & all of them on each sweep."""
+    config["NET_SWEEP_INTERVAL"] = "0.3"
+    net_queue: asyncio.Queue = asyncio.Queue()
+    worker = ADSBNetWorker(asyncio.Queue(), net_queue, config, "raw")
+    task = asyncio.ensure_future(worker.run())
+    try:
+        # An even/odd position pair for 40621D:
+        net_queue.put_nowait(
+            avr("8D40621D58C382D690C8AC2863A7", "8D40621D58C386435CC412692AD6")
+        )
+        await asyncio.sleep(0.05)
+        assert worker.queue.qsize() == 1
+        assert b"ICAO-40621D" in worker.queue.get_nowait()
+
+        # 4840D6 has no position, and 40621D wasn't heard, so nothing is sent:
+        net_queue.put_nowait(
+            avr("8D4840D6202CC371C32CE0576098", "8D4840D6202CC371C32CE0576098")
+        )
+        await asyncio.sleep(0.05)
+        assert worker.queue.empty()
+        assert not worker.modes.touched
+
+        # Until the sweep re-sends every aircraft with a position:
+        await asyncio.sleep(0.3)
+        assert worker.queue.qsize() == 1
+        assert b"ICAO-40621D" in worker.queue.get_nowait()
+    finally:
+        task.cancel()
+
+    assert worker.counters["net_sweeps"] == 1
+    assert worker.counters["net_aircraft_emitted"] == 2
+    assert len(worker.aircraft) == 2
+    assert worker.counters["aircraft_peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_net_worker_cancel_busy(config):
+    """A worker with reads queued stops when cancelled."""
+    net_queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(2000):
+        net_queue.put_nowait(avr("8D4840D6202CC371C32CE0576098"))
+    worker = ADSBNetWorker(asyncio.Queue(), net_queue, config, "raw")
+    task = asyncio.ensure_future(worker.run())
+    await asyncio.sleep(0.1)
+    task.cancel()
+    await asyncio.wait_for(asyncio.gather(task, return_exceptions=True), 5)
+    assert task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_net_worker_aircraft_tracked(config):
+    config["AIRCRAFT_TTL"] = "0.05"
+    worker = ADSBNetWorker(asyncio.Queue(), asyncio.Queue(), config, "raw")
+    worker.aircraft.update("40621D", {"lat": 52.0, "lon": 4.0}, time.monotonic())
+    await worker.emit_aircraft(worker.aircraft)
+    assert worker.get_counters()["aircraft_tracked"] == 1
+    assert worker.get_counters()["aircraft_peak"] == 1
+
+    # A sweep after the TTL forgets the aircraft, but not the peak:
+    await asyncio.sleep(0.1)
+    await worker.sweep()
+    assert worker.get_counters()["aircraft_tracked"] == 0
+    assert worker.get_counters()["aircraft_peak"] == 1
+
+    lines = MetricsWorker(asyncio.Queue(), config, [worker]).render().splitlines()
+    assert "# TYPE adsbcot_aircraft_tracked gauge" in lines
+    assert 'adsbcot_aircraft_tracked{worker="ADSBNetWorker",feed=""} 0' in lines
+
+
+def test_aircraft_table():
+    table = AircraftTable(ttl=10.0)
+    table.update("ABC123", {"lat": 1.0, "lon": 2.0, "call": "TEST_1__"}, now=0.0)
+    table.update("DEF456", {"alt": 1000}, now=1.0)
+    assert len(table) == 2
+    assert table.peak == 2
+
+    # Missing & None fields keep their last known value:
+    state = table.update("ABC123", {"lat": None, "alt": 2000}, now=8.0)
+    assert (state.lat, state.lon, state.alt) == (1.0, 2.0, 2000)
+    assert state.to_craft()["flight"] == "TEST1"
+    assert not hasattr(state, "__dict__")
+
+    # DEF456 expires, ABC123 was refreshed so its heap entry is pushed back:
+    assert table.expire(now=12.0) == 1
+    assert "DEF456" not in table
+    assert table.get("ABC123") is state
+    assert len(table._heap) == 1
+
+    assert table.expire(now=18.0) == 0
+    assert table.expire(now=18.5) == 1
+    assert len(table) == 0
+    assert not table._heap
+    assert table.peak == 2
+    assert table.counters["expired"] == 2
+
+
+def test_aircraft_table_bounded():
+    table = AircraftTable(ttl=5.0)
+    for second in range(1000):
+        for icao in range(second, second + 50):
+            table.update(f"{icao:06X}", {}, now=float(second))
+        table.expire(now=float(second))
+    assert len(table) <= 55
+    assert len(table._heap) == len(table)
+    assert table.peak <= 56
+
+
+@pytest.mark.asyncio
+async def test_net_worker_reference_position(config):
+    """With CPR_MAX_RANGE, a new aircraft's first position frame is decoded
+    relative to the receiver."""
+    config["SENSOR_LAT"] = "52.0"
+    config["SENSOR_LON"] = "4.0"
+    config["CPR_MAX_RANGE"] = "300000"
+    net_queue: asyncio.Queue = asyncio.Queue()
+    worker = ADSBNetWorker(asyncio.Queue(), net_queue, config, "raw")
+    with patch("adsbcot.classes._gpsd", None):
+        task = asyncio.ensure_future(worker.run())
+        try:
+            net_queue.put_nowait(avr("8D40621D58C382D690C8AC2863A7"))
+            event = await asyncio.wait_for(worker.queue.get(), 0.5)
+        finally:
+            task.cancel()
+
+    assert b"ICAO-40621D" in event
+    assert b'lat="52.257' in event
+    assert worker.positions.counters["cpr_reference"] == 1
+
+
+@pytest.mark.asyncio
+async def test_net_worker_decode_processes(config):
+    """Frames are decoded in processes sharded by ICAO, in order per aircraft."""
+    config["DECODE_PROCESSES"] = "2"
+    net_queue: asyncio.Queue = asyncio.Queue()
+    worker = ADSBNetWorker(asyncio.Queue(), net_queue, config, "raw")
+    task = asyncio.ensure_future(worker.run())
+    try:
+        net_queue.put_nowait(
+            avr(
+                "8D40621D58C382D690C8AC2863A7",
+                "8D4840D6202CC371C32CE0576098",
+                "8D40621D58C386435CC412692AD6",
+            )
+        )
+        event = await asyncio.wait_for(worker.queue.get(), 30)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert b"ICAO-40621D" in event
+    assert worker.counters["shard_batches"] == 2
+    assert len(worker.aircraft) == 2
+    assert worker.aircraft.get("4840D6").call == "KLM1023_"
+    assert not worker.shards
+
+
+@pytest.mark.asyncio
+async def test_net_worker_decode_process_killed(config):
+    """A decoder process that dies is restarted once, and frames sent to it."""
+    config["DECODE_PROCESSES"] = "1"
+    net_queue: asyncio.Queue = asyncio.Queue()
+    worker = ADSBNetWorker(asyncio.Queue(), net_queue, config, "raw")
+    pair = avr("8D40621D58C382D690C8AC2863A7", "8D40621D58C386435CC412692AD6")
+    task = asyncio.ensure_future(worker.run())
+    try:
+        net_queue.put_nowait(pair)
+        await asyncio.wait_for(worker.queue.get(), 30)
+
+        broken = worker.shards[0]
+        # Several batches are in flight as it breaks, and more are sent after:
+        for _ in range(3):
+            net_queue.put_nowait(pair)
+            await asyncio.sleep(0)
+        for process in list(broken._processes.values()):
+            process.kill()
+        for _ in range(10):
+            net_queue.put_nowait(pair)
+            await asyncio.sleep(0.05)
+        while not worker.queue.empty():
+            worker.queue.get_nowait()
+        net_queue.put_nowait(pair)
+        await asyncio.wait_for(worker.queue.get(), 30)
+        assert not task.done()
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    assert broken._broken
+    assert worker.counters["shard_restarts"] == 1
+
+
+def test_feed_recorder(tmp_path):
+    path = str(tmp_path / "feeds.cap")
+    clock = iter(range(0, 10**10, 10**8))
+    recorder = FeedRecorder(path, clock=lambda: next(clock))
+    recorder.record("tcp", "tcp+beast://example.com:30005", b"\x1a\x33")
+    recorder.record("ws", "ws://example.com/feed", '{"hex": "a9ee47"}')
+    recorder.record("tcp", "tcp+beast://example.com:30005", memoryview(b"\x1a\x32"))
+    recorder.close()
+    assert recorder.counters["capture_records"] == 3
+
+    # Recording again appends, with its own channels & clock:
+    recorder = FeedRecorder(path, clock=lambda: 5)
+    recorder.record("file", "file:///tmp/aircraft.json", b"{}")
+    recorder.close()
+
+    replayer = FeedReplayer(path)
+    assert list(replayer) == [
+        (0, "tcp", "tcp+beast://example.com:30005", b"\x1a\x33"),
+        (10**8, "ws", "ws://example.com/feed", b'{"hex": "a9ee47"}'),
+        (2 * 10**8, "tcp", "tcp+beast://example.com:30005", b"\x1a\x32"),
+        (5, "file", "file:///tmp/aircraft.json", b"{}"),
+    ]
+    assert replayer.feeds() == [
+        ("tcp", "tcp+beast://example.com:30005"),
+        ("ws", "ws://example.com/feed"),
+        ("file", "file:///tmp/aircraft.json"),
+    ]
+
+    # A record cut short by a crash is ignored:
+    with open(path, "ab") as capture:
+        capture.write(FeedRecorder.RECORD.pack(6, 1, 100) + b"\x1a")
+    assert len(list(replayer)) == 4
+
+    (tmp_path / "other").write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        list(FeedReplayer(str(tmp_path / "other")))
+
+
+@pytest.mark.asyncio
+async def test_feed_recorder_workers(config, tmp_path):
+    """Receivers & pollers record what they receive to CAPTURE_FILE."""
+    feed = tmp_path / "aircraft.json"
+    feed.write_text(json.dumps({"aircraft": [{"hex": "a9ee47"}]}))
+    url = urllib.parse.urlparse(f"file://{feed}")
+    config["CAPTURE_FILE"] = str(tmp_path / "feeds.cap")
+
+    worker = ADSBWorker(asyncio.Queue(), config, url.geturl())
+    receiver = ADSBNetReceiver(
+        asyncio.Queue(), config, "beast", "tcp+beast://example.com"
+    )
+    assert receiver.recorder is worker.recorder
+    await worker.get_file_feed(url)
+    await receiver.put_net_queue(b"\x1a\x33")
+    config["STREAM_JSON"] = "true"
+    streaming = ADSBWorker(asyncio.Queue(), config, url.geturl())
+    streaming.file_ids.clear()
+    await streaming.get_file_feed(url)
+    worker.recorder.flush()
+
+    assert [record[1:] for record in FeedReplayer(config["CAPTURE_FILE"])] == [
+        ("file", url.geturl(), feed.read_bytes()),
+        ("tcp", "tcp+beast://example.com", b"\x1a\x33"),
+        ("file", url.geturl(), feed.read_bytes()),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("speed,fast", [("0", True), ("10", True), ("1", False)])
+async def test_replay_worker(config, tmp_path, speed, fast):
+    """Captures are played back through the feeds' workers, at REPLAY_SPEED."""
+    path = str(tmp_path / "feeds.cap")
+    clock = iter((0, 3 * 10**8))
+    recorder = FeedRecorder(path, clock=lambda: next(clock))
+    recorder.record(
+        "tcp",
+        "tcp+raw://example.com",
+        avr("8D40621D58C382D690C8AC2863A7", "8D40621D58C386435CC412692AD6"),
+    )
+    recorder.record(
+        "ws",
+        "ws://example.com",
+        json.dumps({"hex": "a9ee47", "lat": 37.8, "lon": -122.0}),
+    )
+    recorder.close()
+
+    config["REPLAY_SPEED"] = speed
+    tx_queue: asyncio.Queue = asyncio.Queue()
+    net_queue: asyncio.Queue = asyncio.Queue()
+    net_worker = ADSBNetWorker(tx_queue, net_queue, config, "raw")
+    replay_worker = ADSBReplayWorker(
+        tx_queue,
+        config,
+        FeedReplayer(path),
+        {
+            ("tcp", "tcp+raw://example.com"): net_queue,
+            ("ws", "ws://example.com"): ADSBWorker(
+                tx_queue, config, "ws://example.com"
+            ),
+        },
+    )
+
+    task = asyncio.ensure_future(net_worker.run())
+    started = time.monotonic()
+    replay = asyncio.ensure_future(replay_worker.run())
+    try:
+        events = [await asyncio.wait_for(tx_queue.get(), 2) for _ in range(2)]
+        elapsed = time.monotonic() - started
+        await asyncio.wait_for(replay, 2)
+    finally:
+        task.cancel()
+
+    assert any(b"ICAO-40621D" in event for event in events)
+    assert any(b"ICAO-A9EE47" in event for event in events)
+    assert (elapsed < 0.25) is fast
+    assert replay_worker.counters["replay_records"] == 2
+
+
+def test_histogram():
+    histogram = Histogram([1, 0.1])
+    histogram.observe(0.1)
+    histogram.observe(0.5, 2)
+    histogram.observe(5)
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(6.1)
+    assert histogram.cumulative() == [(0.1, 1), (1, 3), (float("inf"), 4)]
+
+
+@pytest.mark.asyncio
+async def test_metrics_worker_render(config):
+    config["ALT_UPPER"] = "10000"
+    worker = ADSBWorker(asyncio.Queue(), config, "file:///a.json")
+    await worker.handle_data(
+        [
+            {"hex": "a9ee47", "lat": 1.0, "lon": 2.0, "flight": "TEST123"},
+            {"hex": "a9ee4a", "lat": 1.0, "lon": 2.0, "alt_geom": 35000},
+            {"hex": "~a9ee48", "lat": 1.0, "lon": 2.0},
+            {"hex": "a9ee49"},
+            "not a dict",
+        ]
+    )
+
+    net_worker = ADSBNetWorker(
+        asyncio.Queue(), asyncio.Queue(maxsize=5), config, "raw", "tcp://b:30002"
+    )
+    # A valid frame, and one failing its CRC:
+    net_worker.read_frames(
+        avr("8D40621D58C382D690C8AC2863A7", "8D40621D58C382D690C8AC2863A8")
+    )
+
+    metrics = MetricsWorker(asyncio.Queue(maxsize=10), config, [worker, net_worker])
+    lines = metrics.render().splitlines()
+
+    labels = 'worker="ADSBWorker",feed="file:///a.json"'
+    assert f"adsbcot_aircraft_total{{{labels}}} 5" in lines
+    for reason in ("tisb", "no_position", "invalid", "altitude"):
+        assert (
+            f'adsbcot_aircraft_filtered_total{{{labels},reason="{reason}"}} 1' in lines
+        )
+    assert f"adsbcot_cot_events_total{{{labels}}} 1" in lines
+    assert f"adsbcot_serialize_seconds_count{{{labels}}} 2" in lines
+    assert f'adsbcot_serialize_seconds_bucket{{{labels},le="+Inf"}} 2' in lines
+    assert f"adsbcot_poll_duration_seconds_count{{{labels}}} 0" in lines
+
+    net_labels = 'worker="ADSBNetWorker",feed="tcp://b:30002"'
+    assert f"adsbcot_frames_total{{{net_labels}}} 2" in lines
+    assert f"adsbcot_crc_failed_total{{{net_labels}}} 1" in lines
+    assert f"adsbcot_net_queue_size{{{net_labels}}} 5" in lines
+    assert "adsbcot_tx_queue_depth 0" in lines
+    assert "adsbcot_tx_queue_size 10" in lines
+
+    # Samples of a metric are grouped under a single TYPE line:
+    types = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+    assert len(types) == len(set(types))
+    assert "# TYPE adsbcot_serialize_seconds histogram" in lines
+    assert "# TYPE adsbcot_aircraft_filtered_total counter" in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_worker_serve(config):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    config["METRICS_PORT"] = str(port)
+
+    worker = ADSBWorker(asyncio.Queue(), config, 'file:///"quoted".json')
+    worker.counters["polls"] = 3
+    metrics = MetricsWorker(asyncio.Queue(), config, [worker])
+    task = asyncio.ensure_future(metrics.run())
+    try:
+        await asyncio.sleep(0.1)
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as resp:
+                assert resp.status == 200
+                assert resp.headers["Content-Type"].startswith("text/plain")
+                body = await resp.text()
+    finally:
+        task.cancel()
+
+    assert (
+        'adsbcot_polls_total{worker="ADSBWorker",feed="file:///\\"quoted\\".json"} 3'
+        in body.splitlines()
+    )
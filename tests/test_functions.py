@@ -18,7 +18,15 @@
 
 """ADSBCOT Function Tests."""
 
+import configparser
+import datetime
+import email.utils
+import json
+import os
+import re
+import tempfile
 import unittest
+import unittest.mock
 import xml.etree.ElementTree as etree
 
 import adsbcot
@@ -123,6 +131,8 @@ TEST_FEED = {
     "now": 1602849987.1,
 }
 
+COT_TIME = re.compile(rb"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d+Z")
+
 ADSBX_TEST_DATA = {
     "hex": "7805dc",
     "type": "adsb_icao",
@@ -155,7 +165,7 @@ class FunctionsTestCase(unittest.TestCase):
     """
 
     def test_adsb_to_cot_xml(self):
-        """Test that adsb_to_cot serializses ADS-B as valid Cursor on Target XML Object."""
+        """Test that adsb_to_cot serializses ADS-B as a valid CoT XML Object."""
         aircraft = TEST_FEED["aircraft"]
         craft = aircraft[0]
         cot = adsbcot.functions.adsb_to_cot_xml(craft)
@@ -180,7 +190,7 @@ class FunctionsTestCase(unittest.TestCase):
         assert track[0].attrib["speed"] == "40.898298000000004"
 
     def test_adsb_to_cot(self):
-        """Test that adsb_to_cot serializses ADS-B as valid Cursor on Target XML String."""
+        """Test that adsb_to_cot serializses ADS-B as a valid CoT XML String."""
         aircraft = TEST_FEED["aircraft"]
         craft = aircraft[0]
         cot = adsbcot.functions.adsb_to_cot(craft)
@@ -207,7 +217,7 @@ class FunctionsTestCase(unittest.TestCase):
         assert cot is None
 
     def test_adsbx_to_cot_xml(self):
-        """Test that adsb_to_cot serializses ADS-B as valid Cursor on Target XML Object."""
+        """Test that adsb_to_cot serializses ADS-B as a valid CoT XML Object."""
         craft = ADSBX_TEST_DATA
         print("ADSBX Data: %s", craft)
         cot = adsbcot.functions.adsb_to_cot_xml(craft)
@@ -231,6 +241,211 @@ class FunctionsTestCase(unittest.TestCase):
         assert track[0].attrib["course"] == "124.78"
         assert track[0].attrib["speed"] == "278.72575919999997"
 
+    def test_adsb_to_cot_compiled_config(self):
+        """Test that adsb_to_cot accepts a CompiledConfig, dict or SectionProxy."""
+        config_d = {"COT_HOST_ID": "taco", "FEED_URL": "file:///a"}
+        parser = configparser.ConfigParser()
+        parser.read_dict({"adsbcot": config_d})
+        section = parser["adsbcot"]
+        settings = adsbcot.compile_config(section)
+        assert adsbcot.compile_config(settings) is settings
+
+        craft = TEST_FEED["aircraft"][3]
+        craft = dict(craft, lat=37.0, lon=-122.0)
+        for config in (settings, section, config_d):
+            cot = adsbcot.functions.adsb_to_cot_xml(dict(craft), config)
+            __adsb = cot.find("detail").find("__adsb")
+            assert __adsb.attrib["cot_host_id"] == "taco"
+            assert __adsb.attrib["feed_url"] == "file:///a"
+
+    def test_adsb_to_cot_template_parity(self):
+        """Test that the template serializer matches the ElementTree serializer."""
+        known_craft = {
+            "HEX": "A9EE47",
+            "CALLSIGN": "TACO & <BURRITO>",
+            "COT": "a-f-A-T-A-C-O",
+            "ICON": "6d781afb-89a6-4c07-b2b9-a89748b6a38f/Misc/taco.png",
+        }
+        crafts = [
+            (dict(TEST_FEED["aircraft"][0], lat=37.836449, lon=-122.030281), None),
+            (
+                dict(TEST_FEED["aircraft"][0], lat=37.836449, lon=-122.030281),
+                known_craft,
+            ),
+            (dict(TEST_FEED["aircraft"][3], lat=37.0, lon=-122.0), None),
+            (dict(ADSBX_TEST_DATA), None),
+            (dict(ADSBX_TEST_DATA, flight='"A&B"\t\u00e9\u2708', rssi=None), None),
+        ]
+        config = {"COT_HOST_ID": "adsbcot@<host>", "FEED_URL": "http://a/?b=1&c=2"}
+        for craft, known in crafts:
+            etree_cot = adsbcot.adsb_to_cot(dict(craft), config, known)
+            template_cot = adsbcot.adsb_to_cot_template(dict(craft), config, known)
+            assert COT_TIME.sub(b"T", template_cot) == COT_TIME.sub(b"T", etree_cot)
+            assert etree.fromstring(template_cot).tag == "event"
+
+    def test_adsb_to_cot_serializer_config(self):
+        """Test that COT_SERIALIZER selects the template serializer."""
+        craft = dict(ADSBX_TEST_DATA)
+        config = adsbcot.compile_config({"COT_SERIALIZER": "template"})
+        with unittest.mock.patch(
+            "adsbcot.functions.adsb_to_cot_xml"
+        ) as mock_adsb_to_cot_xml:
+            cot = adsbcot.adsb_to_cot(craft, config)
+        mock_adsb_to_cot_xml.assert_not_called()
+        assert b"ICAO-7805DC" in cot
+
+    def test_adsb_to_cot_template_none(self):
+        """Test that the template serializer rejects aircraft without a position."""
+        assert adsbcot.adsb_to_cot_template({"hex": "a9ee47"}) is None
+
+    def test_adsb_to_cot_batch(self):
+        """Test that adsb_to_cot_batch serializes every aircraft with a position."""
+        known_craft_index = adsbcot.KnownCraftIndex(
+            [{"HEX": "A9EE47", "CALLSIGN": "TACO_01", "ICON": "taco.png"}]
+        )
+        crafts = [
+            dict(TEST_FEED["aircraft"][0], lat=37.836449, lon=-122.030281),
+            {"hex": "3c4586"},
+            "invalid_data",
+            dict(ADSBX_TEST_DATA),
+        ]
+        for serializer in ("etree", "template"):
+            config = {"COT_SERIALIZER": serializer}
+            events = adsbcot.adsb_to_cot_batch(
+                [dict(c) if isinstance(c, dict) else c for c in crafts],
+                config,
+                known_craft_index,
+            )
+            assert len(events) == 2
+            assert b"ICAO-A9EE47" in events[0]
+            assert b"taco.png" in events[0]
+            assert b"ICAO-7805DC" in events[1]
+
+    def test_pool_adsb_to_cot_batch(self):
+        """Test the process pool worker's initializer & conversion function."""
+        adsbcot.functions.init_pool_worker({"COT_SERIALIZER": "template"})
+        events, elapsed = adsbcot.functions.pool_adsb_to_cot_batch(
+            [dict(ADSBX_TEST_DATA)]
+        )
+        assert elapsed >= 0
+        assert len(events) == 1
+        assert b"ICAO-7805DC" in events[0]
+
+    def test_get_feed_urls(self):
+        """Test that FEED_URL may be a list of URLs."""
+        assert adsbcot.get_feed_urls({}) == [adsbcot.DEFAULT_FEED_URL]
+        assert adsbcot.get_feed_urls(
+            {"FEED_URL": "file:///a.json, tcp+beast://b:30005\nhttp://c/"}
+        ) == ["file:///a.json", "tcp+beast://b:30005", "http://c/"]
+        assert adsbcot.get_feed_urls(
+            {"FEED_URL": "http://c/ac.json?bbox=36.1,-123.2,38.5,-121.0,file:///a"}
+        ) == ["http://c/ac.json?bbox=36.1,-123.2,38.5,-121.0", "file:///a"]
+        url = "https://api.airplanes.live/v2/hex/a1b2c3,d4e5f6"
+        assert adsbcot.get_feed_urls({"FEED_URL": url}) == [url]
+        assert adsbcot.get_feed_urls({"FEED_URL": ["ws://a", "wss://b"]}) == [
+            "ws://a",
+            "wss://b",
+        ]
+
+    def test_create_tasks_many_feeds(self):
+        """Test that each FEED_URL gets its own worker, feeding a merge worker."""
+        parser = configparser.ConfigParser()
+        parser.read_dict(
+            {"adsbcot": {"FEED_URL": "file:///a.json, tcp+beast://b:30005"}}
+        )
+        clitool = unittest.mock.MagicMock()
+        tasks = adsbcot.create_tasks(parser["adsbcot"], clitool)
+        names = sorted(task.__class__.__name__ for task in tasks)
+        assert names == [
+            "ADSBMergeWorker",
+            "ADSBNetReceiver",
+            "ADSBNetWorker",
+            "ADSBWorker",
+            "SensorWorker",
+        ]
+        workers = [t for t in tasks if isinstance(t, adsbcot.ADSBWorker)]
+        assert sorted(w.feed_url for w in workers) == [
+            "file:///a.json",
+            "tcp+beast://b:30005",
+        ]
+        assert workers[0].merger is workers[1].merger is not None
+        receivers = [t for t in tasks if isinstance(t, adsbcot.ADSBNetReceiver)]
+        assert receivers[0].queue.maxsize == adsbcot.DEFAULT_NET_QUEUE_SIZE
+
+    def test_create_tasks_metrics(self):
+        """Test that METRICS_PORT serves the metrics of the feed workers."""
+        parser = configparser.ConfigParser()
+        parser.read_dict(
+            {"adsbcot": {"FEED_URL": "tcp+beast://b:30005", "METRICS_PORT": "9464"}}
+        )
+        tasks = adsbcot.create_tasks(parser["adsbcot"], unittest.mock.MagicMock())
+        metrics = [t for t in tasks if isinstance(t, adsbcot.MetricsWorker)][0]
+        assert metrics.port == 9464
+        assert metrics.host == adsbcot.DEFAULT_METRICS_HOST
+        assert sorted(w.__class__.__name__ for w in metrics.workers) == [
+            "ADSBNetReceiver",
+            "ADSBNetWorker",
+        ]
+
+        parser["adsbcot"]["METRICS_PORT"] = "0"
+        tasks = adsbcot.create_tasks(parser["adsbcot"], unittest.mock.MagicMock())
+        assert not [t for t in tasks if isinstance(t, adsbcot.MetricsWorker)]
+
+    def test_create_tasks_replay(self):
+        """Test that a replay:// FEED_URL gets workers for each recorded feed."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "feeds.cap")
+            recorder = adsbcot.FeedRecorder(path)
+            recorder.record("tcp", "tcp+beast://b:30005", b"\x1a")
+            recorder.record("file", "file:///a.json", b"{}")
+            recorder.close()
+
+            parser = configparser.ConfigParser()
+            parser.read_dict({"adsbcot": {"FEED_URL": f"replay://{path}"}})
+            tasks = adsbcot.create_tasks(parser["adsbcot"], unittest.mock.MagicMock())
+
+        names = sorted(task.__class__.__name__ for task in tasks)
+        assert names == [
+            "ADSBMergeWorker",
+            "ADSBNetWorker",
+            "ADSBReplayWorker",
+            "SensorWorker",
+        ]
+        replay = [t for t in tasks if isinstance(t, adsbcot.ADSBReplayWorker)][0]
+        net_worker = [t for t in tasks if isinstance(t, adsbcot.ADSBNetWorker)][0]
+        assert net_worker.data_type == "beast"
+        assert replay.targets[("tcp", "tcp+beast://b:30005")] is net_worker.net_queue
+        assert replay.targets[("file", "file:///a.json")].merger is net_worker.merger
+
+    def test_parse_retry_after(self):
+        """Test parsing Retry-After headers in seconds and as HTTP-dates."""
+        assert adsbcot.parse_retry_after("120") == 120.0
+        assert adsbcot.parse_retry_after(None) is None
+        assert adsbcot.parse_retry_after("soon") is None
+        assert adsbcot.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        later = email.utils.format_datetime(
+            datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(seconds=60),
+            usegmt=True,
+        )
+        assert 55 < adsbcot.parse_retry_after(later) <= 60
+
+    def test_get_json_loads(self):
+        """Test selecting the JSON codec, falling back to json without orjson."""
+        data = b'{"aircraft": [{"hex": "a9ee47", "lat": 37.8}]}'
+        for codec in ("auto", "orjson", "json", "JSON", None):
+            loads = adsbcot.get_json_loads(codec)
+            assert loads(data) == {"aircraft": [{"hex": "a9ee47", "lat": 37.8}]}
+            with self.assertRaises(json.JSONDecodeError):
+                loads(b'{"aircraft": [')
+
+        assert adsbcot.get_json_loads("json") is json.loads
+        with unittest.mock.patch("adsbcot.functions.orjson", None):
+            assert adsbcot.get_json_loads("auto") is json.loads
+            assert adsbcot.get_json_loads("orjson") is json.loads
+        with self.assertRaises(ValueError):
+            adsbcot.get_json_loads("simplejson")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright Sensors & Signals LLC https://www.snstac.com
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""ADSBCOT Mode S Tests."""
+
+from unittest.mock import patch
+
+import pytest
+
+import adsbcot
+
+# DF17 airborne position & identification, from "The 1090MHz Riddle":
+POSITION_MSG = bytes.fromhex("8D40621D58C382D690C8AC2863A7")
+IDENT_MSG = bytes.fromhex("8D4840D6202CC371C32CE0576098")
+ODD_POSITION_MSG = bytes.fromhex("8D40621D58C386435CC412692AD6")
+SURFACE_MSG = bytes.fromhex("8C4841753AAB238733C8CD4020B1")
+# DF5 surveillance reply, with a 0x1a to escape:
+SHORT_MSG = bytes.fromhex("281A00001A1A00")
+
+
+def beast_frame(kind: int, msg: bytes, mlat: int = 0x1A2B3C, rssi: int = 0x1A):
+    """Encode a Beast binary frame, escaping any 0x1a."""
+    body = mlat.to_bytes(6, "big") + bytes([rssi]) + msg
+    return b"\x1a" + bytes([kind]) + body.replace(b"\x1a", b"\x1a\x1a")
+
+
+def test_beast_framer():
+    stream = (
+        b"\x00\x01"
+        + beast_frame(0x33, POSITION_MSG)
+        + beast_frame(0x32, SHORT_MSG, mlat=0x1A1A1A1A1A1A)
+        + beast_frame(0x31, b"\x1a\x1a")
+        + beast_frame(0x33, IDENT_MSG, rssi=200)
+    )
+
+    # However the stream is split between reads, each frame is read once:
+    for split in range(len(stream) + 1):
+        framer = adsbcot.BeastFramer()
+        frames = framer.feed(stream[:split]) + framer.feed(stream[split:])
+        assert [frame.msg for frame in frames] == [
+            POSITION_MSG,
+            SHORT_MSG,
+            b"\x1a\x1a",
+            IDENT_MSG,
+        ]
+        assert frames[0] == (POSITION_MSG, 0x1A2B3C, 0x1A)
+        assert frames[1].mlat == 0x1A1A1A1A1A1A
+        assert frames[3].rssi == 200
+        assert len(framer) == 0
+    assert framer.counters["beast_frames"] == 4
+    assert framer.counters["beast_skipped_bytes"] == 2
+
+
+def test_beast_framer_partial_and_resync():
+    framer = adsbcot.BeastFramer()
+    frame = beast_frame(0x33, IDENT_MSG)
+
+    # A partial frame is kept until the rest arrives:
+    assert framer.feed(frame[:-3]) == []
+    assert len(framer) == len(frame) - 3
+    assert framer.feed(frame[-3:])[0].msg == IDENT_MSG
+
+    # A frame cut short by the start of the next is dropped:
+    frames = framer.feed(frame[:9] + frame + b"\x1a\x39" + frame)
+    assert [f.msg for f in frames] == [IDENT_MSG, IDENT_MSG]
+    assert framer.counters["beast_truncated_frames"] == 1
+    assert framer.counters["beast_unknown_frames"] == 1
+
+
+def test_avr_framer():
+    stream = (
+        b"*8D40621D58C382D690C8AC2863A7;\n"
+        b"@001A2B3C4D5E8D4840D6202CC371C32CE0576098;\r\n"
+        b"<001A2B3C4D5EC8281A00001A1A00;\n"
+        b"*ZZ;\n#bogus;\n"
+    )
+    for split in range(len(stream) + 1):
+        framer = adsbcot.AVRFramer()
+        frames = framer.feed(stream[:split]) + framer.feed(stream[split:])
+        assert frames == [
+            (POSITION_MSG, 0, 0),
+            (IDENT_MSG, 0x001A2B3C4D5E, 0),
+            (SHORT_MSG, 0x001A2B3C4D5E, 0xC8),
+        ]
+    assert framer.counters["avr_invalid_frames"] == 2
+    assert len(framer) == 1  # The trailing newline.
+
+
+def test_get_framer():
+    assert isinstance(adsbcot.get_framer("beast"), adsbcot.BeastFramer)
+    assert isinstance(adsbcot.get_framer("raw"), adsbcot.AVRFramer)
+    with pytest.raises(ValueError):
+        adsbcot.get_framer("skysense")
+
+
+def address_parity(data: bytes, icao: int) -> bytes:
+    """Append Address/Parity to a DF20/21 message."""
+    syndrome = adsbcot.modes_crc(data + b"\x00\x00\x00")
+    return data + (syndrome ^ icao).to_bytes(3, "big")
+
+
+def test_modes_crc():
+    assert adsbcot.modes_crc(IDENT_MSG) == 0
+    assert adsbcot.modes_crc(POSITION_MSG) == 0
+    assert adsbcot.modes_crc(bytes.fromhex("A0001838CA3E51F0A8000047A36A")) == 0xEF614D
+    assert adsbcot.modes_crc(IDENT_MSG[:-1] + b"\x99") != 0
+    assert adsbcot.modes_df(IDENT_MSG) == 17
+    assert adsbcot.modes_df(SHORT_MSG) == 5
+
+
+@pytest.mark.parametrize("numpy_min_batch", [1, 10**9])
+def test_modes_crc_batch(numpy_min_batch):
+    pytest.importorskip("numpy")
+    msgs = [bytes((i * 7 + j * 13) % 256 for j in range(14)) for i in range(100)]
+    msgs += [IDENT_MSG, POSITION_MSG]
+    with patch("adsbcot.modes_functions.NUMPY_MIN_BATCH", numpy_min_batch):
+        syndromes = adsbcot.modes_crc_batch(msgs)
+    assert syndromes == [adsbcot.modes_crc(msg) for msg in msgs]
+    assert syndromes[-2:] == [0, 0]
+
+
+def test_frame_filter():
+    frame_filter = adsbcot.FrameFilter(icao_ttl=60)
+    commb = address_parity(bytes.fromhex("A0001838CA3E51F0A80000"), 0x4840D6)
+    stranger = address_parity(bytes.fromhex("A8001838CA3E51F0A80000"), 0xABCDEF)
+    frames = [
+        adsbcot.ModeSFrame(commb),
+        adsbcot.ModeSFrame(SHORT_MSG),
+        adsbcot.ModeSFrame(IDENT_MSG),
+        adsbcot.ModeSFrame(IDENT_MSG[:-1] + b"\x99"),
+        adsbcot.ModeSFrame(stranger),
+    ]
+
+    # Comm-B from an aircraft heard in the same batch is valid, in order:
+    assert frame_filter.filter(frames, now=100) == [frames[0], frames[2]]
+    assert frame_filter.counters["df_skipped"] == 1
+    assert frame_filter.counters["crc_failed"] == 2
+    assert frame_filter.counters["valid"] == 2
+
+    # ...until its ICAO address expires:
+    assert frame_filter.filter(frames[:1], now=150) == frames[:1]
+    assert frame_filter.filter(frames[:1], now=200) == []
+    assert 0x4840D6 not in frame_filter.known
+
+
+def test_cpr_decode():
+    assert adsbcot.modes_typecode(POSITION_MSG) == 11
+    assert adsbcot.cpr_nl(0) == 59
+    assert adsbcot.cpr_nl(52.2572) == 36
+    assert adsbcot.cpr_nl(-88) == 1
+
+    even = adsbcot.modes_functions.cpr_frame(POSITION_MSG)
+    odd = adsbcot.modes_functions.cpr_frame(ODD_POSITION_MSG)
+    assert (even[0], odd[0]) == (0, 1)
+    lat, lon = adsbcot.cpr_global(even[1:], odd[1:], False)
+    assert lat == pytest.approx(52.2572, abs=1e-4)
+    assert lon == pytest.approx(3.91937, abs=1e-4)
+    assert adsbcot.cpr_local(*even[1:], 0, 52.258, 3.918) == (lat, lon)
+
+    surface = adsbcot.modes_functions.cpr_frame(SURFACE_MSG)
+    lat, lon = adsbcot.cpr_local(*surface[1:], surface[0], 51.990, 4.375, True)
+    assert lat == pytest.approx(52.32304, abs=1e-4)
+    assert lon == pytest.approx(4.73047, abs=1e-4)
+
+
+def test_great_circle_distance():
+    assert adsbcot.great_circle_distance(0, 0, 0, 1) == pytest.approx(111195, rel=1e-4)
+    assert adsbcot.great_circle_distance(52, 4, 52, 4) == 0
+
+
+def test_position_decoder_reference():
+    decoder = adsbcot.PositionDecoder(reference=(52.0, 4.0), max_range=300000)
+
+    # A single frame is decoded relative to the receiver, provisionally:
+    lat, lon = decoder.decode("40621D", POSITION_MSG, now=0)
+    assert (lat, lon) == pytest.approx((52.2572, 3.91937), abs=1e-4)
+    assert decoder.counters["cpr_reference"] == 1
+    assert "40621D" not in decoder.positions
+
+    # ...until a pair received within the pair window is decoded globally:
+    position = decoder.decode("40621D", ODD_POSITION_MSG, now=5)
+    assert position == pytest.approx((52.26578, 3.93899), abs=1e-4)
+    assert decoder.counters["cpr_global"] == 1
+
+    # ...then relative to the aircraft's last position:
+    position = decoder.decode("40621D", POSITION_MSG, now=25)
+    assert position == pytest.approx((52.2572, 3.91937), abs=1e-4)
+    assert decoder.counters["cpr_local"] == 1
+
+    lat, lon = decoder.decode("484175", SURFACE_MSG, now=30)
+    assert (lat, lon) == pytest.approx((52.32304, 4.73047), abs=1e-4)
+    assert decoder.decode("4840D6", IDENT_MSG, now=30) is None
+
+    # Aircraft not heard within the TTL are forgotten:
+    decoder.decode("484175", SURFACE_MSG, now=100)
+    assert list(decoder.positions) == ["484175"]
+
+
+def test_position_decoder_no_reference():
+    decoder = adsbcot.PositionDecoder()
+    assert decoder.decode("40621D", POSITION_MSG, now=0) is None
+    assert decoder.decode("484175", SURFACE_MSG, now=0) is None
+    assert decoder.counters["cpr_undecoded"] == 2
+
+    # Frames too far apart aren't decoded as a pair:
+    assert decoder.decode("40621D", ODD_POSITION_MSG, now=11) is None
+    position = decoder.decode("40621D", POSITION_MSG, now=12)
+    assert position == pytest.approx((52.2572, 3.91937), abs=1e-4)
+
+    # Beyond 180 NM, or without a range, a local decode may be ambiguous:
+    for max_range in (0, 400000):
+        decoder = adsbcot.PositionDecoder(reference=(52.0, 4.0), max_range=max_range)
+        assert decoder.decode("40621D", POSITION_MSG, now=0) is None
+
+
+def test_position_decoder_range():
+    decoder = adsbcot.PositionDecoder(reference=(40.7, -74.0), max_range=300000)
+    assert decoder.decode("40621D", ODD_POSITION_MSG, now=0) is None
+    assert decoder.counters["cpr_range_rejected"] == 1
+
+    # Global decodes are unambiguous, so never rejected:
+    position = decoder.decode("40621D", POSITION_MSG, now=1)
+    assert position == pytest.approx((52.2572, 3.91937), abs=1e-4)
+    assert "40621D" in decoder.positions
+
+
+def test_position_decoder_beyond_180nm():
+    # The aircraft is 250 NM north of the receiver:
+    reference = (52.2572 - 250 / 60, 3.91937)
+
+    # By default, a single frame isn't decoded relative to the receiver, unless
+    # it's a surface position:
+    decoder = adsbcot.PositionDecoder(reference=reference)
+    assert decoder.decode("40621D", POSITION_MSG, now=0) is None
+    assert decoder.decode("484175", SURFACE_MSG, now=0) is not None
+    position = decoder.decode("40621D", ODD_POSITION_MSG, now=1)
+    assert position == pytest.approx((52.26578, 3.93899), abs=1e-4)
+
+    # With a range that isn't the receiver's horizon, the first frame is decoded
+    # to a wrong position within 180 NM, which the next pair replaces:
+    decoder = adsbcot.PositionDecoder(reference=reference, max_range=333000)
+    phantom = decoder.decode("40621D", POSITION_MSG, now=0)
+    assert adsbcot.great_circle_distance(*phantom, 52.2572, 3.91937) > 300000
+    position = decoder.decode("40621D", ODD_POSITION_MSG, now=1)
+    assert position == pytest.approx((52.26578, 3.93899), abs=1e-4)
+    assert decoder.counters["cpr_range_rejected"] == 0
+    position = decoder.decode("40621D", POSITION_MSG, now=20)
+    assert position == pytest.approx((52.2572, 3.91937), abs=1e-4)
+    assert decoder.counters["cpr_local"] == 1
@@ -21,11 +21,14 @@
 
 import asyncio
 import csv
+import datetime
 import io
+import re
 import urllib
 import xml.etree.ElementTree as ET
 
 import pytest
+import pytak
 
 import adsbcot
 import adsbcot.functions
@@ -306,3 +309,31 @@ def test_negative_adsb_to_cot():
     sample_craft = {"taco": "burrito"}
     cot = adsbcot.adsb_to_cot(sample_craft)
     assert cot == None
+
+
+def test_adsb_to_cot_template_parity(sample_craft, sample_known_craft):
+    known_craft = sample_known_craft[0]
+    cot_time = re.compile(rb"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d+Z")
+    for known in (None, known_craft):
+        etree_cot = adsbcot.adsb_to_cot(dict(sample_craft), known_craft=known)
+        template_cot = adsbcot.adsb_to_cot_template(
+            dict(sample_craft), known_craft=known
+        )
+        assert cot_time.sub(b"T", template_cot) == cot_time.sub(b"T", etree_cot)
+
+
+@pytest.mark.parametrize("cot_stale", [0, "0", "", "300"])
+def test_adsb_to_cot_template_stale_parity(sample_craft, cot_stale):
+    config = {"COT_STALE": cot_stale}
+
+    def stale_seconds(cot):
+        event = ET.fromstring(cot)
+        return datetime.datetime.strptime(
+            event.attrib["stale"], pytak.W3C_XML_DATETIME
+        ) - datetime.datetime.strptime(event.attrib["time"], pytak.W3C_XML_DATETIME)
+
+    etree_cot = adsbcot.adsb_to_cot(dict(sample_craft), config)
+    template_cot = adsbcot.adsb_to_cot_template(dict(sample_craft), config)
+    expected = int(cot_stale or 0) or int(pytak.DEFAULT_COT_STALE)
+    assert round(stale_seconds(etree_cot).total_seconds()) == expected
+    assert round(stale_seconds(template_cot).total_seconds()) == expected